@@ -61,5 +61,10 @@ def configure_inference_threads() -> None:
         import cv2
 
         cv2.setNumThreads(cap)
+        # The OpenCV image nodes lean on the SIMD/IPP-optimized kernels; make
+        # sure nothing imported earlier switched them off process-wide.
+        cv2.setUseOptimized(True)
+        if hasattr(cv2, 'ipp') and hasattr(cv2.ipp, 'setUseIPP'):
+            cv2.ipp.setUseIPP(True)
     except Exception as e:
         logger.debug("Could not cap OpenCV threads: %s", e)
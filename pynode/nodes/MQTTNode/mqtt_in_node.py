@@ -8,6 +8,10 @@ from typing import Any, Dict, Optional
 from pynode.nodes.base_node import BaseNode, Info, MessageKeys
 from pynode.nodes.MQTTNode.mqtt_service import mqtt_manager, MQTTService
 
+# Bytes a JSON document can start with (including leading whitespace). In
+# 'auto' mode anything else skips the json.loads attempt entirely.
+_JSON_START_BYTES = frozenset(b'{["-0123456789tfn \t\r\n')
+
 _info = Info()
 _info.add_text("Subscribes to an MQTT topic and outputs received messages. Uses a shared broker connection that can be reused across multiple MQTT nodes.")
 _info.add_header("Outputs")
@@ -18,10 +22,11 @@ _info.add_header("Configuration")
 _info.add_bullets(
     ("MQTT Broker:", "Select or configure a broker connection (host, port, credentials)"),
     ("Topic:", "MQTT topic to subscribe to (supports + and # wildcards)"),
-    ("QoS:", "Quality of Service level (0=at most once, 1=at least once, 2=exactly once)")
+    ("QoS:", "Quality of Service level (0=at most once, 1=at least once, 2=exactly once)"),
+    ("Payload Format:", "How the received bytes are turned into msg.payload: auto (JSON if valid, else text), JSON, text, or raw bytes")
 )
 _info.add_header("Output Message")
-_info.add_code('msg.payload').text(" - Received data (auto-parsed as JSON if valid)").end()
+_info.add_code('msg.payload').text(" - Received data, converted according to Payload Format").end()
 _info.add_code('msg.topic').text(" - The MQTT topic the message was received on").end()
 
 
@@ -43,7 +48,8 @@ class MqttInNode(BaseNode):
     DEFAULT_CONFIG = {
         'serviceId': '',
         'topic': 'test/topic',
-        'qos': '0'
+        'qos': '0',
+        'payloadFormat': 'auto'
     }
     
     properties = [
@@ -71,6 +77,19 @@ class MqttInNode(BaseNode):
                 {'value': '2', 'label': '2 - Exactly once'}
             ],
             'default': DEFAULT_CONFIG['qos']
+        },
+        {
+            'name': 'payloadFormat',
+            'label': 'Payload Format',
+            'type': 'select',
+            'options': [
+                {'value': 'auto', 'label': 'Auto (JSON, else text)'},
+                {'value': 'json', 'label': 'JSON'},
+                {'value': 'text', 'label': 'Text (UTF-8)'},
+                {'value': 'bytes', 'label': 'Raw bytes'}
+            ],
+            'default': DEFAULT_CONFIG['payloadFormat'],
+            'help': 'Use raw bytes for binary payloads (e.g. images) to skip decoding'
         }
     ]
     
@@ -78,6 +97,14 @@ class MqttInNode(BaseNode):
         super().__init__(node_id, name)
         self._service: Optional[MQTTService] = None
         self._subscribed_topic: Optional[str] = None
+        # Pre-bound for the receive path, which runs once per MQTT message.
+        self._create_message = self.create_message
+        self._send = self.send
+    
+    def configure(self, config: Dict[str, Any]):
+        """Cache the payload format so the receive path doesn't look it up per message."""
+        super().configure(config)
+        self._payload_format = self.config.get('payloadFormat', 'auto')
     
     def _on_message(self, topic: str, payload: bytes):
         """Callback when message is received from the service."""
@@ -86,22 +113,29 @@ class MqttInNode(BaseNode):
             self.report_error("Received message but MQTT broker is disconnected")
             return
         
-        try:
-            decoded = payload.decode('utf-8')
-            # Try to parse as JSON
-            try:
-                decoded = json.loads(decoded)
-            except (json.JSONDecodeError, ValueError):
-                pass
-            payload_data = decoded
-        except Exception:
+        payload_format = self._payload_format
+        if payload_format == 'bytes':
             payload_data = payload
+        elif payload_format == 'json':
+            try:
+                payload_data = json.loads(payload)
+            except ValueError as e:
+                self.report_error(f"Invalid JSON payload on '{topic}': {e}")
+                return
+        else:
+            try:
+                payload_data = payload.decode('utf-8')
+            except UnicodeDecodeError:
+                payload_data = payload
+            else:
+                # Try to parse as JSON
+                if payload_format == 'auto' and payload and payload[0] in _JSON_START_BYTES:
+                    try:
+                        payload_data = json.loads(payload_data)
+                    except ValueError:
+                        pass
         
-        msg = self.create_message(
-            payload=payload_data,
-            topic=topic
-        )
-        self.send(msg)
+        self._send(self._create_message(payload=payload_data, topic=topic))
     
     def on_start(self):
         """Subscribe to MQTT topic when workflow starts."""
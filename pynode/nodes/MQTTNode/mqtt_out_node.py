@@ -89,6 +89,17 @@ class MqttOutNode(BaseNode):
         super().__init__(node_id, name)
         self._service: Optional[MQTTService] = None
     
+    def configure(self, config: Dict[str, Any]):
+        """Parse topic/qos/retain once per config change instead of per message."""
+        super().configure(config)
+        self._topic = self.config.get(MessageKeys.TOPIC, 'test/topic')
+        try:
+            self._qos = self.get_config_int('qos', 0)
+        except (TypeError, ValueError):
+            self._qos = 0
+            self.report_error(f"Invalid QoS '{self.config.get('qos')}', using 0")
+        self._retain = self.get_config_bool('retain', False)
+    
     def on_start(self):
         """Register with MQTT service when workflow starts."""
         super().on_start()
@@ -138,7 +149,7 @@ class MqttOutNode(BaseNode):
             self.report_error(f"Cannot publish: not connected to MQTT broker {self._service.broker}:{self._service.port}")
             return
         
-        topic = self.config.get(MessageKeys.TOPIC, 'test/topic')
+        topic = self._topic
         
         # Allow msg.topic to override configured topic
         if MessageKeys.TOPIC in msg and msg[MessageKeys.TOPIC]:
@@ -149,9 +160,7 @@ class MqttOutNode(BaseNode):
             self.report_error("Topic is empty. Configure a topic in node properties.")
             return
         
-        qos = self.get_config_int('qos', 0)
-        retain = self.get_config_bool('retain', False)
         payload = msg.get(MessageKeys.PAYLOAD, '')
         
-        if not self._service.publish(topic, payload, qos, retain):
+        if not self._service.publish(topic, payload, self._qos, self._retain):
             self.report_error(f"Failed to publish to '{topic}'")
@@ -3,16 +3,22 @@ MQTT Service Manager - handles shared MQTT connections across nodes.
 Similar to Node-RED's configuration nodes concept.
 """
 
+import functools
 import logging
 import os
+import queue
 import threading
 import json
 import uuid
-from typing import Any, Dict, Callable, Optional, Set, Tuple
+from typing import Any, Dict, Callable, List, Optional, Set, Tuple
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+# Max received messages waiting for the dispatch worker before new ones are
+# dropped (matches the per-node input queue size in BaseNode).
+_RX_QUEUE_SIZE = 1000
+
 try:
     import paho.mqtt.client as mqtt
     MQTT_AVAILABLE = True
@@ -20,6 +26,17 @@ except ImportError:
     MQTT_AVAILABLE = False
 
 
+@functools.lru_cache(maxsize=4096)
+def _split_topic(topic: str) -> Tuple[str, ...]:
+    """Split a topic into levels, memoized: brokers see a small, finite set of topics."""
+    return tuple(topic.split('/'))
+
+
+def _is_wildcard(topic: str) -> bool:
+    """True if a subscription filter contains an MQTT wildcard level."""
+    return '+' in topic or '#' in topic
+
+
 class MQTTService:
     """
     Represents a single MQTT broker connection that can be shared across nodes.
@@ -39,57 +56,134 @@ class MQTTService:
         self.client: Optional[mqtt.Client] = None
         self._connected = False
         self._lock = threading.Lock()
-        self._subscribers: Dict[str, Set[Callable]] = {}  # topic -> set of callbacks
+        # topic -> callbacks. A tuple rather than a set: almost every topic
+        # has one to three subscribers, where a linear scan beats hashing.
+        # Replaced (never mutated) under _lock so the paho dispatchers can
+        # read a consistent snapshot without taking the lock.
+        self._subscribers: Dict[str, Tuple[Callable, ...]] = {}
+        self._topic_qos: Dict[str, int] = {}  # topic -> highest requested QoS
+        # Subscribed filters containing '+' or '#'; exact filters are found by
+        # a plain dict lookup and never need _topic_matches.
+        self._wildcard_topics: Tuple[str, ...] = ()
         self._publishers: Set[str] = set()  # node IDs that want to publish
         self._message_callbacks: Dict[str, Callable] = {}  # node_id -> callback
         self._error_callbacks: Dict[str, Callable] = {}  # node_id -> error callback
+        # Snapshot of _error_callbacks.values(), rebuilt under _lock whenever
+        # a node registers/unregisters so _notify_error can read it lock-free.
+        self._error_callback_snapshot: Tuple[Callable, ...] = ()
+        # Received messages are handed from paho's network thread to a worker
+        # so slow subscribers (JSON parsing, etc.) never stall the socket.
+        self._rx_queue: queue.Queue = queue.Queue(maxsize=_RX_QUEUE_SIZE)
+        self._rx_thread: Optional[threading.Thread] = None
         self._ref_count = 0
     
     @property
     def connected(self) -> bool:
         return self._connected
     
-    def _on_connect(self, client, userdata, flags, rc):
+    def _on_connect(self, client, userdata, flags, reason_code, properties=None):
         """Callback when connected to broker."""
-        if rc == 0:
+        if reason_code == 0:
             self._connected = True
-            # Re-subscribe to all topics
+            # Re-subscribe to all topics in a single SUBSCRIBE packet
             with self._lock:
-                for topic in self._subscribers:
-                    client.subscribe(topic)
+                subscriptions = [(topic, self._topic_qos.get(topic, 0)) for topic in self._subscribers]
+                if subscriptions:
+                    client.subscribe(subscriptions)
         else:
             self._connected = False
-            error_msg = f"Connection to {self.broker}:{self.port} failed with code {rc}"
+            error_msg = f"Connection to {self.broker}:{self.port} failed with code {reason_code}"
             self._notify_error(error_msg)
     
-    def _on_disconnect(self, client, userdata, rc):
-        """Callback when disconnected from broker."""
+    def _on_disconnect(self, client, userdata, *args):
+        """Callback when disconnected from broker.
+
+        Callback API v2 passes ``(flags, reason_code, properties)``; the v1
+        API used by paho-mqtt < 2.0 passes just ``(rc,)``.
+        """
         self._connected = False
-        if rc != 0:
+        reason_code = args[1] if len(args) > 1 else args[0]
+        if reason_code != 0:
             self._notify_error(f"Unexpected disconnection from {self.broker}:{self.port}")
     
+    def _make_dispatcher(self, sub_topic: str) -> Callable:
+        """Build the per-filter callback handed to ``message_callback_add``.
+
+        paho routes each incoming message to the filters it matches, so the
+        dispatcher only has to fan out to that filter's subscribers.
+        """
+        def dispatch(client, userdata, message):
+            callbacks = self._subscribers.get(sub_topic)
+            if callbacks:
+                self._enqueue_message(callbacks, message.topic, message.payload)
+        return dispatch
+    
+    def _enqueue_message(self, callbacks: Tuple[Callable, ...], topic: str, payload: bytes):
+        """Hand a received message to the dispatch worker (paho thread)."""
+        try:
+            self._rx_queue.put_nowait((callbacks, topic, payload))
+        except queue.Full:
+            logger.warning(f"MQTT receive queue full for {self.broker}:{self.port}, dropping message on '{topic}'")
+    
+    def _process_rx_queue(self, rx_queue: queue.Queue):
+        """Worker thread: deliver received messages to subscriber callbacks in order."""
+        while True:
+            item = rx_queue.get()
+            try:
+                if item is None:
+                    return
+                callbacks, topic, payload = item
+                for callback in callbacks:
+                    try:
+                        callback(topic, payload)
+                    except Exception as e:
+                        logger.error(f"Error in MQTT message callback: {e}")
+            finally:
+                rx_queue.task_done()
+    
+    def _start_rx_worker(self):
+        """Start the dispatch worker with a fresh queue if it isn't running."""
+        if self._rx_thread is None or not self._rx_thread.is_alive():
+            self._rx_queue = queue.Queue(maxsize=_RX_QUEUE_SIZE)
+            self._rx_thread = threading.Thread(target=self._process_rx_queue, args=(self._rx_queue,),
+                                               name=f"mqtt-rx-{self.id}", daemon=True)
+            self._rx_thread.start()
+    
+    def _stop_rx_worker(self):
+        """Ask the dispatch worker to finish the queued messages and exit."""
+        thread, self._rx_thread = self._rx_thread, None
+        if thread and thread.is_alive():
+            try:
+                self._rx_queue.put(None, timeout=2.0)
+            except queue.Full:
+                pass
+            thread.join(timeout=2.0)
+    
     def _on_message(self, client, userdata, message):
-        """Callback when message is received."""
+        """Fallback for messages that matched no per-topic callback.
+
+        Normally paho delivers every message through the dispatchers
+        registered in ``subscribe``; this only runs if a message slips past
+        them (e.g. a retained message racing a callback registration).
+        """
         topic = message.topic
+        subscribers = self._subscribers
         
-        # Find matching subscribers (including wildcards)
-        with self._lock:
-            callbacks_to_call = set()
-            for sub_topic, callbacks in self._subscribers.items():
-                if self._topic_matches(sub_topic, topic):
-                    callbacks_to_call.update(callbacks)
+        # Exact subscription first, then only the wildcard filters
+        callbacks_to_call: List[Callable] = list(subscribers.get(topic, ()))
+        for sub_topic in self._wildcard_topics:
+            if self._topic_matches(sub_topic, topic):
+                for callback in subscribers.get(sub_topic, ()):
+                    if callback not in callbacks_to_call:
+                        callbacks_to_call.append(callback)
         
-        # Call all matching callbacks
-        for callback in callbacks_to_call:
-            try:
-                callback(topic, message.payload)
-            except Exception as e:
-                logger.error(f"Error in MQTT message callback: {e}")
+        if callbacks_to_call:
+            self._enqueue_message(tuple(callbacks_to_call), topic, message.payload)
     
     def _topic_matches(self, pattern: str, topic: str) -> bool:
         """Check if a topic matches a subscription pattern (with wildcards)."""
-        pattern_parts = pattern.split('/')
-        topic_parts = topic.split('/')
+        pattern_parts = _split_topic(pattern)
+        topic_parts = _split_topic(topic)
         
         for i, pattern_part in enumerate(pattern_parts):
             if pattern_part == '#':
@@ -103,10 +197,7 @@ class MQTTService:
     
     def _notify_error(self, error_msg: str):
         """Notify all registered error callbacks."""
-        with self._lock:
-            callbacks = list(self._error_callbacks.values())
-        
-        for callback in callbacks:
+        for callback in self._error_callback_snapshot:
             try:
                 callback(error_msg)
             except Exception as e:
@@ -124,14 +215,17 @@ class MQTTService:
                 return True
             
             try:
-                self.client = mqtt.Client(client_id=self.client_id, clean_session=self.clean_session)
+                self.client = _create_client(self.client_id, self.clean_session)
                 self.client.on_connect = self._on_connect
                 self.client.on_disconnect = self._on_disconnect
                 self.client.on_message = self._on_message
+                for topic in self._subscribers:
+                    self.client.message_callback_add(topic, self._make_dispatcher(topic))
                 
                 if self.username:
                     self.client.username_pw_set(self.username, self.password)
                 
+                self._start_rx_worker()
                 self.client.connect(self.broker, self.port, self.keep_alive)
                 self.client.loop_start()
                 return True
@@ -155,29 +249,47 @@ class MQTTService:
                     pass
                 self.client = None
                 self._connected = False
+        # Outside the lock: the worker may be mid-callback into a node.
+        self._stop_rx_worker()
     
     def subscribe(self, node_id: str, topic: str, qos: int, callback: Callable):
         """Subscribe a node to a topic."""
         with self._lock:
-            if topic not in self._subscribers:
-                self._subscribers[topic] = set()
-                # Actually subscribe if connected
+            callbacks = self._subscribers.get(topic)
+            prev_qos = self._topic_qos.get(topic)
+            if callbacks is None:
+                callbacks = ()
+                if _is_wildcard(topic):
+                    self._wildcard_topics += (topic,)
+                if self.client:
+                    self.client.message_callback_add(topic, self._make_dispatcher(topic))
+            if prev_qos is None or qos > prev_qos:
+                self._topic_qos[topic] = qos
+                # Actually subscribe (or upgrade the QoS) if connected
                 if self.client and self._connected:
                     self.client.subscribe(topic, qos)
             
-            self._subscribers[topic].add(callback)
+            if callback not in callbacks:
+                self._subscribers[topic] = callbacks + (callback,)
             self._message_callbacks[node_id] = callback
     
     def unsubscribe(self, node_id: str, topic: str, callback: Callable):
         """Unsubscribe a node from a topic."""
         with self._lock:
             if topic in self._subscribers:
-                self._subscribers[topic].discard(callback)
-                if not self._subscribers[topic]:
+                callbacks = tuple(cb for cb in self._subscribers[topic] if cb != callback)
+                if callbacks:
+                    self._subscribers[topic] = callbacks
+                else:
                     del self._subscribers[topic]
-                    # Actually unsubscribe if connected
-                    if self.client and self._connected:
-                        self.client.unsubscribe(topic)
+                    self._topic_qos.pop(topic, None)
+                    if topic in self._wildcard_topics:
+                        self._wildcard_topics = tuple(t for t in self._wildcard_topics if t != topic)
+                    if self.client:
+                        self.client.message_callback_remove(topic)
+                        # Actually unsubscribe if connected
+                        if self._connected:
+                            self.client.unsubscribe(topic)
             
             self._message_callbacks.pop(node_id, None)
     
@@ -205,12 +317,14 @@ class MQTTService:
             self._ref_count += 1
             if error_callback:
                 self._error_callbacks[node_id] = error_callback
+                self._error_callback_snapshot = tuple(self._error_callbacks.values())
     
     def unregister_node(self, node_id: str):
         """Unregister a node from this service."""
         with self._lock:
             self._ref_count = max(0, self._ref_count - 1)
-            self._error_callbacks.pop(node_id, None)
+            if self._error_callbacks.pop(node_id, None) is not None:
+                self._error_callback_snapshot = tuple(self._error_callbacks.values())
             self._message_callbacks.pop(node_id, None)
     
     @property
@@ -232,6 +346,18 @@ class MQTTService:
         }
 
 
+def _create_client(client_id: str, clean_session: bool) -> 'mqtt.Client':
+    """Create a paho client on the v2 callback API when it is available.
+
+    paho-mqtt >= 2.0 deprecates the v1 callback signatures; older releases
+    do not accept ``callback_api_version`` at all.
+    """
+    if hasattr(mqtt, 'CallbackAPIVersion'):
+        return mqtt.Client(mqtt.CallbackAPIVersion.VERSION2,
+                           client_id=client_id, clean_session=clean_session)
+    return mqtt.Client(client_id=client_id, clean_session=clean_session)
+
+
 def _default_config_file() -> Path:
     """Default services file location (source checkout: workflows/services/)."""
     module_dir = Path(__file__).parent.parent.parent.parent
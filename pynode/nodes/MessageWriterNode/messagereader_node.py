@@ -6,13 +6,102 @@ Supports reading various formats written by MessageWriterNode.
 import os
 import json
 import pickle
-import base64
+import re
+import stat
+import sys
+import binascii
+import copy
+import fnmatch
 import glob
+import io
+import itertools
+import threading
 import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, AnyStr, Deque, Dict, Iterator, List, Optional, Tuple
 from pynode.nodes.base_node import BaseNode, Info, MessageKeys
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Message keys bound once at import; they are used per file in the read loops.
+_PAYLOAD = MessageKeys.PAYLOAD
+_TOPIC = MessageKeys.TOPIC
+_MSG_ID = MessageKeys.MSG_ID
+
+# strict_mode (3.11+) decodes canonical base64 faster; non-canonical input
+# (e.g. with line breaks) is retried with the lenient decoder.
+if sys.version_info >= (3, 11):
+    def _a2b_base64(data: str) -> bytes:
+        try:
+            return binascii.a2b_base64(data, strict_mode=True)
+        except binascii.Error:
+            return binascii.a2b_base64(data)
+else:
+    _a2b_base64 = binascii.a2b_base64
+
+# Threads used to read batch files ahead of parsing (see _iter_prefetched).
+_READ_WORKERS = 8
+
+
+def _json_loads(raw: bytes) -> Any:
+    """Parse a JSON document from bytes, using orjson when it is installed.
+
+    orjson is stricter than the stdlib parser (no NaN/Infinity literals, 64-bit
+    integers only), so documents it rejects are re-parsed with ``json``.
+    """
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(raw)
+
+
+def _open_sequential(file_path: str, mode: str = 'rb', **kwargs):
+    """Open a file that will be read start to finish, hinting the kernel to read ahead.
+
+    ``posix_fadvise`` only exists on POSIX; elsewhere (or on filesystems
+    that reject the hint) this is a plain ``open``.
+    """
+    f = open(file_path, mode, **kwargs)
+    if hasattr(os, 'posix_fadvise'):
+        try:
+            fd = f.fileno()
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        except OSError:
+            pass
+    return f
+
+
+def _prefetch_files(file_paths: List[AnyStr]):
+    """Queue kernel read-ahead for a whole batch before it is read in order.
+
+    Each WILLNEED hint starts an asynchronous read, so the device works on
+    many files at once instead of one blocking read() at a time. No-op
+    where ``posix_fadvise`` is unavailable.
+    """
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    for file_path in file_paths:
+        try:
+            fd = os.open(file_path, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+
 _info = Info()
 _info.add_text("Reads messages or data from disk files. Supports JSON, binary, and text formats with batch reading capabilities.")
 _info.add_header("Inputs")
@@ -33,7 +122,8 @@ _info.add_bullets(
     ("single_file:", "Read one specific file"),
     ("batch_pattern:", "Read multiple files matching a pattern"),
     ("watch_directory:", "Monitor directory for new files"),
-    ("latest_file:", "Read the most recently modified file")
+    ("latest_file:", "Read the most recently modified file"),
+    ("ndjson_batch:", "Read a JSON Lines (.jsonl/.ndjson) file and output one message per line")
 )
 _info.add_header("Input Formats")
 _info.add_bullets(
@@ -78,9 +168,16 @@ class MessageReaderNode(BaseNode):
         'sort_order': 'name',
         'max_files': '10',
         'include_metadata': 'true',
+        'metadata_iso_time': 'true',
         'recursive': 'false',
         'output_structure': 'auto_detect',
-        'allow_pickle': False
+        'allow_pickle': False,
+        'mmap_threshold_mb': '16',
+        'cache_size': '0',
+        'cache_max_mb': '64',
+        'prefetch_files': False,
+        'emit_batch_size': '1',
+        'fast_path_io': False
     }
     
     properties = [
@@ -99,7 +196,8 @@ class MessageReaderNode(BaseNode):
                 {'value': 'single_file', 'label': 'Single File'},
                 {'value': 'batch_pattern', 'label': 'Batch (Pattern)'},
                 {'value': 'latest_file', 'label': 'Latest File'},
-                {'value': 'all_files', 'label': 'All Files'}
+                {'value': 'all_files', 'label': 'All Files'},
+                {'value': 'ndjson_batch', 'label': 'JSON Lines (one message per line)'}
             ],
             'default': DEFAULT_CONFIG['reading_mode'],
             'help': 'How to select files to read'
@@ -109,8 +207,8 @@ class MessageReaderNode(BaseNode):
             'label': 'Specific File',
             'type': 'text',
             'default': DEFAULT_CONFIG['specific_file'],
-            'help': f'Specific filename when reading_mode is "single_file" - leave blank to use {MessageKeys.MSG}.{MessageKeys.PAYLOAD}.filename',
-            'showIf': {'reading_mode': 'single_file'}
+            'help': f'Specific filename when reading_mode is "single_file" or "ndjson_batch" - leave blank to use {MessageKeys.MSG}.{MessageKeys.PAYLOAD}.filename',
+            'showIf': {'reading_mode': ['single_file', 'ndjson_batch']}
         },
         {
             'name': 'filename_pattern',
@@ -175,6 +273,19 @@ class MessageReaderNode(BaseNode):
             'default': DEFAULT_CONFIG['include_metadata'],
             'help': 'Include file metadata (size, modified time) in output'
         },
+        {
+            'name': 'metadata_iso_time',
+            'label': 'Metadata ISO Timestamp',
+            'type': 'select',
+            'options': [
+                {'value': 'true', 'label': 'Yes'},
+                {'value': 'false', 'label': 'No'}
+            ],
+            'default': DEFAULT_CONFIG['metadata_iso_time'],
+            'help': 'Add modified_iso (formatted modification time) to file metadata. '
+                    'The numeric modified timestamp is always included.',
+            'showIf': {'include_metadata': ['true']}
+        },
         {
             'name': 'recursive',
             'label': 'Recursive Search',
@@ -198,51 +309,124 @@ class MessageReaderNode(BaseNode):
             ],
             'default': DEFAULT_CONFIG['output_structure'],
             'help': 'How to structure the read data in the output message'
+        },
+        {
+            'name': 'mmap_threshold_mb',
+            'label': 'Memory-map NumPy Above (MB)',
+            'type': 'text',
+            'default': DEFAULT_CONFIG['mmap_threshold_mb'],
+            'help': '.npy files larger than this are memory-mapped (copy-on-write) instead of '
+                    'loaded into RAM. 0 disables memory-mapping.'
+        },
+        {
+            'name': 'cache_size',
+            'label': 'Parsed File Cache Size',
+            'type': 'text',
+            'default': DEFAULT_CONFIG['cache_size'],
+            'help': 'Number of parsed files kept in memory and reused while unchanged on disk '
+                    '(same size and modification time). 0 disables the cache.'
+        },
+        {
+            'name': 'cache_max_mb',
+            'label': 'Parsed File Cache Limit (MB)',
+            'type': 'text',
+            'default': DEFAULT_CONFIG['cache_max_mb'],
+            'help': 'Total on-disk size of the files the cache may hold; larger files are never cached'
+        },
+        {
+            'name': 'prefetch_files',
+            'label': 'Prefetch Batch Files',
+            'type': 'checkbox',
+            'default': DEFAULT_CONFIG['prefetch_files'],
+            'help': 'Ask the OS to start reading every file in a batch up front so disk reads '
+                    'overlap (helps cold caches and network storage; POSIX only)',
+            'showIf': {'reading_mode': ['batch_pattern', 'all_files']}
+        },
+        {
+            'name': 'emit_batch_size',
+            'label': 'Messages per Output',
+            'type': 'text',
+            'default': DEFAULT_CONFIG['emit_batch_size'],
+            'help': f'Group this many file messages into one output as {MessageKeys.MSG}.{MessageKeys.PAYLOAD}.batch '
+                    '(fewer, larger messages for downstream nodes). 1 sends one message per file.',
+            'showIf': {'reading_mode': ['batch_pattern', 'all_files']}
+        },
+        {
+            'name': 'fast_path_io',
+            'label': 'Byte Paths for Directory Scans',
+            'type': 'checkbox',
+            'default': DEFAULT_CONFIG['fast_path_io'],
+            'help': 'Scan directories and open batch files using byte paths, skipping a '
+                    'filename encode per file (POSIX only; ASCII patterns only)',
+            'showIf': {'reading_mode': ['batch_pattern', 'latest_file', 'all_files']}
         }
     ]
     
     def __init__(self, node_id=None, name="message reader"):
+        # Guards _file_cache; created first because BaseNode.__init__ calls
+        # configure(), which resets the cache.
+        self._file_cache_lock = threading.Lock()
         super().__init__(node_id, name)
         self._last_read_time = None
-        self._file_cache = {}
+    
+    def configure(self, config: Dict[str, Any]):
+        """Apply config and drop cached file contents (format/pickle settings may have changed)."""
+        super().configure(config)
+        try:
+            cache_size = max(0, self.get_config_int('cache_size', 0))
+            cache_max_bytes = max(0, int(self.get_config_float('cache_max_mb', 64) * 1024 * 1024))
+        except (TypeError, ValueError):
+            cache_size, cache_max_bytes = 0, 0
+            self.report_error("Invalid parsed file cache settings; cache disabled")
+        with self._file_cache_lock:
+            self._file_cache: 'OrderedDict[Tuple[str, int, int], Any]' = OrderedDict()
+            self._file_cache_bytes = 0
+            self._file_cache_size = cache_size
+            self._file_cache_max_bytes = cache_max_bytes
+        # Byte paths are only the native form where the separator is '/'
+        self._fast_path_io = self.get_config_bool('fast_path_io', False) and os.sep == '/'
+        self._metadata_iso_time = self.get_config_bool('metadata_iso_time', True)
+        # Resolved once here instead of comparing output_structure per file;
+        # unknown values fall back to wrap_in_data as before.
+        self._build_output = {
+            'auto_detect': self._build_auto_detect,
+            'reconstruct_message': self._build_reconstruct_message,
+            'direct_payload': self._build_direct_payload,
+        }.get(self.config.get('output_structure', 'auto_detect'), self._build_wrap_in_data)
     
     def _create_output_message(self, data, original_filename=None):
         """Create output message based on output_structure setting."""
-        output_structure = self.config.get('output_structure', 'auto_detect')
-        
-        if output_structure == 'auto_detect':
-            # Try to detect if this was a whole message or just payload
-            if (isinstance(data, dict) and 
-                (MessageKeys.PAYLOAD in data or MessageKeys.TOPIC in data or MessageKeys.MSGID in data) and
-                not ('data' in data and len(data) == 1)):  # Not just wrapped data
-                # Looks like a whole message - reconstruct it
-                msg = data.copy()
-                if original_filename and 'filename' not in msg:
-                    msg['filename'] = original_filename
-                return msg
-            else:
-                # Looks like payload data - put directly in msg.payload
-                return self.create_message(payload=data, filename=original_filename)
-        
-        elif output_structure == 'reconstruct_message':
-            # Always try to use data as whole message
-            if isinstance(data, dict):
-                msg = data.copy()
-                if original_filename and 'filename' not in msg:
-                    msg['filename'] = original_filename
-                return msg
-            else:
-                return self.create_message(payload=data, filename=original_filename)
-        
-        elif output_structure == 'direct_payload':
-            # Always put data directly in payload
-            return self.create_message(payload=data, filename=original_filename)
-        
-        else:  # wrap_in_data (original behavior)
-            # Always wrap in msg.payload.data
-            return self.create_message(
-                payload={'data': data, 'filename': original_filename}
-            )
+        return self._build_output(data, original_filename)
+    
+    def _build_auto_detect(self, data, original_filename=None):
+        """Reconstruct data that looks like a whole message, otherwise use it as msg.payload."""
+        if (isinstance(data, dict) and 
+            (_PAYLOAD in data or _TOPIC in data or _MSG_ID in data) and
+            not ('data' in data and len(data) == 1)):  # Not just wrapped data
+            # Looks like a whole message - reconstruct it
+            if original_filename and 'filename' not in data:
+                return {**data, 'filename': original_filename}
+            return dict(data)
+        # Looks like payload data - put directly in msg.payload
+        return self.create_message(payload=data, filename=original_filename)
+    
+    def _build_reconstruct_message(self, data, original_filename=None):
+        """Always try to use data as whole message."""
+        if isinstance(data, dict):
+            if original_filename and 'filename' not in data:
+                return {**data, 'filename': original_filename}
+            return dict(data)
+        return self.create_message(payload=data, filename=original_filename)
+    
+    def _build_direct_payload(self, data, original_filename=None):
+        """Always put data directly in payload."""
+        return self.create_message(payload=data, filename=original_filename)
+    
+    def _build_wrap_in_data(self, data, original_filename=None):
+        """Always wrap in msg.payload.data (original behavior)."""
+        return self.create_message(
+            payload={'data': data, 'filename': original_filename}
+        )
     
     def on_input(self, msg: Dict[str, Any], input_index: int = 0):
         """
@@ -268,7 +452,7 @@ class MessageReaderNode(BaseNode):
                     'status': 'error',
                     'error': str(e)
                 },
-                topic=msg.get(MessageKeys.TOPIC, 'MessageReader/error')
+                topic=msg.get(_TOPIC, 'MessageReader/error')
             )
             self.send(output_msg)
     
@@ -287,19 +471,13 @@ class MessageReaderNode(BaseNode):
             return
         
         if reading_mode == 'single_file':
-            filename = self.config.get('specific_file', '')
-            
-            # If filename is blank, try to get it from incoming message
-            if not filename:
-                payload = trigger_msg.get(MessageKeys.PAYLOAD, {})
-                if isinstance(payload, dict) and 'filename' in payload:
-                    filename = payload['filename']
-                else:
-                    filename = 'message_0001.json'  # Default fallback
-            
-            file_path = os.path.join(directory, filename)
+            file_path = self._get_specific_file_path(directory, trigger_msg, 'message_0001.json')
             self._read_single_file(file_path, trigger_msg)
             
+        elif reading_mode == 'ndjson_batch':
+            file_path = self._get_specific_file_path(directory, trigger_msg, 'messages.jsonl')
+            self._read_ndjson_file(file_path, trigger_msg)
+            
         elif reading_mode == 'batch_pattern':
             self._read_batch_files(directory, trigger_msg)
             
@@ -309,6 +487,55 @@ class MessageReaderNode(BaseNode):
         elif reading_mode == 'all_files':
             self._read_all_files(directory, trigger_msg)
     
+    def _get_specific_file_path(self, directory: str, trigger_msg: Dict[str, Any], default: str) -> str:
+        """Resolve the configured specific file, falling back to msg.payload.filename."""
+        filename = self.config.get('specific_file', '')
+        
+        # If filename is blank, try to get it from incoming message
+        if not filename:
+            payload = trigger_msg.get(_PAYLOAD, {})
+            if isinstance(payload, dict) and 'filename' in payload:
+                filename = payload['filename']
+            else:
+                filename = default  # Default fallback
+        
+        return os.path.join(directory, filename)
+    
+    def _read_ndjson_file(self, file_path: str, trigger_msg: Dict[str, Any]):
+        """Read a JSON Lines file with one open() and send one message per line."""
+        if not os.path.exists(file_path):
+            self.report_error(f"File not found: {file_path}")
+            return
+        
+        filename = os.path.basename(file_path)
+        records = []
+        with _open_sequential(file_path, 'rb', buffering=1 << 20) as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    data = _json_loads(line)
+                    if b'"_numpy_' in line:
+                        data = self._reconstruct_numpy_arrays(data, os.path.dirname(file_path))
+                    records.append(data)
+                except ValueError as e:
+                    self.report_error(f"Invalid JSON on line {line_number} of {file_path}: {str(e)}")
+        
+        batch_total = len(records)
+        topic = trigger_msg.get(_TOPIC, 'MessageReader')
+        for i, data in enumerate(records):
+            output_msg = self._create_output_message(data, filename)
+            if isinstance(output_msg.get(_PAYLOAD), dict):
+                output_msg[_PAYLOAD]['batch_index'] = i
+                output_msg[_PAYLOAD]['batch_total'] = batch_total
+            else:
+                output_msg['batch_index'] = i
+                output_msg['batch_total'] = batch_total
+            output_msg[_TOPIC] = topic
+            output_msg['source_file'] = file_path
+            output_msg['reading_mode'] = 'ndjson_batch'
+            self.send(output_msg)
+    
     def _read_single_file(self, file_path: str, trigger_msg: Dict[str, Any]):
         """Read a single file and send as message."""
         try:
@@ -325,16 +552,16 @@ class MessageReaderNode(BaseNode):
             # Add metadata if requested
             if self.get_config_bool('include_metadata', True):
                 metadata = self._get_file_metadata(file_path)
-                if MessageKeys.PAYLOAD in output_msg:
-                    if isinstance(output_msg[MessageKeys.PAYLOAD], dict):
-                        output_msg[MessageKeys.PAYLOAD]['metadata'] = metadata
+                if _PAYLOAD in output_msg:
+                    if isinstance(output_msg[_PAYLOAD], dict):
+                        output_msg[_PAYLOAD]['metadata'] = metadata
                     else:
                         output_msg['metadata'] = metadata
                 else:
                     output_msg['metadata'] = metadata
             
             # Preserve topic and add source info
-            output_msg[MessageKeys.TOPIC] = trigger_msg.get(MessageKeys.TOPIC, 'MessageReader')
+            output_msg[_TOPIC] = trigger_msg.get(_TOPIC, 'MessageReader')
             output_msg['source_file'] = file_path
             output_msg['reading_mode'] = 'single_file'
             
@@ -357,7 +584,7 @@ class MessageReaderNode(BaseNode):
                     'pattern': pattern,
                     'directory': directory
                 },
-                topic=trigger_msg.get(MessageKeys.TOPIC, 'MessageReader')
+                topic=trigger_msg.get(_TOPIC, 'MessageReader')
             )
             self.send(output_msg)
             return
@@ -365,37 +592,78 @@ class MessageReaderNode(BaseNode):
         # Limit number of files
         files_to_read = file_list[:max_files]
         
-        for i, file_path in enumerate(files_to_read):
+        # Loop invariants, resolved once per batch rather than per file
+        batch_total = len(files_to_read)
+        include_metadata = self.get_config_bool('include_metadata', True)
+        topic = trigger_msg.get(_TOPIC, 'MessageReader')
+        emit_batch_size = max(1, self.get_config_int('emit_batch_size', 1))
+        pending_msgs = []
+        
+        # Bound once so the per-file loop body does no attribute lookups for them
+        basename = os.path.basename
+        fsdecode = os.fsdecode
+        stat_path = os.stat
+        read_file_data = self._read_file_data
+        # The cache and metadata share one stat per file, taken on the scanned
+        # path so byte paths are not re-encoded
+        needs_stat = include_metadata or self._file_cache_size > 0
+        st = None
+        
+        if self.get_config_bool('prefetch_files', False):
+            _prefetch_files(files_to_read)
+        
+        for i, (scan_path, content) in enumerate(self._iter_prefetched(files_to_read)):
+            # Scanned paths are bytes with fast_path_io; messages carry str paths
+            file_path = fsdecode(scan_path)
             try:
-                data = self._read_file_data(file_path)
-                filename = os.path.basename(file_path)
+                if needs_stat:
+                    st = stat_path(scan_path)
+                data = read_file_data(file_path, content.result(), st)
+                filename = basename(file_path)
                 
                 # Use helper to create properly structured message
                 output_msg = self._create_output_message(data, filename)
                 
                 # Add batch-specific metadata
-                if MessageKeys.PAYLOAD in output_msg:
-                    if isinstance(output_msg[MessageKeys.PAYLOAD], dict):
-                        output_msg[MessageKeys.PAYLOAD]['batch_index'] = i
-                        output_msg[MessageKeys.PAYLOAD]['batch_total'] = len(files_to_read)
-                        if self.get_config_bool('include_metadata', True):
-                            output_msg[MessageKeys.PAYLOAD]['metadata'] = self._get_file_metadata(file_path)
+                if _PAYLOAD in output_msg:
+                    if isinstance(output_msg[_PAYLOAD], dict):
+                        output_msg[_PAYLOAD]['batch_index'] = i
+                        output_msg[_PAYLOAD]['batch_total'] = batch_total
+                        if include_metadata:
+                            output_msg[_PAYLOAD]['metadata'] = self._get_file_metadata(file_path, st)
                     else:
                         # For direct payload mode, add batch info as top-level properties
                         output_msg['batch_index'] = i
-                        output_msg['batch_total'] = len(files_to_read)
-                        if self.get_config_bool('include_metadata', True):
-                            output_msg['metadata'] = self._get_file_metadata(file_path)
+                        output_msg['batch_total'] = batch_total
+                        if include_metadata:
+                            output_msg['metadata'] = self._get_file_metadata(file_path, st)
                 
                 # Preserve topic and add source info
-                output_msg[MessageKeys.TOPIC] = trigger_msg.get(MessageKeys.TOPIC, 'MessageReader')
+                output_msg[_TOPIC] = topic
                 output_msg['source_file'] = file_path
                 output_msg['reading_mode'] = 'batch_pattern'
                 
-                self.send(output_msg)
+                if emit_batch_size == 1:
+                    self.send(output_msg)
+                else:
+                    pending_msgs.append(output_msg)
+                    if len(pending_msgs) >= emit_batch_size:
+                        self._send_batch(pending_msgs, topic)
+                        pending_msgs = []
                 
             except Exception as e:
                 self.report_error(f"Failed to read file {file_path}: {str(e)}")
+        
+        if pending_msgs:
+            self._send_batch(pending_msgs, topic)
+    
+    def _send_batch(self, messages: List[Dict[str, Any]], topic: str):
+        """Send several per-file messages as one message with msg.payload.batch."""
+        self.send(self.create_message(
+            payload={'batch': messages},
+            topic=topic,
+            reading_mode='batch_pattern'
+        ))
     
     def _read_latest_file(self, directory: str, trigger_msg: Dict[str, Any]):
         """Read the most recently modified file."""
@@ -409,12 +677,12 @@ class MessageReaderNode(BaseNode):
                     'pattern': pattern,
                     'directory': directory
                 },
-                topic=trigger_msg.get(MessageKeys.TOPIC, 'MessageReader')
+                topic=trigger_msg.get(_TOPIC, 'MessageReader')
             )
             self.send(output_msg)
             return
         
-        latest_file = file_list[0]  # First in list is most recent
+        latest_file = os.fsdecode(file_list[0])  # First in list is most recent
         self._read_single_file(latest_file, trigger_msg)
     
     def _read_all_files(self, directory: str, trigger_msg: Dict[str, Any]):
@@ -422,41 +690,132 @@ class MessageReaderNode(BaseNode):
         self.config['filename_pattern'] = '*'  # Override pattern for all files
         self._read_batch_files(directory, trigger_msg)
     
-    def _get_file_list(self, directory: str, pattern: str, sort_by: Optional[str] = None) -> List[str]:
-        """Get list of files matching pattern, sorted by specified criteria."""
+    def _get_file_list(self, directory: str, pattern: str, sort_by: Optional[str] = None) -> List[AnyStr]:
+        """Get list of files matching pattern, sorted by specified criteria.
+
+        Paths are bytes when ``fast_path_io`` is enabled (see ``_scan_files``).
+        """
         recursive = self.get_config_bool('recursive', False)
         
-        if recursive:
-            # Recursive search
-            search_pattern = os.path.join(directory, '**', pattern)
-            file_list = glob.glob(search_pattern, recursive=True)
+        if os.sep in pattern or (os.altsep and os.altsep in pattern):
+            # Patterns that span directories need glob's path matching
+            if recursive:
+                search_pattern = os.path.join(directory, '**', pattern)
+            else:
+                search_pattern = os.path.join(directory, pattern)
+            files = []
+            stat_path, is_regular, append = os.stat, stat.S_ISREG, files.append
+            for path in glob.glob(search_pattern, recursive=recursive):
+                try:
+                    st = stat_path(path)
+                except OSError:
+                    continue  # e.g. a broken symlink
+                if is_regular(st.st_mode):
+                    append((path, st))
         else:
-            # Non-recursive search
-            search_pattern = os.path.join(directory, pattern)
-            file_list = glob.glob(search_pattern)
-        
-        # Filter to only files (not directories)
-        file_list = [f for f in file_list if os.path.isfile(f)]
+            files = self._scan_files(directory, pattern, recursive)
         
-        # Sort files
+        # Sort files on the stat taken during the scan (no extra syscalls)
         sort_order = sort_by or self.config.get('sort_order', 'name')
         
         if sort_order == 'modified':
-            file_list.sort(key=lambda x: os.path.getmtime(x), reverse=True)
+            files.sort(key=lambda f: f[1].st_mtime, reverse=True)
         elif sort_order == 'size':
-            file_list.sort(key=lambda x: os.path.getsize(x), reverse=True)
+            files.sort(key=lambda f: f[1].st_size, reverse=True)
         else:  # name
-            file_list.sort()
+            files.sort(key=lambda f: f[0])
         
-        return file_list
+        return [path for path, _ in files]
     
-    def _read_file_data(self, file_path: str) -> Any:
-        """Read and parse file data based on format."""
+    def _scan_files(self, directory: str, pattern: str, recursive: bool) -> List[Tuple[AnyStr, os.stat_result]]:
+        """List ``(path, stat)`` for regular files whose name matches ``pattern``.
+
+        Uses ``os.scandir`` so the file/directory check comes from the
+        directory entry and each match is stat'ed exactly once. Hidden
+        entries are skipped unless the pattern itself starts with '.', the
+        same rule ``glob`` applies.
+
+        With ``fast_path_io`` the scan runs on bytes, so paths come back in
+        the form ``open()`` passes to the OS and are not decoded here and
+        re-encoded per open. Non-ASCII patterns stay on str paths, where
+        ``?`` and character classes match whole characters rather than bytes.
+        """
+        # Compiled once per scan; file names are case-insensitive on Windows,
+        # as with fnmatch.fnmatch.
+        regex = fnmatch.translate(pattern)
+        if self._fast_path_io and pattern.isascii():
+            directory, regex = os.fsencode(directory), os.fsencode(regex)
+        include_hidden = pattern.startswith('.')
+        hidden_prefix = '.' if isinstance(directory, str) else b'.'
+        matches = re.compile(regex, re.IGNORECASE if os.name == 'nt' else 0).match
+        files = []
+        append = files.append
+        scandir = os.scandir
+        pending = [directory]
+        while pending:
+            try:
+                with scandir(pending.pop()) as it:
+                    for entry in it:
+                        if entry.name.startswith(hidden_prefix) and not include_hidden:
+                            continue
+                        try:
+                            if entry.is_file():
+                                if matches(entry.name):
+                                    append((entry.path, entry.stat()))
+                            elif recursive and entry.is_dir(follow_symlinks=False):
+                                pending.append(entry.path)
+                        except OSError:
+                            continue  # entry vanished or is unreadable; keep the rest
+            except OSError:
+                continue  # directory could not be opened or listed
+        return files
+    
+    def _read_file_data(self, file_path: str, raw: Optional[bytes] = None,
+                        st: Optional[os.stat_result] = None) -> Any:
+        """Read and parse file data, reusing the cached parse while the file is unchanged.
+
+        ``raw`` is the file's content when the caller already read it (see
+        ``_iter_prefetched``) and ``st`` its stat. Results are deep-copied on the way out because
+        the node and its downstream recipients may mutate the message built
+        from them. .npy files load (or memory-map) straight from disk and
+        are not cached.
+        """
+        if not self._file_cache_size or self._detect_format(file_path) == 'numpy':
+            return self._parse_file(file_path, raw)
+        
+        if st is None:
+            st = os.stat(file_path)
+        key = (file_path, st.st_mtime_ns, st.st_size)
+        with self._file_cache_lock:
+            cache = self._file_cache
+            if key in cache:
+                cache.move_to_end(key)
+                return copy.deepcopy(cache[key])
+        
+        data = self._parse_file(file_path, raw)
+        # None means the read was refused (e.g. pickle disabled)
+        if data is None or st.st_size > self._file_cache_max_bytes:
+            return data
+        with self._file_cache_lock:
+            cache = self._file_cache
+            if key not in cache:
+                cache[key] = data
+                self._file_cache_bytes += st.st_size
+                # Evict least recently used entries; key[2] is the file size
+                while (len(cache) > self._file_cache_size
+                       or self._file_cache_bytes > self._file_cache_max_bytes):
+                    self._file_cache_bytes -= cache.popitem(last=False)[0][2]
+        return copy.deepcopy(data)
+    
+    def _detect_format(self, file_path: AnyStr) -> str:
+        """Resolve the configured input format, auto-detecting from the extension."""
         input_format = self.config.get('input_format', 'auto')
         
         # Auto-detect format from extension
         if input_format == 'auto':
             _, ext = os.path.splitext(file_path)
+            if isinstance(ext, bytes):
+                ext = ext.decode('ascii', 'replace')
             ext = ext.lower().lstrip('.')
             
             if ext == 'json':
@@ -470,29 +829,79 @@ class MessageReaderNode(BaseNode):
             else:
                 input_format = 'raw'
         
+        return input_format
+    
+    def _parse_file(self, file_path: str, raw: Optional[bytes] = None) -> Any:
+        """Read and parse file data based on format."""
+        input_format = self._detect_format(file_path)
+        
         # Read based on format
         if input_format == 'json':
-            return self._read_json_file(file_path)
+            return self._read_json_file(file_path, raw)
         elif input_format == 'pickle':
-            return self._read_pickle_file(file_path)
+            return self._read_pickle_file(file_path, raw)
         elif input_format == 'numpy':
             return self._read_numpy_file(file_path)
-        elif input_format == 'text':
-            return self._read_text_file(file_path)
         elif input_format == 'raw':
-            return self._read_raw_file(file_path)
+            return self._read_raw_file(file_path, raw)
         else:
-            return self._read_text_file(file_path)  # Default fallback
+            return self._read_text_file(file_path, raw)  # text, and default fallback
     
-    def _read_json_file(self, file_path: str) -> Any:
+    def _iter_prefetched(self, file_paths: List[AnyStr]) -> Iterator[Tuple[AnyStr, Future]]:
+        """Yield ``(path, future)`` in order while a thread pool reads files ahead.
+
+        Each future resolves to the file's bytes, or None for formats that
+        are not parsed from bytes (memory-mapped .npy). File reads release
+        the GIL, so disk latency overlaps across files while the caller
+        parses on its own thread. At most two reads per worker are in
+        flight, which bounds the memory held by read-ahead. Empty and
+        single-file batches are read inline without a pool.
+        """
+        if len(file_paths) <= 1:
+            # Nothing to overlap: read inline rather than start a pool
+            for file_path in file_paths:
+                content: Future = Future()
+                try:
+                    content.set_result(self._read_bytes_for_parse(file_path))
+                except Exception as e:
+                    content.set_exception(e)
+                yield file_path, content
+            return
+        workers = min(_READ_WORKERS, len(file_paths))
+        paths = iter(file_paths)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='message-reader') as executor:
+            pending: Deque[Tuple[str, Future]] = deque()
+            for file_path in itertools.islice(paths, workers * 2):
+                pending.append((file_path, executor.submit(self._read_bytes_for_parse, file_path)))
+            while pending:
+                item = pending.popleft()
+                next_path = next(paths, None)
+                if next_path is not None:
+                    pending.append((next_path, executor.submit(self._read_bytes_for_parse, next_path)))
+                yield item
+    
+    def _read_bytes_for_parse(self, file_path: AnyStr) -> Optional[bytes]:
+        """Read a file's bytes ahead of parsing, or None if its format reads the file itself."""
+        if self._detect_format(file_path) == 'numpy':
+            return None
+        with _open_sequential(file_path, 'rb') as f:
+            return f.read()
+    
+    def _read_json_file(self, file_path: str, raw: Optional[bytes] = None) -> Any:
         """Read JSON file with numpy array reconstruction."""
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        if raw is None:
+            with _open_sequential(file_path, 'rb') as f:
+                raw = f.read()
+        data = _json_loads(raw)
         
-        # Recursively reconstruct numpy arrays
-        return self._reconstruct_numpy_arrays(data)
+        # A byte search (memchr-fast) is far cheaper than walking the parsed
+        # document, and most files contain no serialized arrays at all.
+        # The prefix covers both inline arrays and sidecar references.
+        if b'"_numpy_' not in raw:
+            return data
+        return self._reconstruct_numpy_arrays(data, os.path.dirname(file_path))
     
-    def _read_pickle_file(self, file_path: str) -> Any:
+    def _read_pickle_file(self, file_path: str, raw: Optional[bytes] = None) -> Any:
         """Read pickle file (only if explicitly allowed by config).
 
         Unpickling can execute arbitrary code, so it is gated behind the
@@ -507,62 +916,111 @@ class MessageReaderNode(BaseNode):
                 f"arbitrary code — only load trusted files. ({file_path})"
             )
             return None
-        with open(file_path, 'rb') as f:
-            return pickle.load(f)
+        if raw is None:
+            # Read the whole file into one buffer, then unpickle from memory:
+            # avoids pickle.load's many small buffered reads. readinto() on a
+            # raw file may return short, so keep going until full or EOF.
+            with _open_sequential(file_path, 'rb', buffering=0) as f:
+                view = memoryview(bytearray(os.fstat(f.fileno()).st_size))
+                got = 0
+                while got < len(view):
+                    n = f.readinto(view[got:])
+                    if not n:
+                        break
+                    got += n
+                raw = view[:got]
+        return pickle.loads(raw)
     
     def _read_numpy_file(self, file_path: str) -> Any:
         """Read numpy .npy file."""
         try:
             import numpy as np
+            threshold = self.get_config_float('mmap_threshold_mb', 16) * 1024 * 1024
+            if threshold > 0 and os.path.getsize(file_path) > threshold:
+                # Copy-on-write mapping: pages are read on demand and shared
+                # with the page cache, yet downstream nodes may still write
+                # to the array without touching the file.
+                return np.load(file_path, mmap_mode='c')
             return np.load(file_path)
         except ImportError:
             # Fallback to raw bytes if numpy not available
             return self._read_raw_file(file_path)
     
-    def _read_text_file(self, file_path: str) -> str:
+    def _read_text_file(self, file_path: str, raw: Optional[bytes] = None) -> str:
         """Read text file."""
-        with open(file_path, 'r', encoding='utf-8') as f:
+        if raw is not None:
+            # Same decoding and universal-newline handling as open(..., 'r')
+            return io.TextIOWrapper(io.BytesIO(raw), encoding='utf-8').read()
+        with _open_sequential(file_path, 'r', encoding='utf-8') as f:
             return f.read()
     
-    def _read_raw_file(self, file_path: str) -> bytes:
+    def _read_raw_file(self, file_path: str, raw: Optional[bytes] = None) -> bytes:
         """Read raw bytes."""
-        with open(file_path, 'rb') as f:
+        if raw is not None:
+            return raw
+        with _open_sequential(file_path, 'rb') as f:
             return f.read()
     
-    def _reconstruct_numpy_arrays(self, data: Any) -> Any:
-        """Recursively reconstruct numpy arrays from JSON serialization."""
-        if isinstance(data, dict):
-            if data.get('_numpy_array'):
-                # This is a serialized numpy array
-                try:
-                    import numpy as np
-                    array_bytes = base64.b64decode(data['data'])
-                    dtype = np.dtype(data['dtype'])
-                    shape = tuple(data['shape'])
-                    return np.frombuffer(array_bytes, dtype=dtype).reshape(shape)
-                except ImportError:
-                    # Return as dict if numpy not available
-                    return data
-                except Exception as e:
-                    self.report_error(f"Failed to reconstruct numpy array: {str(e)}")
-                    return data
-            else:
-                # Recursively process dictionary
-                return {key: self._reconstruct_numpy_arrays(value) for key, value in data.items()}
-        elif isinstance(data, list):
-            # Recursively process list
-            return [self._reconstruct_numpy_arrays(item) for item in data]
-        else:
-            # Return as-is for other types
+    def _reconstruct_numpy_arrays(self, data: Any, base_dir: str = '') -> Any:
+        """Reconstruct numpy arrays from JSON serialization.
+
+        Walks the parsed document with an explicit stack (no recursion limit
+        on deeply nested files) and replaces serialized arrays in place; the
+        document was just parsed, so nothing else references its containers.
+        Sidecar references are resolved relative to ``base_dir``.
+        """
+        if isinstance(data, dict) and (data.get('_numpy_array') or data.get('_numpy_ref')):
+            return self._decode_numpy_array(data, base_dir)
+        
+        stack = [data] if isinstance(data, (dict, list)) else []
+        while stack:
+            container = stack.pop()
+            items = container.items() if isinstance(container, dict) else enumerate(container)
+            for key, value in items:
+                if isinstance(value, dict):
+                    if value.get('_numpy_array') or value.get('_numpy_ref'):
+                        container[key] = self._decode_numpy_array(value, base_dir)
+                    else:
+                        stack.append(value)
+                elif isinstance(value, list):
+                    stack.append(value)
+        return data
+    
+    def _decode_numpy_array(self, data: Dict[str, Any], base_dir: str = '') -> Any:
+        """Decode one serialized numpy array, returning the dict unchanged on failure."""
+        try:
+            import numpy as np
+            if data.get('_numpy_ref'):
+                # Sidecar .npy written by MessageWriterNode; only the file
+                # name is used so a reference cannot point outside base_dir.
+                return np.load(os.path.join(base_dir, os.path.basename(data['_numpy_ref'])))
+            # a2b_base64 is what b64decode wraps; the array is a
+            # read-only view over the decoded bytes (no second copy).
+            array_bytes = _a2b_base64(data['data'])
+            dtype = np.dtype(data['dtype'])
+            shape = tuple(data['shape'])
+            return np.frombuffer(array_bytes, dtype=dtype).reshape(shape)
+        except ImportError:
+            # Return as dict if numpy not available
+            return data
+        except Exception as e:
+            self.report_error(f"Failed to reconstruct numpy array: {str(e)}")
             return data
     
-    def _get_file_metadata(self, file_path: str) -> Dict[str, Any]:
-        """Get file metadata."""
-        stat = os.stat(file_path)
-        return {
-            'size': stat.st_size,
-            'modified': stat.st_mtime,
-            'modified_iso': datetime.fromtimestamp(stat.st_mtime).isoformat(),
+    def _get_file_metadata(self, file_path: str, st: Optional[os.stat_result] = None) -> Dict[str, Any]:
+        """Get file metadata, from ``st`` when the caller already has the file's stat.
+
+        Building the datetime for modified_iso costs more than the rest of
+        the dict, so it is skipped when 'metadata_iso_time' is off.
+        """
+        if st is None:
+            st = os.stat(file_path)
+        metadata = {
+            'size': st.st_size,
+            'modified': st.st_mtime,
             'basename': os.path.basename(file_path),
             'extension': os.path.splitext(file_path)[1]
-        }
\ No newline at end of file
+        }
+        if self._metadata_iso_time:
+            metadata['modified_iso'] = datetime.fromtimestamp(st.st_mtime).isoformat()
+        return metadata
\ No newline at end of file
@@ -6,12 +6,181 @@ Supports dynamic filenames and flexible data extraction from messages.
 import os
 import json
 import pickle
+import queue
+import threading
 import time
 import base64
-from datetime import datetime
-from typing import Any, Dict
+import datetime
+import decimal
+import itertools
+import pathlib
+import uuid
+from collections import deque
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple, Union
 from pynode.nodes.base_node import BaseNode, Info, MessageKeys
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Imported once at module level: the JSON serializer hook runs for every
+# non-JSON value, so a per-call import would run per array/scalar.
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+
+def _json_dumps(data: Any, default, compact: bool = False) -> bytes:
+    """Serialize ``data`` to UTF-8 JSON bytes, using orjson when it is installed.
+
+    Matches the stdlib layout (2-space indent, or no whitespace when
+    ``compact``). orjson rejects some input the stdlib accepts, such as
+    integers wider than 64 bits; those documents are re-encoded with
+    ``json``. orjson writes NaN and Infinity as null.
+    """
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_NON_STR_KEYS
+        if not compact:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(data, default=default, option=option)
+        except orjson.JSONEncodeError:
+            pass
+    if compact:
+        return json.dumps(data, separators=(',', ':'), default=default).encode('utf-8')
+    return json.dumps(data, indent=2, default=default).encode('utf-8')
+
+# Gathered writes (one syscall for several buffers) are POSIX-only; the
+# per-call buffer count is capped at the usual IOV_MAX.
+_HAS_WRITEV = hasattr(os, 'writev')
+_IOV_MAX = 1024
+
+# Protocol 5 (PEP 574) lets numpy arrays hand their memory to the pickler as
+# a buffer that is written straight out, instead of being copied into an
+# intermediate bytes object first. Files stay loadable with plain pickle.load.
+_PICKLE_PROTOCOL = 5
+
+# Common non-JSON types, looked up by exact type before the isinstance and
+# str() fallbacks. datetime/date/time use ISO 8601, as orjson does natively,
+# so the stdlib and orjson paths produce the same text.
+_JSON_FALLBACK_HANDLERS = {
+    datetime.datetime: datetime.datetime.isoformat,
+    datetime.date: datetime.date.isoformat,
+    datetime.time: datetime.time.isoformat,
+    uuid.UUID: str,
+    decimal.Decimal: str,
+    pathlib.PosixPath: str,
+    pathlib.WindowsPath: str,
+}
+
+
+def _encode_ndarray(obj) -> Dict[str, Any]:
+    """Encode a numpy array as the base64 dict MessageReaderNode reconstructs."""
+    return {
+        "_numpy_array": True,
+        "data": base64.b64encode(obj.tobytes()).decode('utf-8'),
+        "dtype": str(obj.dtype),
+        "shape": obj.shape
+    }
+
+
+if NUMPY_AVAILABLE:
+    # The JSON encoders call back into Python for every numpy value; an exact
+    # type hit here skips the isinstance chain in _json_serializer. Subclasses
+    # still go through that chain.
+    _JSON_FALLBACK_HANDLERS[np.ndarray] = _encode_ndarray
+    for _code in np.typecodes['AllInteger']:
+        _JSON_FALLBACK_HANDLERS[np.dtype(_code).type] = int
+    for _code in np.typecodes['Float']:
+        _JSON_FALLBACK_HANDLERS[np.dtype(_code).type] = float
+    del _code
+
+# Queued writes handled per writer-thread wake-up (see _writer_loop).
+_WRITER_BATCH = 32
+
+# Directories already created or confirmed to exist, shared by all writers so
+# the per-message makedirs/exists syscalls happen once per directory. An
+# entry is dropped again if a write finds the directory gone.
+_known_dirs = set()
+
+
+def _datetime_stamp(ns: int) -> str:
+    """Format epoch nanoseconds as local 'YYYYmmdd_HHMMSS_mmm'.
+
+    Same result as ``datetime.now().strftime('%Y%m%d_%H%M%S_%f')[:-3]``
+    without building a datetime and parsing a strftime format per call.
+    """
+    seconds, ns = divmod(ns, 1_000_000_000)
+    t = time.localtime(seconds)
+    return '%04d%02d%02d_%02d%02d%02d_%03d' % (
+        t.tm_year, t.tm_mon, t.tm_mday, t.tm_hour, t.tm_min, t.tm_sec, ns // 1_000_000)
+
+
+def _write_file(path: str, data: Union[bytes, Sequence[Any]], overwrite: bool = True) -> int:
+    """Write ``data`` to ``path`` and return the byte count.
+
+    ``data`` is one bytes-like object or a sequence of them (e.g. contiguous
+    numpy arrays). The whole document is built in memory first, so this is
+    a single ``write()`` - or ``writev()`` for several buffers - for all but
+    very large writes. With ``overwrite`` False the file must not exist yet
+    (``O_EXCL``) and FileExistsError is raised otherwise.
+    """
+    flags = os.O_WRONLY | os.O_CREAT | getattr(os, 'O_BINARY', 0)
+    flags |= os.O_TRUNC if overwrite else os.O_EXCL
+    fd = os.open(path, flags, 0o644)
+    try:
+        return _write_all(fd, [data] if isinstance(data, (bytes, bytearray, memoryview)) else data)
+    finally:
+        os.close(fd)
+
+
+def _write_all(fd: int, buffers: Sequence[Any]) -> int:
+    """Write every buffer to ``fd`` in order, gathering them with ``writev`` where available."""
+    pending = deque(view for view in (memoryview(b).cast('B') for b in buffers) if view.nbytes)
+    total = sum(view.nbytes for view in pending)
+    while pending:
+        if _HAS_WRITEV and len(pending) > 1:
+            written = os.writev(fd, list(itertools.islice(pending, _IOV_MAX)))
+        else:
+            written = os.write(fd, pending[0])
+        # Drop what was written; a short write leaves the rest of a buffer
+        while written:
+            head = pending[0]
+            if written >= head.nbytes:
+                written -= head.nbytes
+                pending.popleft()
+            else:
+                pending[0] = head[written:]
+                written = 0
+    return total
+
+
+def _drop_from_page_cache(path: str):
+    """Flush a just-written file and tell the kernel its pages are not needed.
+
+    DONTNEED only releases clean pages, hence the fdatasync first. POSIX
+    only; errors are ignored since this is purely a hint.
+    """
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fdatasync(fd)
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
 _info = Info()
 _info.add_text("Writes messages or message components to disk. Supports JSON, binary, or text formats with dynamic filenames.")
 _info.add_header("Inputs")
@@ -68,10 +237,38 @@ class MessageWriterNode(BaseNode):
         'create_subdirs': 'true',
         'data_source': 'whole_message',
         'custom_path': f'{MessageKeys.MSG}.{MessageKeys.PAYLOAD}',
-        'output_format': 'json'
+        'output_format': 'json',
+        'numpy_inline': 'true',
+        'background_write': False,
+        'drop_page_cache': False,
+        'output_style': 'files',
+        'rotate_size_mb': '64'
     }
     
     properties = [
+        {
+            'name': 'output_style',
+            'label': 'Output Style',
+            'type': 'select',
+            'options': [
+                {'value': 'files', 'label': 'One file per message'},
+                {'value': 'jsonl', 'label': 'Append to one JSON Lines file'},
+                {'value': 'jsonl_rotate', 'label': 'Append to JSON Lines, rotating by size'}
+            ],
+            'default': DEFAULT_CONFIG['output_style'],
+            'help': 'JSON Lines styles append each message as one compact JSON line to '
+                    '<filename>.jsonl (or <filename>_0001.jsonl, _0002, ... when rotating), '
+                    'avoiding a file create per message. Readable with the Message Reader '
+                    '"JSON Lines" mode.'
+        },
+        {
+            'name': 'rotate_size_mb',
+            'label': 'Rotate After (MB)',
+            'type': 'text',
+            'default': DEFAULT_CONFIG['rotate_size_mb'],
+            'help': 'Start a new JSON Lines file once the current one would exceed this size',
+            'showIf': {'output_style': 'jsonl_rotate'}
+        },
         {
             'name': 'directory',
             'label': 'Output Directory',
@@ -158,6 +355,19 @@ class MessageWriterNode(BaseNode):
             'default': DEFAULT_CONFIG['output_format'],
             'help': 'How to format the data before writing'
         },
+        {
+            'name': 'numpy_inline',
+            'label': 'NumPy Arrays in JSON',
+            'type': 'select',
+            'options': [
+                {'value': 'true', 'label': 'Inline (base64 in the JSON file)'},
+                {'value': 'false', 'label': 'Sidecar .npy files'}
+            ],
+            'default': DEFAULT_CONFIG['numpy_inline'],
+            'help': 'Sidecar mode saves each array as <file>.arrN.npy next to the JSON file '
+                    'and stores only a reference, avoiding the base64 size and encode cost',
+            'showIf': {'output_format': ['json', 'json_compact']}
+        },
         {
             'name': 'overwrite',
             'label': 'Overwrite Existing',
@@ -179,104 +389,317 @@ class MessageWriterNode(BaseNode):
             ],
             'default': DEFAULT_CONFIG['create_subdirs'],
             'help': 'Create directory structure if it doesn\'t exist'
+        },
+        {
+            'name': 'background_write',
+            'label': 'Write in Background',
+            'type': 'checkbox',
+            'default': DEFAULT_CONFIG['background_write'],
+            'help': 'Queue files to a writer thread so slow disks do not stall the flow. '
+                    'Status messages are sent when each write completes.'
+        },
+        {
+            'name': 'drop_page_cache',
+            'label': 'Drop Written Files from Page Cache',
+            'type': 'checkbox',
+            'default': DEFAULT_CONFIG['drop_page_cache'],
+            'help': 'Flush each file to disk and release its cached pages, so long recordings '
+                    'do not evict other data from memory. Waits for the disk; best combined '
+                    'with Write in Background (POSIX only).'
         }
     ]
     
     def __init__(self, node_id=None, name="message writer"):
+        # JSON Lines output state; set before BaseNode.__init__ because it
+        # calls configure(), which closes any open file.
+        self._jsonl_lock = threading.Lock()
+        self._jsonl_fd: Optional[int] = None
+        self._jsonl_stem = ''
+        self._jsonl_path = ''
+        self._jsonl_part = 0
+        self._jsonl_bytes = 0
         super().__init__(node_id, name)
         self._counter = 0
         self._last_written = None
+        # Background writer (see 'background_write'); started on first use
+        self._write_queue: 'queue.Queue[Optional[tuple]]' = queue.Queue(maxsize=64)
+        self._writer_thread: Optional[threading.Thread] = None
+    
+    def configure(self, config: Dict[str, Any]):
+        """Apply config and cache the settings read on every message."""
+        super().configure(config)
+        self._directory = self.config.get('directory', './output')
+        self._filename = self.config.get('filename', 'message')
+        self._extension = self.config.get('extension', 'json')
+        self._naming_mode = self.config.get('naming_mode', 'counter')
+        try:
+            counter_digits = max(0, self.get_config_int('counter_digits', 4))
+        except (TypeError, ValueError):
+            counter_digits = 4
+            self.report_error(f"Invalid counter digits '{self.config.get('counter_digits')}', using 4")
+        self._counter_fmt = '%0{}d'.format(counter_digits)
+        self._overwrite = self.get_config_bool('overwrite', False)
+        self._create_subdirs = self.get_config_bool('create_subdirs', True)
+        self._data_source = self.config.get('data_source', 'whole_message')
+        self._custom_path = self.config.get('custom_path', 'msg.payload')
+        # Split once here rather than on every message
+        custom_path = self._custom_path
+        if custom_path.startswith('msg.'):
+            custom_path = custom_path[4:]
+        self._custom_parts = tuple(custom_path.split('.'))
+        self._output_format = self.config.get('output_format', 'json')
+        self._numpy_inline = self.get_config_bool('numpy_inline', True)
+        self._background_write = self.get_config_bool('background_write', False)
+        self._generate_filename = self._compile_filename_generator()
+        self._output_style = self.config.get('output_style', 'files')
+        # Only read when rotating, so a stale value cannot break other styles
+        self._rotate_bytes = 0
+        if self._output_style == 'jsonl_rotate':
+            try:
+                self._rotate_bytes = int(self.get_config_float('rotate_size_mb', 64) * 1024 * 1024)
+            except (TypeError, ValueError):
+                self._rotate_bytes = 64 * 1024 * 1024
+                self.report_error(
+                    f"Invalid rotation size '{self.config.get('rotate_size_mb')}', using 64 MB")
+        # Directory or file naming may have changed; reopen on the next record
+        self._close_jsonl()
+        self._drop_page_cache = self.get_config_bool('drop_page_cache', False)
     
     def on_input(self, msg: Dict[str, Any], input_index: int = 0):
         """
         Write message data to disk. Can write whole message or specific components.
         """
+        directory = self._directory
         try:
-            # Get directory from config
-            directory = self.config.get('directory', './output')
-            
             # Get filename/prefix - prioritize msg.fname over config
             if 'fname' in msg:
                 filename = str(msg['fname'])
             else:
-                filename = self.config.get('filename', 'message')
+                filename = self._filename
             
             # Get extension - prioritize msg.extension over config
             if 'extension' in msg:
                 extension = str(msg['extension']).lstrip('.')
             else:
-                extension = self.config.get('extension', 'json')
-            
-            # Generate full filename based on naming mode
-            naming_mode = self.config.get('naming_mode', 'counter')
-            full_filename = self._generate_filename(filename, extension, naming_mode, msg)
+                extension = self._extension
             
-            # Build full path
-            full_path = os.path.join(directory, full_filename)
+            if self._output_style == 'files':
+                # Generate full filename based on naming mode
+                full_filename = self._generate_filename(filename, extension)
+                
+                # Build full path
+                full_path = os.path.join(directory, full_filename)
             
             # Create directory if needed
-            create_subdirs = self.get_config_bool('create_subdirs', True)
-            if create_subdirs:
-                os.makedirs(directory, exist_ok=True)
-            elif not os.path.exists(directory):
-                self.report_error(f"Directory does not exist: {directory}")
+            if directory not in _known_dirs:
+                if self._create_subdirs:
+                    os.makedirs(directory, exist_ok=True)
+                elif not os.path.isdir(directory):
+                    self.report_error(f"Directory does not exist: {directory}")
+                    return
+                _known_dirs.add(directory)
+            
+            # Extract data to write based on data_source setting
+            data_to_write = self._extract_data(msg)
+            
+            if data_to_write is None:
+                self.report_error("No data found to write")
                 return
             
-            # Check if file exists and handle overwrite setting
-            overwrite = self.get_config_bool('overwrite', False)
-            if os.path.exists(full_path) and not overwrite:
+            topic = msg.get(MessageKeys.TOPIC)
+            if self._output_style == 'files':
+                write, args = self._write_and_report, (directory, full_path, full_filename, data_to_write,
+                                                       extension, self._counter, topic)
+            else:
+                self._counter += 1
+                write, args = self._append_record, (directory, filename, data_to_write, self._counter, topic)
+            
+            if self._background_write:
+                # Blocks while the queue is full, which bounds the memory held
+                # by pending writes and slows the upstream to disk speed.
+                self._start_writer()
+                self._write_queue.put((write, args))
+            else:
+                write(*args)
+            
+        except Exception as e:
+            self._report_write_error(e, directory, msg.get(MessageKeys.TOPIC))
+    
+    def _write_and_report(self, directory: str, full_path: str, full_filename: str, data: Any,
+                          extension: str, counter: int, topic: Optional[str]):
+        """Write one file and send the success/skipped/error status message."""
+        try:
+            # Write data based on output format. Without overwrite the file is
+            # created exclusively, so the existence check is part of the open.
+            try:
+                bytes_written = self._write_data(full_path, data, extension, self._overwrite)
+                if self._drop_page_cache:
+                    _drop_from_page_cache(full_path)
+            except FileExistsError:
                 output_msg = self.create_message(
                     payload={
                         'status': 'skipped',
                         'reason': 'file_exists',
                         'path': full_path
                     },
-                    topic=msg.get(MessageKeys.TOPIC, 'MessageWriter')
+                    topic='MessageWriter' if topic is None else topic
                 )
                 self.send(output_msg)
                 return
             
-            # Extract data to write based on data_source setting
-            data_to_write = self._extract_data(msg)
-            
-            if data_to_write is None:
-                self.report_error("No data found to write")
-                return
-            
-            # Write data based on output format
-            bytes_written = self._write_data(full_path, data_to_write, extension)
-            
             # Track last written file
             self._last_written = full_path
             
-            # Send success message
-            output_msg = self.create_message(
-                payload={
-                    'status': 'success',
-                    'path': full_path,
-                    'filename': full_filename,
-                    'bytes': bytes_written,
-                    'counter': self._counter,
-                    'data_source': self.config.get('data_source', 'whole_message')
-                },
-                topic=msg.get(MessageKeys.TOPIC, 'MessageWriter')
-            )
-            self.send(output_msg)
+            self._send_success(full_path, full_filename, bytes_written, counter, topic)
+            
+        except Exception as e:
+            self._report_write_error(e, directory, topic)
+    
+    def _append_record(self, directory: str, base: str, data: Any, counter: int, topic: Optional[str]):
+        """Append one compact JSON line to the JSON Lines output and send the status message."""
+        try:
+            record = _json_dumps(data, self._json_serializer, compact=True)
+            size = len(record) + 1
+            with self._jsonl_lock:
+                fd = self._open_jsonl(os.path.join(directory, base), size)
+                # Record and newline in one gathered write
+                _write_all(fd, (record, b'\n'))
+                self._jsonl_bytes += size
+                path = self._jsonl_path
+            
+            self._last_written = path
+            self._send_success(path, os.path.basename(path), size, counter, topic)
             
         except Exception as e:
-            self.report_error(f"Failed to write file: {str(e)}")
-            output_msg = self.create_message(
-                payload={
-                    'status': 'error',
-                    'error': str(e)
-                },
-                topic=msg.get(MessageKeys.TOPIC, 'MessageWriter/error')
-            )
-            self.send(output_msg)
+            self._report_write_error(e, directory, topic)
+    
+    def _open_jsonl(self, stem: str, size: int) -> int:
+        """Return the append fd for ``stem``, rotating first if ``size`` more bytes would not fit.
+
+        The file stays open between records, so appending costs one write
+        per message. Call with ``_jsonl_lock`` held.
+        """
+        rotate = self._rotate_bytes  # 0 unless output_style is jsonl_rotate
+        if self._jsonl_fd is not None and stem == self._jsonl_stem:
+            if not rotate or self._jsonl_bytes == 0 or self._jsonl_bytes + size <= rotate:
+                return self._jsonl_fd
+            part = self._jsonl_part + 1
+        else:
+            part = 1
+        if self._jsonl_fd is not None:
+            os.close(self._jsonl_fd)
+            self._jsonl_fd = None
+        
+        flags = os.O_WRONLY | os.O_CREAT | os.O_APPEND | getattr(os, 'O_BINARY', 0)
+        while True:
+            path = f"{stem}_{part:04d}.jsonl" if rotate else f"{stem}.jsonl"
+            fd = os.open(path, flags, 0o644)
+            written = os.fstat(fd).st_size
+            if not rotate or written == 0 or written + size <= rotate:
+                break
+            # Continue after parts already filled by an earlier run
+            os.close(fd)
+            part += 1
+        
+        self._jsonl_fd, self._jsonl_stem, self._jsonl_path = fd, stem, path
+        self._jsonl_part, self._jsonl_bytes = part, written
+        return fd
+    
+    def _close_jsonl(self):
+        """Close the JSON Lines output file if one is open."""
+        with self._jsonl_lock:
+            if self._jsonl_fd is not None:
+                os.close(self._jsonl_fd)
+                self._jsonl_fd = None
+    
+    def _send_success(self, path: str, filename: str, bytes_written: int, counter: int,
+                      topic: Optional[str]):
+        """Send the success status message, if anything is connected to receive it.
+
+        The writer is often the end of a flow; skipping the status message
+        there saves a message (and its uuid) per write.
+        """
+        if not self.outputs.get(0):
+            return
+        output_msg = self.create_message(
+            payload={
+                'status': 'success',
+                'path': path,
+                'filename': filename,
+                'bytes': bytes_written,
+                'counter': counter,
+                'data_source': self._data_source
+            },
+            topic='MessageWriter' if topic is None else topic
+        )
+        self.send(output_msg)
+    
+    def _report_write_error(self, error: Exception, directory: str, topic: Optional[str]):
+        """Report a failed write and send the error status message."""
+        if isinstance(error, FileNotFoundError):
+            # Directory removed since it was cached; check it again next time
+            _known_dirs.discard(directory)
+        self.report_error(f"Failed to write file: {str(error)}")
+        output_msg = self.create_message(
+            payload={
+                'status': 'error',
+                'error': str(error)
+            },
+            topic='MessageWriter/error' if topic is None else topic
+        )
+        self.send(output_msg)
+    
+    def _start_writer(self):
+        """Start the background writer thread if it is not running."""
+        if self._writer_thread is None or not self._writer_thread.is_alive():
+            self._writer_thread = threading.Thread(
+                target=self._writer_loop, name=f'message-writer-{self.id}', daemon=True)
+            self._writer_thread.start()
+    
+    def _writer_loop(self):
+        """Write queued files in order until the None sentinel arrives.
+
+        Each wake-up drains everything already queued (up to a cap), so a
+        burst of messages is written back to back without waiting on the
+        queue between files.
+        """
+        write_queue = self._write_queue
+        while True:
+            batch = [write_queue.get()]
+            try:
+                while len(batch) < _WRITER_BATCH:
+                    batch.append(write_queue.get_nowait())
+            except queue.Empty:
+                pass
+            stop = False
+            for item in batch:
+                try:
+                    if item is None:
+                        stop = True
+                    else:
+                        write, args = item
+                        write(*args)
+                finally:
+                    write_queue.task_done()
+            if stop:
+                return
+    
+    def flush(self):
+        """Block until every queued background write has completed."""
+        self._write_queue.join()
+    
+    def on_stop(self):
+        """Finish pending background writes and stop the writer thread."""
+        super().on_stop()
+        if self._writer_thread is not None and self._writer_thread.is_alive():
+            self._write_queue.put(None)
+            self._writer_thread.join(timeout=10.0)
+        self._writer_thread = None
+        self._close_jsonl()
     
     def _extract_data(self, msg: Dict[str, Any]) -> Any:
         """Extract data from message based on data_source configuration."""
-        data_source = self.config.get('data_source', 'whole_message')
+        data_source = self._data_source
         
         if data_source == 'whole_message':
             return msg
@@ -285,21 +708,13 @@ class MessageWriterNode(BaseNode):
         elif data_source == MessageKeys.TOPIC:
             return msg.get(MessageKeys.TOPIC)
         elif data_source == 'custom':
-            custom_path = self.config.get('custom_path', 'msg.payload')
-            return self._extract_custom_path(msg, custom_path)
+            return self._extract_custom_path(msg, self._custom_parts)
         else:
             return msg.get(MessageKeys.PAYLOAD)  # Default fallback
     
-    def _extract_custom_path(self, msg: Dict[str, Any], path: str) -> Any:
-        """Extract data using custom path like 'msg.payload.detections'."""
+    def _extract_custom_path(self, msg: Dict[str, Any], parts: Tuple[str, ...]) -> Any:
+        """Extract data using custom path like 'msg.payload.detections', pre-split into parts."""
         try:
-            # Remove 'msg.' prefix if present
-            if path.startswith('msg.'):
-                path = path[4:]
-            
-            # Split path into components
-            parts = path.split('.')
-            
             # Start with the message
             current = msg
             
@@ -318,172 +733,191 @@ class MessageWriterNode(BaseNode):
             return current
             
         except Exception as e:
-            self.report_error(f"Failed to extract custom path '{path}': {str(e)}")
+            self.report_error(f"Failed to extract custom path '{self._custom_path}': {str(e)}")
             return None
     
-    def _generate_filename(self, base: str, extension: str, mode: str, msg: Dict[str, Any]) -> str:
-        """Generate filename based on naming mode."""
-        
-        if mode == 'message':
-            # Use filename from message as-is (msg.fname already used for base)
-            return f"{base}.{extension}"
+    def _compile_filename_generator(self) -> Callable[[str, str], str]:
+        """Build the ``(base, extension) -> filename`` function for the naming mode.
+
+        Called from configure(), so per message there is no mode dispatch,
+        and whether the configured filename contains the mode's placeholder
+        is decided once (a msg.fname override is still checked per message).
+        """
+        mode = self._naming_mode
+        configured = self._filename
         
-        elif mode == 'counter':
-            # Increment counter
-            self._counter += 1
-            digits = self.get_config_int('counter_digits', 4)
-            counter_str = str(self._counter).zfill(digits)
+        if mode == 'counter':
+            fmt = self._counter_fmt
+            has_placeholder = '{counter}' in configured
             
-            # Replace {counter} placeholder if present, or append
-            if '{counter}' in base:
-                filename = base.replace('{counter}', counter_str)
-            else:
-                filename = f"{base}_{counter_str}"
-            
-            return f"{filename}.{extension}"
+            def generate(base: str, extension: str) -> str:
+                # One attribute load and one store per message
+                counter = self._counter + 1
+                self._counter = counter
+                counter_str = fmt % counter
+                # Replace {counter} placeholder if present, or append
+                if (has_placeholder if base is configured else '{counter}' in base):
+                    return f"{base.replace('{counter}', counter_str)}.{extension}"
+                return f"{base}_{counter_str}.{extension}"
+            return generate
         
-        elif mode == 'timestamp':
-            # Unix timestamp
-            timestamp = int(time.time() * 1000)  # milliseconds
-            
-            # Replace {timestamp} placeholder if present, or append
-            if '{timestamp}' in base:
-                filename = base.replace('{timestamp}', str(timestamp))
-            else:
-                filename = f"{base}_{timestamp}"
+        if mode == 'timestamp':
+            placeholder = '{timestamp}'
             
-            return f"{filename}.{extension}"
-        
+            def stamp() -> str:
+                return str(time.time_ns() // 1_000_000)  # milliseconds
         elif mode == 'datetime':
-            # Human-readable datetime
-            dt = datetime.now()
-            datetime_str = dt.strftime('%Y%m%d_%H%M%S_%f')[:-3]  # Include milliseconds
-            
-            # Replace {datetime} placeholder if present, or append
-            if '{datetime}' in base:
-                filename = base.replace('{datetime}', datetime_str)
-            else:
-                filename = f"{base}_{datetime_str}"
+            placeholder = '{datetime}'
             
-            return f"{filename}.{extension}"
-        
+            def stamp() -> str:
+                return _datetime_stamp(time.time_ns())  # Include milliseconds
         else:
-            # Default: just append extension
-            return f"{base}.{extension}"
+            # 'message' uses msg.fname as-is (already used for base); unknown
+            # modes just append the extension
+            return lambda base, extension: f"{base}.{extension}"
+        
+        has_placeholder = placeholder in configured
+        
+        def generate(base: str, extension: str) -> str:
+            value = stamp()
+            if (has_placeholder if base is configured else placeholder in base):
+                return f"{base.replace(placeholder, value)}.{extension}"
+            return f"{base}_{value}.{extension}"
+        return generate
     
-    def _write_data(self, path: str, data: Any, extension: str) -> int:
-        """Write data to file based on output_format configuration."""
-        output_format = self.config.get('output_format', 'json')
+    def _write_data(self, path: str, data: Any, extension: str, overwrite: bool = True) -> int:
+        """Write data to file based on output_format configuration.
+
+        With ``overwrite`` False an existing file is left untouched and
+        FileExistsError is raised.
+        """
+        output_format = self._output_format
+        mode = 'wb' if overwrite else 'xb'
+        # Set once this call has opened the file, so the str() fallback may
+        # replace its own partial output but never a file that was already there
+        created = False
         
         try:
             if output_format == 'json':
                 # Pretty-printed JSON with proper numpy array handling
-                json_str = json.dumps(data, indent=2, default=self._json_serializer)
-                with open(path, 'w', encoding='utf-8') as f:
-                    f.write(json_str)
-                return len(json_str.encode('utf-8'))
+                return self._write_json(path, data, overwrite)
             
             elif output_format == 'json_compact':
                 # Compact JSON with proper numpy array handling
-                json_str = json.dumps(data, separators=(',', ':'), default=self._json_serializer)
-                with open(path, 'w', encoding='utf-8') as f:
-                    f.write(json_str)
-                return len(json_str.encode('utf-8'))
+                return self._write_json(path, data, overwrite, compact=True)
             
             elif output_format == 'pickle':
                 # Pickle binary format
-                with open(path, 'wb') as f:
-                    pickle.dump(data, f)
-                return os.path.getsize(path)
+                with open(path, mode) as f:
+                    created = True
+                    pickle.dump(data, f, protocol=_PICKLE_PROTOCOL)
+                    return f.tell()  # bytes written; no stat of the file
             
             elif output_format == 'numpy':
                 # NumPy binary format (.npy)
-                try:
-                    import numpy as np
+                if NUMPY_AVAILABLE:
                     if isinstance(data, np.ndarray):
-                        np.save(path, data)
-                        return os.path.getsize(path)
+                        with open(path, mode) as f:
+                            created = True
+                            np.save(f, data)
+                            return f.tell()
                     else:
                         # If not a numpy array, try to convert it
                         np_data = np.array(data)
-                        np.save(path, np_data)
-                        return os.path.getsize(path)
-                except ImportError:
+                        with open(path, mode) as f:
+                            created = True
+                            np.save(f, np_data)
+                            return f.tell()
+                else:
                     # Fallback to pickle if numpy not available
-                    with open(path, 'wb') as f:
-                        pickle.dump(data, f)
-                    return os.path.getsize(path)
+                    with open(path, mode) as f:
+                        created = True
+                        pickle.dump(data, f, protocol=_PICKLE_PROTOCOL)
+                        return f.tell()
             
             elif output_format == 'text':
-                # String representation
-                text_data = str(data)
-                with open(path, 'w', encoding='utf-8') as f:
-                    f.write(text_data)
-                return len(text_data.encode('utf-8'))
+                # String representation, encoded once for both the write
+                # and the byte count
+                return _write_file(path, str(data).encode('utf-8'), overwrite)
             
             elif output_format == 'raw':
                 # Raw bytes - data must be bytes-like
                 if isinstance(data, bytes):
-                    with open(path, 'wb') as f:
-                        f.write(data)
-                    return len(data)
+                    return _write_file(path, data, overwrite)
                 elif isinstance(data, str):
                     # Convert string to bytes
-                    data_bytes = data.encode('utf-8')
-                    with open(path, 'wb') as f:
-                        f.write(data_bytes)
-                    return len(data_bytes)
+                    return _write_file(path, data.encode('utf-8'), overwrite)
                 else:
                     # Check if it's a numpy array
-                    try:
-                        import numpy as np
-                        if isinstance(data, np.ndarray):
-                            # Save as raw numpy bytes
-                            data_bytes = data.tobytes()
-                            with open(path, 'wb') as f:
-                                f.write(data_bytes)
-                            return len(data_bytes)
-                    except ImportError:
-                        pass
+                    if NUMPY_AVAILABLE and isinstance(data, np.ndarray):
+                        # Save as raw numpy bytes, straight from the array's
+                        # memory when it is contiguous (no tobytes() copy).
+                        # A flat uint8 view also covers dtypes that do not
+                        # export a buffer (datetime64, structured).
+                        try:
+                            raw = np.ascontiguousarray(data).reshape(-1).view(np.uint8)
+                        except (TypeError, ValueError):
+                            raw = data.tobytes()  # e.g. object arrays
+                        return _write_file(path, [raw], overwrite)
                     
                     # Try to convert to bytes via pickle
-                    data_bytes = pickle.dumps(data)
-                    with open(path, 'wb') as f:
-                        f.write(data_bytes)
-                    return len(data_bytes)
+                    return _write_file(path, pickle.dumps(data, protocol=_PICKLE_PROTOCOL), overwrite)
             
             else:
                 # Default to JSON
-                json_str = json.dumps(data, indent=2, default=self._json_serializer)
-                with open(path, 'w', encoding='utf-8') as f:
-                    f.write(json_str)
-                return len(json_str.encode('utf-8'))
+                return self._write_json(path, data, overwrite)
         
+        except FileExistsError:
+            raise
         except Exception as e:
-            # Fallback to string representation if serialization fails
-            text_data = str(data)
-            with open(path, 'w', encoding='utf-8') as f:
-                f.write(text_data)
-            return len(text_data.encode('utf-8'))
+            # Fallback to string representation if serialization fails. A
+            # partial file left by this call may be replaced; without
+            # overwrite, a file that was already there raises FileExistsError.
+            return _write_file(path, str(data).encode('utf-8'), overwrite or created)
+    
+    def _write_json(self, path: str, data: Any, overwrite: bool, compact: bool = False) -> int:
+        """Write data as JSON, with numpy arrays inline or in sidecar .npy files.
+
+        Sidecars are written after the JSON file so an existing file that is
+        skipped (no overwrite) leaves its sidecars untouched. The returned
+        byte count includes the sidecars.
+        """
+        if self._numpy_inline or not NUMPY_AVAILABLE:
+            return _write_file(path, _json_dumps(data, self._json_serializer, compact), overwrite)
+        
+        # Keyed by id() so an array referenced twice is saved once, and so a
+        # re-encode (orjson falling back to json) assigns the same names.
+        sidecars = {}
+        basename = os.path.basename(path)
+        
+        def default(obj):
+            if isinstance(obj, np.ndarray):
+                name = sidecars.setdefault(id(obj), (f"{basename}.arr{len(sidecars)}.npy", obj))[0]
+                return {"_numpy_ref": name, "dtype": str(obj.dtype), "shape": obj.shape}
+            return self._json_serializer(obj)
+        
+        bytes_written = _write_file(path, _json_dumps(data, default, compact), overwrite)
+        directory = os.path.dirname(path)
+        for name, array in sidecars.values():
+            with open(os.path.join(directory, name), 'wb') as f:
+                np.save(f, array)
+                bytes_written += f.tell()
+        return bytes_written
     
     def _json_serializer(self, obj):
         """Custom JSON serializer to handle numpy arrays and other special types."""
-        try:
-            import numpy as np
+        handler = _JSON_FALLBACK_HANDLERS.get(type(obj))
+        if handler is not None:
+            return handler(obj)
+        
+        if NUMPY_AVAILABLE:
             if isinstance(obj, np.ndarray):
                 # Convert numpy array to base64 string for JSON serialization
-                return {
-                    "_numpy_array": True,
-                    "data": base64.b64encode(obj.tobytes()).decode('utf-8'),
-                    "dtype": str(obj.dtype),
-                    "shape": obj.shape
-                }
+                return _encode_ndarray(obj)
             elif isinstance(obj, np.integer):
                 return int(obj)
             elif isinstance(obj, np.floating):
                 return float(obj)
-        except ImportError:
-            pass
         
         # Handle other types that aren't JSON serializable
         if hasattr(obj, '__dict__'):
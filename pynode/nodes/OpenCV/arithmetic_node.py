@@ -4,7 +4,7 @@ OpenCV Arithmetic Operations Node - performs pixel-wise arithmetic operations on
 
 import cv2
 import numpy as np
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from pynode.nodes.base_node import BaseNode, Info, MessageKeys
 
 _info = Info()
@@ -33,6 +33,12 @@ _info.add_bullets(
 _info.add_header("Output")
 _info.add_text("Outputs the resulting image from the arithmetic operation.")
 
+# cv2 constant used per frame, resolved once
+_GRAY2BGR = cv2.COLOR_GRAY2BGR
+
+# sqrt of every 8-bit value, rounded the same way convertScaleAbs rounds
+_SQRT_LUT = np.rint(np.sqrt(np.arange(256))).astype(np.uint8)
+
 
 class ArithmeticNode(BaseNode):
     """
@@ -153,7 +159,8 @@ class ArithmeticNode(BaseNode):
                 {'value': 'false', 'label': 'No'}
             ],
             'default': DEFAULT_CONFIG['clip_output'],
-            'help': 'Clip output values to valid range (0-255)'
+            'help': 'Clip output values to valid range (0-255). When off, multiply, divide, '
+                    'power and sqrt truncate and wrap out-of-range values instead'
         }
     ]
     
@@ -163,168 +170,265 @@ class ArithmeticNode(BaseNode):
         self._image2: Optional[np.ndarray] = None
         self._format_type: Optional[str] = None
         self._last_msg: Optional[Dict] = None
+        # Reused destinations for operand resizing (per input) and gray->BGR
+        # expansion; none of them is ever emitted as the node's output
+        self._resize_bufs: List[Optional[np.ndarray]] = [None, None]
+        self._bgr_buf: Optional[np.ndarray] = None
+    
+    def configure(self, config: Dict[str, Any]):
+        """Apply config and cache the parsed values read on every frame."""
+        super().configure(config)
+        self._operation = self.config.get('operation', 'add')
+        self._mode = self.config.get('mode', 'image')
+        self._auto_resize = self.config.get('auto_resize', 'true') == 'true'
+        self._resize_method = self.config.get('resize_method', 'resize_second')
+        self._clip_output = self.get_config_bool('clip_output', True)
+        # Constant mode defaults to 50, the power exponent to 2
+        self._constant = self._parse_float('constant', 50.0)
+        self._exponent = self._parse_float('constant', 2.0)
+        try:
+            self._weights = (float(self.config.get('alpha', '0.5')),
+                             float(self.config.get('beta', '0.5')),
+                             float(self.config.get('gamma', '0')))
+        except ValueError:
+            self._weights = (0.5, 0.5, 0.0)
+        # Constant-mode operands. A 4-tuple is broadcast by OpenCV as a
+        # per-channel Scalar for 1-4 channel images.
+        magnitude = min(abs(self._constant), 255.0)
+        self._scalar = (magnitude,) * 4
+        # Add/subtract collapse to a single saturating kernel: a negative
+        # constant always adds its magnitude
+        if self._operation == 'subtract' and self._constant >= 0:
+            self._offset_kernel = cv2.subtract
+        else:
+            self._offset_kernel = cv2.add
+        # Constant multiply/divide are a pure scale; dividing by 0 leaves the
+        # image unchanged
+        self._multiply_scale = abs(self._constant) / 255.0
+        self._divide_scale = 255.0 / abs(self._constant) if self._constant != 0 else 1.0
+        _, beta, gamma = self._weights
+        self._weighted_gamma = beta * magnitude + gamma
+        self._power_lut = self._build_power_lut(self._exponent)
+        self._unary = self._operation == 'sqrt'
+        self._operate = self._resolve_operation()
+    
+    @staticmethod
+    def _build_power_lut(exponent: float) -> np.ndarray:
+        """Tabulate 255 * (v / 255) ** exponent for every 8-bit value."""
+        with np.errstate(divide='ignore', over='ignore'):
+            table = np.power(np.arange(256) / 255.0, exponent) * 255.0
+        return np.clip(np.rint(np.nan_to_num(table, posinf=255.0)), 0, 255).astype(np.uint8)
+    
+    def _parse_float(self, key: str, default: float) -> float:
+        """Parse a float config value, falling back to default if malformed."""
+        try:
+            return float(self.config.get(key, default))
+        except (TypeError, ValueError):
+            return default
     
     def _resize_images(self, img1: np.ndarray, img2: np.ndarray) -> tuple:
         """Resize images based on configuration."""
         if img1.shape[:2] == img2.shape[:2]:
             return img1, img2
         
-        auto_resize = self.config.get('auto_resize', 'true') == 'true'
-        if not auto_resize:
+        if not self._auto_resize:
             # Just resize second to first as fallback
-            img2 = cv2.resize(img2, (img1.shape[1], img1.shape[0]))
+            img2 = self._resize_operand(img2, 1, (img1.shape[1], img1.shape[0]))
             return img1, img2
         
-        resize_method = self.config.get('resize_method', 'resize_second')
+        resize_method = self._resize_method
         
         h1, w1 = img1.shape[:2]
         h2, w2 = img2.shape[:2]
         
         if resize_method == 'resize_second':
-            img2 = cv2.resize(img2, (w1, h1))
+            img2 = self._resize_operand(img2, 1, (w1, h1))
         elif resize_method == 'resize_first':
-            img1 = cv2.resize(img1, (w2, h2))
+            img1 = self._resize_operand(img1, 0, (w2, h2))
         elif resize_method == 'resize_larger':
             target_w = max(w1, w2)
             target_h = max(h1, h2)
             if (h1, w1) != (target_h, target_w):
-                img1 = cv2.resize(img1, (target_w, target_h))
+                img1 = self._resize_operand(img1, 0, (target_w, target_h))
             if (h2, w2) != (target_h, target_w):
-                img2 = cv2.resize(img2, (target_w, target_h))
+                img2 = self._resize_operand(img2, 1, (target_w, target_h))
         elif resize_method == 'resize_smaller':
             target_w = min(w1, w2)
             target_h = min(h1, h2)
             if (h1, w1) != (target_h, target_w):
-                img1 = cv2.resize(img1, (target_w, target_h))
+                img1 = self._resize_operand(img1, 0, (target_w, target_h))
             if (h2, w2) != (target_h, target_w):
-                img2 = cv2.resize(img2, (target_w, target_h))
+                img2 = self._resize_operand(img2, 1, (target_w, target_h))
         
         return img1, img2
     
+    def _resize_operand(self, img: np.ndarray, slot: int, size: Tuple[int, int]) -> np.ndarray:
+        """Resize an operand into the buffer kept for its input slot."""
+        buf = self._resize_bufs[slot]
+        w, h = size
+        if (buf is None or buf.shape[:2] != (h, w) or buf.shape[2:] != img.shape[2:]
+                or buf.dtype != img.dtype):
+            buf = self._resize_bufs[slot] = cv2.resize(img, size)
+            return buf
+        return cv2.resize(img, size, dst=buf)
+    
     def _match_channels(self, img1: np.ndarray, img2: np.ndarray) -> tuple:
         """Ensure both images have the same number of channels."""
-        c1 = img1.shape[2] if len(img1.shape) == 3 else 1
-        c2 = img2.shape[2] if len(img2.shape) == 3 else 1
+        c1 = img1.shape[2] if img1.ndim == 3 else 1
+        c2 = img2.shape[2] if img2.ndim == 3 else 1
         
         if c1 == c2:
             return img1, img2
         
         # Convert grayscale to BGR if needed
         if c1 == 1 and c2 == 3:
-            img1 = cv2.cvtColor(img1, cv2.COLOR_GRAY2BGR)
+            img1 = self._gray_to_bgr(img1)
         elif c1 == 3 and c2 == 1:
-            img2 = cv2.cvtColor(img2, cv2.COLOR_GRAY2BGR)
+            img2 = self._gray_to_bgr(img2)
         
         return img1, img2
     
-    def _create_constant_image(self, img: np.ndarray, value: float) -> np.ndarray:
-        """Create a constant image matching the input dimensions."""
-        const_img = np.full_like(img, abs(value), dtype=np.float32)
-        return const_img
+    def _gray_to_bgr(self, gray: np.ndarray) -> np.ndarray:
+        """Expand a grayscale image to BGR, reusing the buffer from the last frame.
+        
+        The result is only ever an operand, never the node's output, so the
+        buffer can safely be overwritten on the next frame.
+        """
+        buf = self._bgr_buf
+        if buf is None or buf.shape[:2] != gray.shape[:2] or buf.dtype != gray.dtype:
+            buf = self._bgr_buf = cv2.cvtColor(gray, _GRAY2BGR)
+            return buf
+        return cv2.cvtColor(gray, _GRAY2BGR, dst=buf)
     
     def _perform_operation(self, img1: np.ndarray, img2: Optional[np.ndarray]) -> np.ndarray:
-        """Perform the configured arithmetic operation."""
-        operation = self.config.get('operation', 'add')
-        mode = self.config.get('mode', 'image')
-        clip_output = self.config.get('clip_output', 'true') == 'true'
+        """Perform the configured arithmetic operation.
         
-        # Convert to float for precision
-        img1_f = img1.astype(np.float32)
-        
-        # Handle single-image operations
-        if operation == 'sqrt':
-            result = np.sqrt(img1_f)
-            if clip_output:
-                result = np.clip(result, 0, 255)
-            return result.astype(np.uint8)
-        
-        # Get second operand (image or constant)
-        if mode == 'constant':
-            try:
-                const_value = float(self.config.get('constant', '50'))
-            except ValueError:
-                const_value = 50.0
-            img2_f = self._create_constant_image(img1, const_value)
-        else:
-            if img2 is None:
-                return img1
-            img1, img2 = self._resize_images(img1, img2)
-            img1, img2 = self._match_channels(img1, img2)  # type: ignore[reportArgumentType]
-            img1_f = img1.astype(np.float32)
-            img2_f = img2.astype(np.float32)
-        
-        # Perform operation
-        if operation == 'add':
-            result = cv2.add(img1, img2 if mode == 'image' else img2_f.astype(np.uint8))  # type: ignore[reportArgumentType]
-        elif operation == 'subtract':
-            if mode == 'constant':
-                const_value = float(self.config.get('constant', '50'))
-                if const_value >= 0:
-                    result = cv2.subtract(img1, img2_f.astype(np.uint8))
-                else:
-                    # Negative constant means add
-                    result = cv2.add(img1, np.full_like(img1, abs(const_value), dtype=np.uint8))
-            else:
-                result = cv2.subtract(img1, img2)  # type: ignore[reportArgumentType]
-        elif operation == 'multiply':
-            # Scale factor for multiply
-            result = img1_f * (img2_f / 255.0 if mode == 'image' else img2_f / 255.0)
-            if clip_output:
-                result = np.clip(result, 0, 255)
-            result = result.astype(np.uint8)
-        elif operation == 'divide':
-            # Avoid division by zero
-            img2_safe = np.where(img2_f == 0, 1, img2_f)
-            if mode == 'constant':
-                result = img1_f / (img2_safe / 255.0) if img2_f.mean() != 0 else img1_f
-            else:
-                result = (img1_f / img2_safe) * 255.0
-            if clip_output:
-                result = np.clip(result, 0, 255)
-            result = result.astype(np.uint8)
-        elif operation == 'weighted_add':
-            try:
-                alpha = float(self.config.get('alpha', '0.5'))
-                beta = float(self.config.get('beta', '0.5'))
-                gamma = float(self.config.get('gamma', '0'))
-            except ValueError:
-                alpha, beta, gamma = 0.5, 0.5, 0.0
-            
-            if mode == 'constant':
-                result = cv2.addWeighted(img1, alpha, img2_f.astype(np.uint8), beta, gamma)
-            else:
-                result = cv2.addWeighted(img1, alpha, img2, beta, gamma)  # type: ignore[reportArgumentType]
-        elif operation == 'absdiff':
-            if mode == 'constant':
-                result = cv2.absdiff(img1, img2_f.astype(np.uint8))
-            else:
-                result = cv2.absdiff(img1, img2)  # type: ignore[reportArgumentType]
-        elif operation == 'min':
-            if mode == 'constant':
-                result = np.minimum(img1_f, img2_f)
-            else:
-                result = np.minimum(img1_f, img2_f)
-            result = result.astype(np.uint8)
-        elif operation == 'max':
-            if mode == 'constant':
-                result = np.maximum(img1_f, img2_f)
-            else:
-                result = np.maximum(img1_f, img2_f)
-            result = result.astype(np.uint8)
-        elif operation == 'power':
-            try:
-                const_value = float(self.config.get('constant', '2'))
-            except ValueError:
-                const_value = 2.0
-            # Normalize, apply power, denormalize
-            result = np.power(img1_f / 255.0, const_value) * 255.0
-            if clip_output:
-                result = np.clip(result, 0, 255)
-            result = result.astype(np.uint8)
+        The operation was resolved to a callable in configure(). Every one
+        runs a saturating OpenCV kernel or table lookup directly on the 8-bit
+        images; a float32 intermediate is only created for sqrt and power on
+        wider input dtypes, or when clip_output is off.
+        """
+        # Single-image operations (sqrt) and constant mode need no second image
+        if self._unary or self._mode == 'constant':
+            return self._operate(img1, self._scalar)
+        if img2 is None:
+            return img1
+        img1, img2 = self._resize_images(img1, img2)
+        img1, img2 = self._match_channels(img1, img2)  # type: ignore[reportArgumentType]
+        return self._operate(img1, img2)
+    
+    def _resolve_operation(self) -> Callable[[np.ndarray, Any], np.ndarray]:
+        """Map the configured operation and mode to the function applied per frame."""
+        if self._mode == 'constant':
+            table = {
+                'add': self._offset_kernel,
+                'subtract': self._offset_kernel,
+                'multiply': self._multiply_constant,
+                'divide': self._divide_constant,
+                'weighted_add': self._weighted_add_constant,
+            }
         else:
-            result = img1
-        
-        return result
+            table = {
+                'add': cv2.add,
+                'subtract': cv2.subtract,
+                'multiply': self._multiply_images,
+                'divide': self._divide_images,
+                'weighted_add': self._weighted_add_images,
+            }
+        table.update({
+            'absdiff': cv2.absdiff,
+            'min': cv2.min,
+            'max': cv2.max,
+            'power': self._power,
+            'sqrt': self._sqrt,
+        })
+        if not self._clip_output:
+            # Unclipped results keep the float compute-and-cast path, which
+            # truncates and wraps rather than rounds and saturates
+            table.update({
+                'multiply': (self._multiply_constant_unclipped if self._mode == 'constant'
+                             else self._multiply_images_unclipped),
+                'divide': (self._divide_constant_unclipped if self._mode == 'constant'
+                           else self._divide_images_unclipped),
+                'power': self._power_unclipped,
+                'sqrt': self._sqrt_unclipped,
+            })
+        return table.get(self._operation, self._identity)
+    
+    @staticmethod
+    def _wrap_to_uint8(result: np.ndarray) -> np.ndarray:
+        """Cast a float result to uint8 without clipping (truncate, then wrap modulo 256)."""
+        with np.errstate(invalid='ignore'):
+            return result.astype(np.int64).astype(np.uint8)
+    
+    def _multiply_images(self, img1: np.ndarray, img2: np.ndarray) -> np.ndarray:
+        return cv2.multiply(img1, img2, scale=1.0 / 255.0)
+    
+    def _multiply_constant(self, img1: np.ndarray, scalar: Tuple[float, ...]) -> np.ndarray:
+        return cv2.convertScaleAbs(img1, alpha=self._multiply_scale)
+    
+    def _divide_images(self, img1: np.ndarray, img2: np.ndarray) -> np.ndarray:
+        # cv2.divide yields 0 wherever the divisor is 0
+        return cv2.divide(img1, img2, scale=255.0)
+    
+    def _divide_constant(self, img1: np.ndarray, scalar: Tuple[float, ...]) -> np.ndarray:
+        return cv2.convertScaleAbs(img1, alpha=self._divide_scale)
+    
+    def _weighted_add_images(self, img1: np.ndarray, img2: np.ndarray) -> np.ndarray:
+        alpha, beta, gamma = self._weights
+        return cv2.addWeighted(img1, alpha, img2, beta, gamma)
+    
+    def _weighted_add_constant(self, img1: np.ndarray, scalar: Tuple[float, ...]) -> np.ndarray:
+        alpha = self._weights[0]
+        # Only image 1 is read; convertScaleAbs is the cheaper fused kernel
+        # whenever the result cannot go negative
+        if alpha >= 0 and self._weighted_gamma >= 0:
+            return cv2.convertScaleAbs(img1, alpha=alpha, beta=self._weighted_gamma)
+        return cv2.addWeighted(img1, alpha, img1, 0.0, self._weighted_gamma)
+    
+    def _power(self, img1: np.ndarray, _operand: Any = None) -> np.ndarray:
+        if img1.dtype == np.uint8:
+            # 8-bit input has only 256 possible values: one table lookup
+            # per pixel replaces the float normalize/pow/denormalize
+            return cv2.LUT(img1, self._power_lut)
+        # Normalize while upcasting, raise to the power in place, then
+        # denormalize, clip and cast back to uint8 in a single pass
+        result = np.multiply(img1, np.float32(1.0 / 255.0), dtype=np.float32)
+        cv2.pow(result, self._exponent, dst=result)
+        return cv2.convertScaleAbs(result, alpha=255.0)
+    
+    def _sqrt(self, img1: np.ndarray, _operand: Any = None) -> np.ndarray:
+        if img1.dtype == np.uint8:
+            return cv2.LUT(img1, _SQRT_LUT)
+        return cv2.convertScaleAbs(cv2.sqrt(img1.astype(np.float32)))
+    
+    def _multiply_images_unclipped(self, img1: np.ndarray, img2: np.ndarray) -> np.ndarray:
+        return self._wrap_to_uint8(img1.astype(np.float32) * (img2.astype(np.float32) / 255.0))
+    
+    def _multiply_constant_unclipped(self, img1: np.ndarray, scalar: Tuple[float, ...]) -> np.ndarray:
+        return self._wrap_to_uint8(img1.astype(np.float32) * np.float32(self._multiply_scale))
+    
+    def _divide_images_unclipped(self, img1: np.ndarray, img2: np.ndarray) -> np.ndarray:
+        divisor = img2.astype(np.float32)
+        divisor[divisor == 0] = 1  # a zero divisor leaves the pixel scaled by 255
+        return self._wrap_to_uint8(img1.astype(np.float32) / divisor * 255.0)
+    
+    def _divide_constant_unclipped(self, img1: np.ndarray, scalar: Tuple[float, ...]) -> np.ndarray:
+        if self._constant == 0:
+            return img1.copy()
+        return self._wrap_to_uint8(img1.astype(np.float32) / np.float32(abs(self._constant) / 255.0))
+    
+    def _power_unclipped(self, img1: np.ndarray, _operand: Any = None) -> np.ndarray:
+        with np.errstate(divide='ignore', over='ignore'):
+            result = np.power(img1.astype(np.float32) / 255.0, self._exponent) * 255.0
+        return self._wrap_to_uint8(result)
+    
+    def _sqrt_unclipped(self, img1: np.ndarray, _operand: Any = None) -> np.ndarray:
+        return self._wrap_to_uint8(np.sqrt(img1.astype(np.float32)))
+    
+    def _identity(self, img1: np.ndarray, _operand: Any = None) -> np.ndarray:
+        # Copy: img1 may be the reused gray->BGR buffer
+        return img1.copy()
     
     def on_input(self, msg: Dict[str, Any], input_index: int = 0):
         """Process incoming image and perform arithmetic operation."""
@@ -345,11 +449,10 @@ class ArithmeticNode(BaseNode):
         else:
             self._image2 = img
         
-        operation = self.config.get('operation', 'add')
-        mode = self.config.get('mode', 'image')
+        mode = self._mode
         
         # Single-image operations (sqrt) only need image1
-        if operation == 'sqrt' and self._image1 is not None:
+        if self._unary and self._image1 is not None:
             result = self._perform_operation(self._image1, None)
             self._send_result(result, msg)
             return
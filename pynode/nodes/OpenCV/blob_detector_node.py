@@ -26,6 +26,48 @@ _info.add_bullets(
 )
 _info.add_header("Output")
 _info.add_text("Outputs image with keypoints drawn (optional) and msg.blobs containing detected blob data (normalized x, y, size).")
+_info.add_text("With Output Arrays enabled, msg.blobs_np holds the same data as NumPy columns: "
+               "xy and xy_px (N x 2), size, size_px, angle and response (N).")
+
+# cv2 constants used per frame, resolved once instead of on every access
+_BGR2GRAY = cv2.COLOR_BGR2GRAY
+_DRAW_RICH_KEYPOINTS = cv2.DRAW_MATCHES_FLAGS_DRAW_RICH_KEYPOINTS
+_KEYPOINT_COLOR = (0, 0, 255)
+
+
+def _keypoint_arrays(keypoints, w: int, h: int) -> Dict[str, np.ndarray]:
+    """Gather keypoint data into float64 columns, normalized with whole-array ops."""
+    if not keypoints:
+        empty = np.empty((0, 2), dtype=np.float64)
+        return {'xy': empty, 'xy_px': empty, 'size': empty[:, 0], 'size_px': empty[:, 0],
+                'angle': empty[:, 0], 'response': empty[:, 0]}
+    px = cv2.KeyPoint_convert(keypoints).astype(np.float64)
+    attrs = np.array([(kp.size, kp.angle, kp.response) for kp in keypoints], dtype=np.float64)
+    return {
+        'xy': px / (w, h),
+        'xy_px': px,
+        'size': attrs[:, 0] / w,
+        'size_px': attrs[:, 0],
+        'angle': attrs[:, 1],
+        'response': attrs[:, 2],
+    }
+
+
+def _arrays_to_blobs(arrays: Dict[str, np.ndarray]) -> List[Dict[str, float]]:
+    """Expand keypoint columns into the per-blob dicts of msg.blobs."""
+    # tolist() yields Python floats in one call instead of per-value float()
+    return [
+        {'x': x, 'y': y, 'size': size, 'x_px': x_px, 'y_px': y_px,
+         'size_px': size_px, 'angle': angle, 'response': response}
+        for (x, y), size, (x_px, y_px), size_px, angle, response
+        in zip(arrays['xy'].tolist(), arrays['size'].tolist(), arrays['xy_px'].tolist(),
+               arrays['size_px'].tolist(), arrays['angle'].tolist(), arrays['response'].tolist())
+    ]
+
+
+def _keypoints_to_blobs(keypoints, w: int, h: int) -> List[Dict[str, float]]:
+    """Convert keypoints to blob dicts with normalized coordinates."""
+    return _arrays_to_blobs(_keypoint_arrays(keypoints, w, h))
 
 
 class BlobDetectorNode(BaseNode):
@@ -50,7 +92,8 @@ class BlobDetectorNode(BaseNode):
         'min_convexity': 0.5,
         'min_inertia': 0.1,
         'filter_by_color': 'dark',
-        'draw_keypoints': 'yes'
+        'draw_keypoints': 'yes',
+        'output_arrays': False
     }
     
     properties = [
@@ -126,37 +169,43 @@ class BlobDetectorNode(BaseNode):
             ],
             'default': DEFAULT_CONFIG['draw_keypoints'],
             'help': 'Draw detected keypoints on output image'
+        },
+        {
+            'name': 'output_arrays',
+            'label': 'Output Arrays',
+            'type': 'checkbox',
+            'default': DEFAULT_CONFIG['output_arrays'],
+            'help': 'Also output msg.blobs_np: blob columns as NumPy arrays for vectorized consumers'
         }
     ]
     
     def __init__(self, node_id=None, name="blob detector"):
         super().__init__(node_id, name)
+        # Reused grayscale conversion target; only ever fed to the detector
+        self._gray_buf = None
     
-    def on_input(self, msg: Dict[str, Any], input_index: int = 0):
-        """Detect blobs in the input image."""
-        if MessageKeys.PAYLOAD not in msg:
-            self.send(msg)
-            return
+    def configure(self, config: Dict[str, Any]):
+        """Apply config and prepare the detector parameters.
         
-        # Decode image from any supported format
-        img, format_type = self.decode_image(msg[MessageKeys.PAYLOAD])
-        if img is None:
-            self.send(msg)
-            return
-        
-        h, w = img.shape[:2]
-        total_area = h * w
-        
-        # Setup SimpleBlobDetector parameters
+        Everything except the area limits is resolution independent, so the
+        detector itself is only rebuilt when the frame size (or config) changes.
+        """
+        super().configure(config)
+        try:
+            min_area = self.get_config_float('min_area', 0.0001)
+            max_area = self.get_config_float('max_area', 0.1)
+            min_circularity = self.get_config_float('min_circularity', 0.1)
+            min_convexity = self.get_config_float('min_convexity', 0.5)
+            min_inertia = self.get_config_float('min_inertia', 0.1)
+        except (TypeError, ValueError):
+            min_area, max_area, min_circularity, min_convexity, min_inertia = 0.0001, 0.1, 0.1, 0.5, 0.1
+            self.report_error("Invalid blob area or shape thresholds, using defaults")
         params = cv2.SimpleBlobDetector_Params()  # type: ignore[reportCallIssue]
         
-        # Area filter - convert normalized to pixels
+        # Area filter - set in pixels per frame size in _get_detector
         params.filterByArea = True
-        params.minArea = self.get_config_float('min_area', 0.0001) * total_area
-        params.maxArea = self.get_config_float('max_area', 0.1) * total_area
         
         # Circularity filter
-        min_circularity = self.get_config_float('min_circularity', 0.1)
         if min_circularity > 0:
             params.filterByCircularity = True
             params.minCircularity = min_circularity
@@ -165,7 +214,6 @@ class BlobDetectorNode(BaseNode):
             params.filterByCircularity = False
         
         # Convexity filter
-        min_convexity = self.get_config_float('min_convexity', 0.5)
         if min_convexity > 0:
             params.filterByConvexity = True
             params.minConvexity = min_convexity
@@ -174,7 +222,6 @@ class BlobDetectorNode(BaseNode):
             params.filterByConvexity = False
         
         # Inertia filter
-        min_inertia = self.get_config_float('min_inertia', 0.1)
         if min_inertia > 0:
             params.filterByInertia = True
             params.minInertiaRatio = min_inertia
@@ -190,12 +237,49 @@ class BlobDetectorNode(BaseNode):
             params.filterByColor = True
             params.blobColor = 0 if filter_color == 'dark' else 255
         
-        # Create detector
-        detector = cv2.SimpleBlobDetector_create(params)
+        self._params = params
+        self._min_area = min_area
+        self._max_area = max_area
+        self._draw_keypoints = self.get_config_bool('draw_keypoints', True)
+        self._output_arrays = self.get_config_bool('output_arrays', False)
+        self._detector = None
+        self._detector_size = None
+    
+    def _get_detector(self, h: int, w: int):
+        """Return the detector for this frame size, creating it on first use."""
+        detector = self._detector
+        if detector is None or self._detector_size != (h, w):
+            # Area filter - convert normalized to pixels
+            params = self._params
+            total_area = h * w
+            params.minArea = self._min_area * total_area
+            params.maxArea = self._max_area * total_area
+            detector = self._detector = cv2.SimpleBlobDetector_create(params)
+            self._detector_size = (h, w)
+        return detector
+    
+    def on_input(self, msg: Dict[str, Any], input_index: int = 0):
+        """Detect blobs in the input image."""
+        if MessageKeys.PAYLOAD not in msg:
+            self.send(msg)
+            return
+        
+        # Decode image from any supported format
+        img, format_type = self.decode_image(msg[MessageKeys.PAYLOAD])
+        if img is None:
+            self.send(msg)
+            return
+        
+        h, w = img.shape[:2]
+        detector = self._get_detector(h, w)
         
         # Convert to grayscale if needed
-        if len(img.shape) == 3:
-            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        if img.ndim == 3:
+            gray = self._gray_buf
+            if gray is None or gray.shape != (h, w) or gray.dtype != img.dtype:
+                gray = self._gray_buf = cv2.cvtColor(img, _BGR2GRAY)
+            else:
+                cv2.cvtColor(img, _BGR2GRAY, dst=gray)
         else:
             gray = img
         
@@ -203,25 +287,12 @@ class BlobDetectorNode(BaseNode):
         keypoints = detector.detect(gray)
         
         # Build blob data with normalized coordinates
-        blobs = []
-        for kp in keypoints:
-            blobs.append({
-                'x': float(kp.pt[0]) / w,
-                'y': float(kp.pt[1]) / h,
-                'size': float(kp.size) / w,
-                'x_px': float(kp.pt[0]),
-                'y_px': float(kp.pt[1]),
-                'size_px': float(kp.size),
-                'angle': float(kp.angle),
-                'response': float(kp.response)
-            })
+        arrays = _keypoint_arrays(keypoints, w, h)
+        blobs = _arrays_to_blobs(arrays)
         
         # Draw keypoints if requested
-        draw = self.get_config_bool('draw_keypoints', True)
-        if draw:
-            output = cv2.drawKeypoints(img, keypoints, np.array([]),
-                                       (0, 0, 255),
-                                       cv2.DRAW_MATCHES_FLAGS_DRAW_RICH_KEYPOINTS)
+        if self._draw_keypoints:
+            output = cv2.drawKeypoints(img, keypoints, None, _KEYPOINT_COLOR, _DRAW_RICH_KEYPOINTS)
         else:
             output = img
         
@@ -230,4 +301,6 @@ class BlobDetectorNode(BaseNode):
         msg[MessageKeys.PAYLOAD][MessageKeys.IMAGE.PATH] = self.encode_image(output, format_type)
         msg['blobs'] = blobs
         msg['blob_count'] = len(blobs)
+        if self._output_arrays:
+            msg['blobs_np'] = arrays
         self.send(msg)
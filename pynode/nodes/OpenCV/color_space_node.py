@@ -4,7 +4,7 @@ OpenCV Color Space Converter Node - converts between color spaces.
 
 import cv2
 import numpy as np
-from typing import Any, Dict
+from typing import Any, Dict, Tuple
 from pynode.nodes.base_node import BaseNode, process_image, Info
 
 _info = Info()
@@ -23,9 +23,61 @@ _info.add_bullets(
     ("YUV:", "Luminance and chrominance separation"),
     ("Grayscale:", "Single channel intensity")
 )
+_info.add_header("OpenCL")
+_info.add_text("When enabled and an OpenCL device is available, color frames of one megapixel or more are converted through cv2.UMat so OpenCV can offload the conversion. Multi-step conversions stay on the device until the final result is read back.")
 _info.add_header("Output")
 _info.add_text("Outputs the converted image in the target color space.")
 
+# Direct cvtColor codes between supported color spaces
+_CONVERSIONS = {
+    ('bgr', 'rgb'): cv2.COLOR_BGR2RGB,
+    ('bgr', 'gray'): cv2.COLOR_BGR2GRAY,
+    ('bgr', 'hsv'): cv2.COLOR_BGR2HSV,
+    ('bgr', 'hls'): cv2.COLOR_BGR2HLS,
+    ('bgr', 'lab'): cv2.COLOR_BGR2LAB,
+    ('bgr', 'yuv'): cv2.COLOR_BGR2YUV,
+    ('rgb', 'bgr'): cv2.COLOR_RGB2BGR,
+    ('rgb', 'gray'): cv2.COLOR_RGB2GRAY,
+    ('rgb', 'hsv'): cv2.COLOR_RGB2HSV,
+    ('rgb', 'hls'): cv2.COLOR_RGB2HLS,
+    ('rgb', 'lab'): cv2.COLOR_RGB2LAB,
+    ('rgb', 'yuv'): cv2.COLOR_RGB2YUV,
+    ('hsv', 'bgr'): cv2.COLOR_HSV2BGR,
+    ('hsv', 'rgb'): cv2.COLOR_HSV2RGB,
+    ('hls', 'bgr'): cv2.COLOR_HLS2BGR,
+    ('hls', 'rgb'): cv2.COLOR_HLS2RGB,
+    ('lab', 'bgr'): cv2.COLOR_LAB2BGR,
+    ('lab', 'rgb'): cv2.COLOR_LAB2RGB,
+    ('yuv', 'bgr'): cv2.COLOR_YUV2BGR,
+    ('yuv', 'rgb'): cv2.COLOR_YUV2RGB,
+    ('gray', 'bgr'): cv2.COLOR_GRAY2BGR,
+    ('gray', 'rgb'): cv2.COLOR_GRAY2RGB,
+}
+
+
+def _build_conversion_steps() -> Dict[Tuple[str, str], Tuple[int, ...]]:
+    """Map every supported (input, output) pair to its cvtColor code sequence.
+    
+    Pairs without a direct code go through BGR in two steps.
+    """
+    steps = {key: (code,) for key, code in _CONVERSIONS.items()}
+    spaces = {space for key in _CONVERSIONS for space in key}
+    for src in spaces:
+        to_bgr = _CONVERSIONS.get((src, 'bgr'))
+        if to_bgr is None:
+            continue
+        for dst in spaces:
+            from_bgr = _CONVERSIONS.get(('bgr', dst))
+            if src != dst and (src, dst) not in steps and from_bgr is not None:
+                steps[(src, dst)] = (to_bgr, from_bgr)
+    return steps
+
+
+_CONVERSION_STEPS = _build_conversion_steps()
+
+# Below this the UMat upload/download costs more than the conversion
+_UMAT_MIN_PIXELS = 1_000_000
+
 
 class ColorSpaceNode(BaseNode):
     """
@@ -44,7 +96,8 @@ class ColorSpaceNode(BaseNode):
     
     DEFAULT_CONFIG = {
         'input_space': 'bgr',
-        'output_space': 'gray'
+        'output_space': 'gray',
+        'use_opencl': False
     }
     
     properties = [
@@ -79,61 +132,44 @@ class ColorSpaceNode(BaseNode):
             ],
             'default': DEFAULT_CONFIG['output_space'],
             'help': 'Output image color space'
+        },
+        {
+            'name': 'use_opencl',
+            'label': 'Use OpenCL',
+            'type': 'checkbox',
+            'default': DEFAULT_CONFIG['use_opencl'],
+            'help': 'Convert large color frames via OpenCL when a device is available'
         }
     ]
     
     def __init__(self, node_id=None, name="color space"):
         super().__init__(node_id, name)
     
-    @process_image()
-    def on_input(self, image: np.ndarray, msg: Dict[str, Any], input_index: int = 0):
-        """Convert image color space."""
+    def configure(self, config: Dict[str, Any]):
+        """Apply config and resolve the cvtColor code sequence once."""
+        super().configure(config)
         input_space = self.config.get('input_space', 'bgr')
         output_space = self.config.get('output_space', 'gray')
-        
-        # No conversion needed if same
+        # No conversion needed if same; unsupported pairs pass through
         if input_space == output_space:
-            return image
-        
-        # Define conversion codes
-        conversions = {
-            ('bgr', 'rgb'): cv2.COLOR_BGR2RGB,
-            ('bgr', 'gray'): cv2.COLOR_BGR2GRAY,
-            ('bgr', 'hsv'): cv2.COLOR_BGR2HSV,
-            ('bgr', 'hls'): cv2.COLOR_BGR2HLS,
-            ('bgr', 'lab'): cv2.COLOR_BGR2LAB,
-            ('bgr', 'yuv'): cv2.COLOR_BGR2YUV,
-            ('rgb', 'bgr'): cv2.COLOR_RGB2BGR,
-            ('rgb', 'gray'): cv2.COLOR_RGB2GRAY,
-            ('rgb', 'hsv'): cv2.COLOR_RGB2HSV,
-            ('rgb', 'hls'): cv2.COLOR_RGB2HLS,
-            ('rgb', 'lab'): cv2.COLOR_RGB2LAB,
-            ('rgb', 'yuv'): cv2.COLOR_RGB2YUV,
-            ('hsv', 'bgr'): cv2.COLOR_HSV2BGR,
-            ('hsv', 'rgb'): cv2.COLOR_HSV2RGB,
-            ('hls', 'bgr'): cv2.COLOR_HLS2BGR,
-            ('hls', 'rgb'): cv2.COLOR_HLS2RGB,
-            ('lab', 'bgr'): cv2.COLOR_LAB2BGR,
-            ('lab', 'rgb'): cv2.COLOR_LAB2RGB,
-            ('yuv', 'bgr'): cv2.COLOR_YUV2BGR,
-            ('yuv', 'rgb'): cv2.COLOR_YUV2RGB,
-            ('gray', 'bgr'): cv2.COLOR_GRAY2BGR,
-            ('gray', 'rgb'): cv2.COLOR_GRAY2RGB,
-        }
-        
-        conversion_key = (input_space, output_space)
-        
-        if conversion_key in conversions:
-            result = cv2.cvtColor(image, conversions[conversion_key])
+            self._codes = ()
         else:
-            # Try two-step conversion via BGR
-            if input_space != 'bgr' and (input_space, 'bgr') in conversions:
-                temp = cv2.cvtColor(image, conversions[(input_space, 'bgr')])
-                if ('bgr', output_space) in conversions:
-                    result = cv2.cvtColor(temp, conversions[('bgr', output_space)])
-                else:
-                    result = temp
-            else:
-                result = image
-        
-        return result
+            self._codes = _CONVERSION_STEPS.get((input_space, output_space), ())
+        # Only probe for OpenCL when asked to; the probe initializes the runtime.
+        # The process-wide OpenCL switch is respected, never flipped: other
+        # nodes share it.
+        self._use_umat = (bool(self._codes) and self.get_config_bool('use_opencl', False)
+                          and cv2.ocl.haveOpenCL() and cv2.ocl.useOpenCL())
+    
+    @process_image()
+    def on_input(self, image: np.ndarray, msg: Dict[str, Any], input_index: int = 0):
+        """Convert image color space."""
+        if (self._use_umat and image.ndim == 3
+                and image.shape[0] * image.shape[1] >= _UMAT_MIN_PIXELS):
+            umat = cv2.UMat(image)
+            for code in self._codes:
+                umat = cv2.cvtColor(umat, code)
+            return umat.get()
+        for code in self._codes:
+            image = cv2.cvtColor(image, code)
+        return image
@@ -3,9 +3,11 @@ OpenCV Contours Node - finds contours in binary images.
 Detects and analyzes contours for shape detection.
 """
 
+from itertools import compress
+
 import cv2
 import numpy as np
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
 from pynode.nodes.base_node import BaseNode, Info, MessageKeys
 
 _info = Info()
@@ -26,6 +28,109 @@ _info.add_bullets(
     ("Min/Max Area:", "Filter contours by area (normalized 0.0-1.0)")
 )
 
+# Config option -> OpenCV constant
+_MODE_MAP = {
+    'external': cv2.RETR_EXTERNAL,
+    'list': cv2.RETR_LIST,
+    'tree': cv2.RETR_TREE,
+    'ccomp': cv2.RETR_CCOMP
+}
+_APPROX_MAP = {
+    'none': cv2.CHAIN_APPROX_NONE,
+    'simple': cv2.CHAIN_APPROX_SIMPLE,
+    'tc89_l1': cv2.CHAIN_APPROX_TC89_L1,
+    'tc89_kcos': cv2.CHAIN_APPROX_TC89_KCOS
+}
+
+
+def _contour_geometry(contours) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Bounding boxes, centroids and perimeters of many contours in one vectorized pass.
+    
+    Equivalent to cv2.boundingRect, cv2.arcLength(closed=True) and the
+    m10/m00, m01/m00 centroid of cv2.moments per contour (falling back to
+    the box centre for degenerate contours), without three OpenCV calls and
+    a 24-entry moments dict each. The polygon moments are accumulated as
+    exact integer sums; segment lengths are rounded to float32 like
+    arcLength does, so perimeters match it exactly.
+    
+    Returns (N, 4) int64 boxes as x, y, width, height, (N, 2) int64
+    centroids and (N,) float64 perimeters.
+    """
+    if not contours:
+        return (np.empty((0, 4), dtype=np.int64), np.empty((0, 2), dtype=np.int64),
+                np.empty(0, dtype=np.float64))
+    counts = np.fromiter((len(c) for c in contours), dtype=np.intp, count=len(contours))
+    starts = np.zeros_like(counts)
+    np.cumsum(counts[:-1], out=starts[1:])
+    pts = np.concatenate(contours).reshape(-1, 2).astype(np.int64)
+    x, y = pts[:, 0], pts[:, 1]
+    
+    # Next vertex of each (closed) contour
+    nxt = np.arange(1, len(pts) + 1)
+    nxt[starts + counts - 1] = starts
+    x1, y1 = x[nxt], y[nxt]
+    
+    # Green's theorem: 2*m00, 6*m10 and 6*m01 per contour
+    cross = x * y1 - x1 * y
+    a2 = np.add.reduceat(cross, starts)
+    m10_6 = np.add.reduceat((x + x1) * cross, starts)
+    m01_6 = np.add.reduceat((y + y1) * cross, starts)
+    
+    dx, dy = x1 - x, y1 - y
+    segments = np.sqrt((dx * dx + dy * dy).astype(np.float32)).astype(np.float64)
+    perimeters = np.add.reduceat(segments, starts)
+    
+    x_min = np.minimum.reduceat(x, starts)
+    y_min = np.minimum.reduceat(y, starts)
+    bw = np.maximum.reduceat(x, starts) - x_min + 1
+    bh = np.maximum.reduceat(y, starts) - y_min + 1
+    
+    # Truncated like int(m10 / m00); box centre where m00 == 0
+    nonzero = a2 != 0
+    denom = np.where(nonzero, 3 * a2, 1)
+    cx = np.where(nonzero, np.trunc(m10_6 / denom), x_min + bw // 2).astype(np.int64)
+    cy = np.where(nonzero, np.trunc(m01_6 / denom), y_min + bh // 2).astype(np.int64)
+    
+    return np.stack([x_min, y_min, bw, bh], axis=1), np.stack([cx, cy], axis=1), perimeters
+
+
+def _build_contour_data(areas: np.ndarray, perimeters_px: np.ndarray, boxes: np.ndarray,
+                        centroids: np.ndarray, w: int, h: int) -> List[Dict[str, Any]]:
+    """Normalize contour measurements as whole columns, then emit one dict per contour."""
+    areas_px = np.asarray(areas, dtype=np.float64)
+    boxes_f = boxes.astype(np.float64)
+    scale = np.array([w, h, w, h], dtype=np.float64)
+    
+    # Circularity
+    with np.errstate(divide='ignore', invalid='ignore'):
+        circularity = np.where(perimeters_px > 0,
+                               4 * np.pi * areas_px / (perimeters_px * perimeters_px), 0.0)
+    # Bounding rects are at least one pixel high
+    aspect = boxes_f[:, 2] / boxes_f[:, 3]
+    
+    # tolist() yields Python ints/floats in one call per column
+    return [
+        {
+            'index': i,
+            'area': area, 'area_px': area_px,
+            'perimeter': perimeter, 'perimeter_px': perimeter_px,
+            'bbox': {
+                'x': bx, 'y': by, 'width': bw, 'height': bh,
+                'x_px': x_px, 'y_px': y_px, 'width_px': w_px, 'height_px': h_px
+            },
+            'centroid': {'x': cx, 'y': cy, 'x_px': cx_px, 'y_px': cy_px},
+            'circularity': circ,
+            'aspect_ratio': ratio
+        }
+        for i, (area, area_px, perimeter, perimeter_px, (bx, by, bw, bh), (x_px, y_px, w_px, h_px),
+                (cx, cy), (cx_px, cy_px), circ, ratio)
+        in enumerate(zip((areas_px / (w * h)).tolist(), areas_px.tolist(),
+                         (perimeters_px / (w + h)).tolist(), perimeters_px.tolist(),
+                         (boxes_f / scale).tolist(), boxes.tolist(),
+                         (centroids / scale[:2]).tolist(), centroids.tolist(),
+                         circularity.tolist(), aspect.tolist()))
+    ]
+
 
 class ContoursNode(BaseNode):
     info = str(_info)
@@ -124,6 +229,24 @@ class ContoursNode(BaseNode):
     
     def __init__(self, node_id=None, name="find contours"):
         super().__init__(node_id, name)
+        # Reused grayscale conversion target; only ever fed to findContours
+        self._gray_buf = None
+    
+    def configure(self, config: Dict[str, Any]):
+        """Apply config and resolve the OpenCV options once."""
+        super().configure(config)
+        self._mode = _MODE_MAP.get(self.config.get('mode', 'external'), cv2.RETR_EXTERNAL)
+        self._approx = _APPROX_MAP.get(self.config.get('approximation', 'simple'),
+                                       cv2.CHAIN_APPROX_SIMPLE)
+        # Areas stay normalized here; they are scaled per frame size
+        try:
+            self._min_area = self.get_config_float('min_area', 0.001)
+            self._max_area = self.get_config_float('max_area', 0.0)
+        except (TypeError, ValueError):
+            self._min_area, self._max_area = 0.001, 0.0
+            self.report_error("Invalid contour area limits, using defaults")
+        self._draw_contours = self.get_config_bool('draw_contours', True)
+        self._draw_bboxes = self.get_config_bool('draw_bboxes', False)
     
     def on_input(self, msg: Dict[str, Any], input_index: int = 0):
         """Find contours in the input image."""
@@ -137,106 +260,53 @@ class ContoursNode(BaseNode):
             self.send(msg)
             return
         
-        # Get parameters
-        mode_str = self.config.get('mode', 'external')
-        approx_str = self.config.get('approximation', 'simple')
-        
         h, w = img.shape[:2]
         total_area = h * w
         
         # Convert normalized area to pixels
-        min_area = self.get_config_float('min_area', 0.001) * total_area
-        max_area_norm = self.get_config_float('max_area', 0.0)
-        max_area = max_area_norm * total_area if max_area_norm > 0 else 0
+        min_area = self._min_area * total_area
+        max_area = self._max_area * total_area if self._max_area > 0 else 0
         
-        # Map mode string to OpenCV constant
-        mode_map = {
-            'external': cv2.RETR_EXTERNAL,
-            'list': cv2.RETR_LIST,
-            'tree': cv2.RETR_TREE,
-            'ccomp': cv2.RETR_CCOMP
-        }
-        mode = mode_map.get(mode_str, cv2.RETR_EXTERNAL)
-        
-        # Map approximation string to OpenCV constant
-        approx_map = {
-            'none': cv2.CHAIN_APPROX_NONE,
-            'simple': cv2.CHAIN_APPROX_SIMPLE,
-            'tc89_l1': cv2.CHAIN_APPROX_TC89_L1,
-            'tc89_kcos': cv2.CHAIN_APPROX_TC89_KCOS
-        }
-        approx = approx_map.get(approx_str, cv2.CHAIN_APPROX_SIMPLE)
-        
-        # Convert to grayscale if needed for contour finding
-        if len(img.shape) == 3:
-            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        # Convert to grayscale if needed for contour finding. findContours
+        # leaves its input untouched (OpenCV >= 3.2), so gray input is used
+        # as-is instead of being copied.
+        is_color = img.ndim == 3
+        if is_color:
+            gray = self._gray_buf
+            if gray is None or gray.shape != (h, w) or gray.dtype != img.dtype:
+                gray = self._gray_buf = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+            else:
+                cv2.cvtColor(img, cv2.COLOR_BGR2GRAY, dst=gray)
         else:
-            gray = img.copy()
+            gray = img
         
         # Find contours
-        contours, hierarchy = cv2.findContours(gray, mode, approx)
+        contours, hierarchy = cv2.findContours(gray, self._mode, self._approx)
         
-        # Filter and analyze contours
-        contour_data = []
-        filtered_contours = []
+        # Filter contours by area with one mask over all areas
+        all_areas = np.fromiter(map(cv2.contourArea, contours),
+                                dtype=np.float64, count=len(contours))
+        keep = all_areas >= min_area
+        if max_area > 0:
+            keep &= all_areas <= max_area
+        filtered_contours = list(compress(contours, keep.tolist()))
+        areas = all_areas[keep]
         
-        for i, cnt in enumerate(contours):
-            area = cv2.contourArea(cnt)
-            
-            # Filter by area
-            if area < min_area:
-                continue
-            if max_area > 0 and area > max_area:
-                continue
-            
-            filtered_contours.append(cnt)
-            
-            # Calculate properties
-            perimeter = cv2.arcLength(cnt, True)
-            x, y, bw, bh = cv2.boundingRect(cnt)
-            
-            # Centroid
-            M = cv2.moments(cnt)
-            if M['m00'] != 0:
-                cx = int(M['m10'] / M['m00'])
-                cy = int(M['m01'] / M['m00'])
-            else:
-                cx, cy = x + bw // 2, y + bh // 2
-            
-            # Circularity
-            circularity = 0
-            if perimeter > 0:
-                circularity = 4 * np.pi * area / (perimeter * perimeter)
-            
-            contour_data.append({
-                'index': len(contour_data),
-                'area': float(area) / total_area,
-                'area_px': float(area),
-                'perimeter': float(perimeter) / (w + h),
-                'perimeter_px': float(perimeter),
-                'bbox': {
-                    'x': float(x) / w, 'y': float(y) / h,
-                    'width': float(bw) / w, 'height': float(bh) / h,
-                    'x_px': int(x), 'y_px': int(y),
-                    'width_px': int(bw), 'height_px': int(bh)
-                },
-                'centroid': {
-                    'x': float(cx) / w, 'y': float(cy) / h,
-                    'x_px': cx, 'y_px': cy
-                },
-                'circularity': float(circularity),
-                'aspect_ratio': float(bw) / float(bh) if bh > 0 else 0
-            })
+        # Bounding boxes, centroids and perimeters for all kept contours in one pass
+        boxes, centroids, perimeters = _contour_geometry(filtered_contours)
+        
+        contour_data = _build_contour_data(areas, perimeters, boxes, centroids, w, h)
         
         # Draw contours if requested
-        draw_contours = self.get_config_bool('draw_contours', True)
-        draw_bboxes = self.get_config_bool('draw_bboxes', False)
+        draw_contours = self._draw_contours
+        draw_bboxes = self._draw_bboxes
         
-        # Ensure we have a color image to draw on
-        if len(img.shape) == 2:
-            output = cv2.cvtColor(img, cv2.COLOR_GRAY2BGR)
+        if not (draw_contours or draw_bboxes):
+            # Nothing to draw: pass the input frame through untouched
+            output = img
         else:
-            output = img.copy()
+            # Ensure we have a color image to draw on
+            output = img.copy() if is_color else cv2.cvtColor(img, cv2.COLOR_GRAY2BGR)
         
         if draw_contours:
             cv2.drawContours(output, filtered_contours, -1, (0, 255, 0), 2)
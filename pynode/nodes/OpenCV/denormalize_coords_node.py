@@ -2,8 +2,12 @@
 Denormalize Coordinates Node - converts normalized coordinates (0.0-1.0) to pixels.
 """
 
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
 from pynode.nodes.base_node import BaseNode, Info, MessageKeys
+from pynode.nodes.image_utils import peek_image_size
 
 _info = Info()
 _info.add_text("Converts normalized coordinates (0.0-1.0) to pixel coordinates. Useful for applying normalized detections to images of different sizes.")
@@ -23,6 +27,20 @@ _info.add_bullets(
 _info.add_header("Output")
 _info.add_text("Same structure with coordinates converted to pixel values for the target image size.")
 
+# Detection/shape fields scaled by the image width and height respectively
+_X_KEYS = frozenset({'x', 'cx', 'center_x', 'x1', 'x2', 'width', 'w', 'radius', 'size'})
+_Y_KEYS = frozenset({'y', 'cy', 'center_y', 'y1', 'y2', 'height', 'h'})
+
+# Message (and payload) keys that can hold normalized coordinates
+_COORD_KEYS = ('detections', 'predictions', 'shapes', 'bbox', 'points',
+               'circles', 'lines', 'contours', 'blobs')
+_PAYLOAD_COORD_KEYS = ('detections', 'bbox', 'points')
+_DETECTION_LIST_KEYS = ('detections', 'predictions', 'shapes', 'circles', 'lines',
+                        'contours', 'blobs')
+
+# Below this many list-style bboxes/points the NumPy setup costs more than it saves
+_BATCH_MIN_ITEMS = 8
+
 
 class DenormalizeCoordsNode(BaseNode):
     """
@@ -109,7 +127,12 @@ class DenormalizeCoordsNode(BaseNode):
                 if w > 0 and h > 0:
                     return w, h
             
-            # Try decoding image to get dimensions
+            # Read the size from the array shape or encoded header if possible
+            size = peek_image_size(payload)
+            if size is not None:
+                return size
+            
+            # Fall back to decoding the image to get dimensions
             img, _ = self.decode_image(payload)
             if img is not None:
                 return img.shape[1], img.shape[0]
@@ -127,14 +150,17 @@ class DenormalizeCoordsNode(BaseNode):
         if value is None:
             return None
         result = float(value) * dimension
-        return int(round(result)) if as_int else result
+        # round() without ndigits already returns an int (half to even, like np.rint)
+        return round(result) if as_int else result
     
     def _denormalize_bbox(self, bbox, w: int, h: int, as_int: bool) -> Any:
         """Denormalize a bounding box."""
         output_format = self.config.get('bbox_format', 'xyxy')
         
         if isinstance(bbox, (list, tuple)) and len(bbox) >= 4:
-            # Assume normalized xyxy input
+            # Assume xyxy input; a first value outside 0-1 means pixels already
+            if not self._is_normalized(bbox[0]):
+                return list(bbox)
             x1 = self._to_pixel(bbox[0], w, as_int)
             y1 = self._to_pixel(bbox[1], h, as_int)
             x2 = self._to_pixel(bbox[2], w, as_int)
@@ -148,7 +174,7 @@ class DenormalizeCoordsNode(BaseNode):
                 bw = x2 - x1
                 bh = y2 - y1
                 if as_int:
-                    result = [int(round(cx)), int(round(cy)), int(round(bw)), int(round(bh))]
+                    result = [round(cx), round(cy), round(bw), round(bh)]
                 else:
                     result = [cx, cy, bw, bh]
             else:  # xyxy
@@ -161,10 +187,17 @@ class DenormalizeCoordsNode(BaseNode):
             return result
         
         elif isinstance(bbox, dict):
-            result = {}
+            xyxy_input = 'x1' in bbox and self._is_normalized(bbox['x1'])
+            if not xyxy_input and not ('x' in bbox and 'width' in bbox
+                                       and self._is_normalized(bbox['x'])):
+                # Not normalized, copy as-is
+                return bbox.copy()
+            
+            # Keep the non-coordinate fields, then overwrite the coordinates
+            result = {key: value for key, value in bbox.items() if not key.endswith('_px')}
             
             # Handle xyxy format
-            if 'x1' in bbox and self._is_normalized(bbox['x1']):
+            if xyxy_input:
                 x1 = self._to_pixel(bbox['x1'], w, as_int)
                 y1 = self._to_pixel(bbox['y1'], h, as_int)
                 x2 = self._to_pixel(bbox.get('x2', 0), w, as_int)
@@ -173,11 +206,11 @@ class DenormalizeCoordsNode(BaseNode):
                 if output_format == 'xywh':
                     result['x'] = x1
                     result['y'] = y1
-                    result['width'] = x2 - x1 if as_int else x2 - x1
-                    result['height'] = y2 - y1 if as_int else y2 - y1
+                    result['width'] = x2 - x1
+                    result['height'] = y2 - y1
                 elif output_format == 'cxcywh':
-                    result['cx'] = int(round((x1 + x2) / 2)) if as_int else (x1 + x2) / 2
-                    result['cy'] = int(round((y1 + y2) / 2)) if as_int else (y1 + y2) / 2
+                    result['cx'] = round((x1 + x2) / 2) if as_int else (x1 + x2) / 2
+                    result['cy'] = round((y1 + y2) / 2) if as_int else (y1 + y2) / 2
                     result['width'] = x2 - x1
                     result['height'] = y2 - y1
                 else:
@@ -187,7 +220,7 @@ class DenormalizeCoordsNode(BaseNode):
                     result['y2'] = y2
             
             # Handle xywh format
-            elif 'x' in bbox and 'width' in bbox and self._is_normalized(bbox['x']):
+            else:
                 x = self._to_pixel(bbox['x'], w, as_int)
                 y = self._to_pixel(bbox['y'], h, as_int)
                 bw = self._to_pixel(bbox['width'], w, as_int)
@@ -199,8 +232,8 @@ class DenormalizeCoordsNode(BaseNode):
                     result['x2'] = x + bw
                     result['y2'] = y + bh
                 elif output_format == 'cxcywh':
-                    result['cx'] = int(round(x + bw / 2)) if as_int else x + bw / 2
-                    result['cy'] = int(round(y + bh / 2)) if as_int else y + bh / 2
+                    result['cx'] = round(x + bw / 2) if as_int else x + bw / 2
+                    result['cy'] = round(y + bh / 2) if as_int else y + bh / 2
                     result['width'] = bw
                     result['height'] = bh
                 else:
@@ -208,19 +241,58 @@ class DenormalizeCoordsNode(BaseNode):
                     result['y'] = y
                     result['width'] = bw
                     result['height'] = bh
-            else:
-                # Not normalized, copy as-is
-                result = bbox.copy()
-            
-            # Copy non-coordinate fields
-            for key in bbox:
-                if key not in result and not key.endswith('_px'):
-                    result[key] = bbox[key]
             
             return result
         
         return bbox
     
+    def _scale_bboxes(self, coords: np.ndarray, w: int, h: int, as_int: bool) -> List[list]:
+        """Denormalize an (N, 4) array of normalized xyxy boxes in place."""
+        output_format = self.config.get('bbox_format', 'xyxy')
+        coords *= (w, h, w, h)
+        if as_int:
+            np.rint(coords, out=coords)
+        
+        if output_format == 'xywh':
+            coords[:, 2:] -= coords[:, :2]
+        elif output_format == 'cxcywh':
+            size = coords[:, 2:] - coords[:, :2]
+            coords[:, :2] += coords[:, 2:]
+            coords[:, :2] /= 2
+            if as_int:
+                np.rint(coords[:, :2], out=coords[:, :2])
+            coords[:, 2:] = size
+        
+        if as_int:
+            return coords.astype(np.int64).tolist()
+        return coords.tolist()
+    
+    def _denormalize_detections(self, dets: List, w: int, h: int, as_int: bool) -> List:
+        """Denormalize a list of detection dicts, scaling list-style bboxes in one batch."""
+        if len(dets) < _BATCH_MIN_ITEMS or not all(
+                isinstance(d.get('bbox'), (list, tuple)) and len(d['bbox']) >= 4
+                and isinstance(d['bbox'][0], (int, float)) for d in dets):
+            return [self._denormalize_detection(d, w, h, as_int) for d in dets]
+        
+        try:
+            coords = np.array([d['bbox'][:4] for d in dets], dtype=np.float64)
+        except (TypeError, ValueError):
+            return [self._denormalize_detection(d, w, h, as_int) for d in dets]
+        
+        # Rows whose first value is outside 0-1 are already in pixels
+        first = coords[:, 0]
+        in_pixels = (~((first >= 0.0) & (first <= 1.0))).tolist()
+        
+        results = []
+        for det, bbox, skip in zip(dets, self._scale_bboxes(coords, w, h, as_int), in_pixels):
+            if skip:
+                bbox = list(det['bbox'])
+            # Add extra elements if present (confidence, class_id, etc.)
+            elif len(det['bbox']) > 4:
+                bbox.extend(det['bbox'][4:])
+            results.append(self._denormalize_detection(det, w, h, as_int, bbox))
+        return results
+    
     def _denormalize_point(self, point, w: int, h: int, as_int: bool) -> Any:
         """Denormalize a point."""
         if isinstance(point, (list, tuple)) and len(point) >= 2:
@@ -237,41 +309,53 @@ class DenormalizeCoordsNode(BaseNode):
             return result
         return point
     
-    def _denormalize_detection(self, det: Dict, w: int, h: int, as_int: bool) -> Dict:
-        """Denormalize a detection dict."""
-        result = det.copy()
-        
-        if 'bbox' in det:
-            result['bbox'] = self._denormalize_bbox(det['bbox'], w, h, as_int)
-        
-        # Handle various coordinate fields
-        for key in ['x', 'cx', 'center_x', 'x1', 'x2']:
-            if key in det and self._is_normalized(det[key]):
-                result[key] = self._to_pixel(det[key], w, as_int)
-        
-        for key in ['y', 'cy', 'center_y', 'y1', 'y2']:
-            if key in det and self._is_normalized(det[key]):
-                result[key] = self._to_pixel(det[key], h, as_int)
-        
-        for key in ['width', 'w', 'radius', 'size']:
-            if key in det and self._is_normalized(det[key]):
-                result[key] = self._to_pixel(det[key], w, as_int)
+    def _denormalize_points(self, points: List, w: int, h: int, as_int: bool) -> List:
+        """Denormalize a list of points, scaling [x, y] pairs in one batch."""
+        if len(points) < _BATCH_MIN_ITEMS or not all(
+                isinstance(p, (list, tuple)) and len(p) == 2
+                and isinstance(p[0], (int, float)) and isinstance(p[1], (int, float))
+                for p in points):
+            return [self._denormalize_point(p, w, h, as_int) for p in points]
         
-        for key in ['height', 'h']:
-            if key in det and self._is_normalized(det[key]):
-                result[key] = self._to_pixel(det[key], h, as_int)
-        
-        # Remove _px fields since we're outputting pixels
-        for key in list(result.keys()):
+        coords = np.array(points, dtype=np.float64)
+        # Points with a coordinate outside 0-1 are already in pixels
+        normalized = ((coords >= 0.0) & (coords <= 1.0)).all(axis=1)
+        coords[~normalized] = 0.0  # keeps NaN/inf out of the integer cast
+        coords *= (w, h)
+        if as_int:
+            scaled = np.rint(coords).astype(np.int64).tolist()
+        else:
+            scaled = coords.tolist()
+        return [xy if is_norm else list(p)
+                for p, xy, is_norm in zip(points, scaled, normalized.tolist())]
+    
+    def _denormalize_detection(self, det: Dict, w: int, h: int, as_int: bool,
+                               bbox: Optional[list] = None) -> Dict:
+        """Denormalize a detection dict, using ``bbox`` if it was already denormalized."""
+        result = {}
+        for key, value in det.items():
+            # Drop _px fields since we're outputting pixels
             if key.endswith('_px'):
-                del result[key]
+                continue
+            if isinstance(value, (int, float)) and 0.0 <= value <= 1.0:
+                if key in _X_KEYS:
+                    value = float(value) * w
+                elif key in _Y_KEYS:
+                    value = float(value) * h
+                else:
+                    result[key] = value
+                    continue
+                if as_int:
+                    value = round(value)
+            result[key] = value
+        
+        if bbox is not None:
+            result['bbox'] = bbox
+        elif 'bbox' in det:
+            result['bbox'] = self._denormalize_bbox(det['bbox'], w, h, as_int)
         
         return result
     
-    def _denormalize_shape(self, shape: Dict, w: int, h: int, as_int: bool) -> Dict:
-        """Denormalize a shape dict (for draw node compatibility)."""
-        return self._denormalize_detection(shape, w, h, as_int)
-    
     def on_input(self, msg: Dict[str, Any], input_index: int = 0):
         """Denormalize coordinates in the message."""
         w, h = self._get_image_dimensions(msg)
@@ -287,79 +371,36 @@ class DenormalizeCoordsNode(BaseNode):
         msg['image_width'] = w
         msg['image_height'] = h
         
-        # Handle payload.detections
-        payload = msg.get(MessageKeys.PAYLOAD, {})
-        if isinstance(payload, dict) and 'detections' in payload:
-            payload['detections'] = [
-                self._denormalize_detection(d, w, h, as_int)
-                for d in payload['detections']
-            ]
-        
-        # Handle msg.detections (YOLO style)
-        if 'detections' in msg and isinstance(msg['detections'], list):
-            msg['detections'] = [
-                self._denormalize_detection(d, w, h, as_int)
-                for d in msg['detections']
-            ]
-        
-        # Handle msg.predictions
-        if 'predictions' in msg and isinstance(msg['predictions'], list):
-            msg['predictions'] = [
-                self._denormalize_detection(d, w, h, as_int)
-                for d in msg['predictions']
-            ]
+        payload = msg.get(MessageKeys.PAYLOAD)
+        payload_is_dict = isinstance(payload, dict)
+        if not any(key in msg for key in _COORD_KEYS) and not (
+                payload_is_dict and any(key in payload for key in _PAYLOAD_COORD_KEYS)):
+            self.send(msg)
+            return
         
-        # Handle msg.shapes (draw node)
-        if 'shapes' in msg and isinstance(msg['shapes'], list):
-            msg['shapes'] = [
-                self._denormalize_shape(s, w, h, as_int)
-                for s in msg['shapes']
-            ]
+        # Handle detection-style lists: detections (YOLO style), predictions,
+        # shapes (draw node), circles, lines, contours and blobs
+        for key in _DETECTION_LIST_KEYS:
+            items = msg.get(key)
+            if isinstance(items, list):
+                msg[key] = self._denormalize_detections(items, w, h, as_int)
         
         # Handle single bbox
         if 'bbox' in msg:
             msg['bbox'] = self._denormalize_bbox(msg['bbox'], w, h, as_int)
-        if isinstance(payload, dict) and 'bbox' in payload:
-            payload['bbox'] = self._denormalize_bbox(payload['bbox'], w, h, as_int)
         
         # Handle points
-        if 'points' in msg and isinstance(msg['points'], list):
-            msg['points'] = [
-                self._denormalize_point(p, w, h, as_int)
-                for p in msg['points']
-            ]
-        if isinstance(payload, dict) and 'points' in payload:
-            payload['points'] = [
-                self._denormalize_point(p, w, h, as_int)
-                for p in payload['points']
-            ]
-        
-        # Handle circles
-        if 'circles' in msg and isinstance(msg['circles'], list):
-            msg['circles'] = [
-                self._denormalize_detection(c, w, h, as_int)
-                for c in msg['circles']
-            ]
-        
-        # Handle lines
-        if 'lines' in msg and isinstance(msg['lines'], list):
-            msg['lines'] = [
-                self._denormalize_detection(l, w, h, as_int)
-                for l in msg['lines']
-            ]
-        
-        # Handle contours
-        if 'contours' in msg and isinstance(msg['contours'], list):
-            msg['contours'] = [
-                self._denormalize_detection(c, w, h, as_int)
-                for c in msg['contours']
-            ]
+        points = msg.get('points')
+        if isinstance(points, list):
+            msg['points'] = self._denormalize_points(points, w, h, as_int)
         
-        # Handle blobs
-        if 'blobs' in msg and isinstance(msg['blobs'], list):
-            msg['blobs'] = [
-                self._denormalize_detection(b, w, h, as_int)
-                for b in msg['blobs']
-            ]
+        # Same containers nested in the payload
+        if payload_is_dict:
+            if 'detections' in payload:
+                payload['detections'] = self._denormalize_detections(payload['detections'], w, h, as_int)
+            if 'bbox' in payload:
+                payload['bbox'] = self._denormalize_bbox(payload['bbox'], w, h, as_int)
+            if 'points' in payload:
+                payload['points'] = self._denormalize_points(payload['points'], w, h, as_int)
         
         self.send(msg)
@@ -2,9 +2,12 @@
 OpenCV Draw Node - draws shapes and annotations on images.
 """
 
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
 import cv2
 import numpy as np
-from typing import Any, Dict, List
 from pynode.nodes.base_node import BaseNode, process_image, Info, MessageKeys
 
 _info = Info()
@@ -31,9 +34,42 @@ _info.add_bullets(
 _info.add_header("Properties")
 _info.add_bullets(
     ("Color:", "BGR format (e.g., 0,255,0 for green)"),
-    ("Thickness:", "-1 for filled shapes")
+    ("Thickness:", "-1 for filled shapes"),
+    ("Copy Input Frame:", "Draw on a copy when the incoming frame is a shared array. Turn off to draw in place when nothing upstream keeps using the frame.")
 )
 
+_DEFAULT_COLOR = (0, 255, 0)
+
+
+@lru_cache(maxsize=256)
+def _parse_color_str(color_str: str) -> Tuple[int, int, int]:
+    """Parse a 'B,G,R' string; cached since the same few colors repeat every frame."""
+    parts = color_str.split(',')
+    if len(parts) < 3:
+        return _DEFAULT_COLOR
+    try:
+        values = [int(part) for part in parts]
+    except ValueError:
+        return _DEFAULT_COLOR
+    return (values[0], values[1], values[2])
+
+
+@dataclass(frozen=True)
+class _ShapeConfig:
+    """Configured shape with every value already parsed."""
+    shape: str
+    x1: float
+    y1: float
+    x2: float
+    y2: float
+    radius: float
+    color: Tuple[int, int, int]
+    thickness: int
+    text: str
+    text_from_msg: bool
+    msg_path: str
+    font_scale: float
+
 
 class DrawNode(BaseNode):
     info = str(_info)
@@ -62,7 +98,8 @@ class DrawNode(BaseNode):
         'text': 'Hello',
         'text_source': 'manual',
         'msg_path': f'{MessageKeys.PAYLOAD}.focus_score',
-        'font_scale': 1.0
+        'font_scale': 1.0,
+        'copy_input': True
     }
     
     properties = [
@@ -187,6 +224,13 @@ class DrawNode(BaseNode):
             'step': 0.1,
             'help': 'Font scale for text',
             'showIf': {'shape': 'text'}
+        },
+        {
+            'name': 'copy_input',
+            'label': 'Copy Input Frame',
+            'type': 'checkbox',
+            'default': DEFAULT_CONFIG['copy_input'],
+            'help': 'Draw on a copy of shared array frames instead of in place'
         }
     ]
     
@@ -207,15 +251,77 @@ class DrawNode(BaseNode):
             'font_scale': 1.0
         })
     
+    def configure(self, config: Dict[str, Any]):
+        """Apply config and parse the configured shape once."""
+        super().configure(config)
+        self._shape = self.config.get('shape', 'rectangle')
+        self._copy_input = self.get_config_bool('copy_input', True)
+        self._parsed: Optional[_ShapeConfig] = None
+        if self._shape != 'from_msg':
+            try:
+                self._parsed = self._parse_shape_config()
+            except (TypeError, ValueError):
+                # Leave malformed values to the per-frame path, which reports them
+                self._parsed = None
+    
+    def _configured_shape_info(self) -> Dict[str, Any]:
+        """The configured shape as a msg.shapes-style dict."""
+        return {
+            'type': self._shape,
+            'x1': self.config.get('x1', 0.1),
+            'y1': self.config.get('y1', 0.1),
+            'x2': self.config.get('x2', 0.3),
+            'y2': self.config.get('y2', 0.3),
+            'radius': self.config.get('radius', 0.1),
+            'color': self.config.get('color', '0,255,0'),
+            'thickness': self.config.get('thickness', 2),
+            'text': self.config.get('text', 'Hello'),
+            'text_source': self.config.get('text_source', 'manual'),
+            'msg_path': self.config.get('msg_path', f'{MessageKeys.PAYLOAD}.focus_score'),
+            'font_scale': self.config.get('font_scale', 1.0)
+        }
+    
+    def _parse_shape_config(self) -> _ShapeConfig:
+        """Parse the configured shape the same way _draw_shape parses a dict."""
+        info = self._configured_shape_info()
+        return _ShapeConfig(
+            shape=info['type'],
+            x1=float(info['x1']),
+            y1=float(info['y1']),
+            x2=float(info['x2']),
+            y2=float(info['y2']),
+            radius=float(info['radius']),
+            color=self._parse_color(info['color']),
+            thickness=int(info['thickness']),
+            text=str(info['text']),
+            text_from_msg=info['text_source'] == 'from_msg',
+            msg_path=info['msg_path'],
+            font_scale=float(info['font_scale'])
+        )
+    
     def _parse_color(self, color_str):
-        """Parse color string to BGR tuple."""
-        try:
-            parts = [int(x.strip()) for x in str(color_str).split(',')]
-            if len(parts) >= 3:
-                return (parts[0], parts[1], parts[2])
-            return (0, 255, 0)
-        except Exception:
-            return (0, 255, 0)
+        """Parse color string (or B,G,R sequence) to BGR tuple."""
+        if isinstance(color_str, (tuple, list)):
+            try:
+                b, g, r = color_str[:3]
+                return (int(b), int(g), int(r))
+            except (TypeError, ValueError):
+                return _DEFAULT_COLOR
+        return _parse_color_str(str(color_str))
+    
+    @staticmethod
+    def _aliases_payload(image: np.ndarray, msg: Dict[str, Any]) -> bool:
+        """Whether the decoded image is the array carried in the message.
+        
+        Array payloads are decoded without a copy; encoded payloads (base64,
+        JPEG, raw lists) decode to a fresh array that nothing else references.
+        """
+        data = msg.get(MessageKeys.PAYLOAD)
+        if isinstance(data, dict):
+            data = data.get(MessageKeys.IMAGE.PATH, data)
+        if isinstance(data, dict):
+            data = data.get('data')
+        return data is image
     
     def _get_value_from_path(self, msg, path):
         """Extract value from message using dot-notation path."""
@@ -278,35 +384,57 @@ class DrawNode(BaseNode):
         
         return img
     
+    def _draw_configured(self, img, parsed: _ShapeConfig, msg):
+        """Draw the pre-parsed configured shape; mirrors _draw_shape."""
+        h, w = img.shape[:2]
+        shape_type = parsed.shape
+        
+        if shape_type == 'rectangle' or shape_type == 'line':
+            pt1 = (int(parsed.x1 * w), int(parsed.y1 * h))
+            pt2 = (int(parsed.x2 * w), int(parsed.y2 * h))
+            draw = cv2.rectangle if shape_type == 'rectangle' else cv2.line
+            draw(img, pt1, pt2, parsed.color, parsed.thickness)
+        
+        elif shape_type == 'circle':
+            center = (int(parsed.x1 * w), int(parsed.y1 * h))
+            cv2.circle(img, center, int(parsed.radius * w), parsed.color, parsed.thickness)
+        
+        elif shape_type == 'text':
+            if parsed.text_from_msg and msg is not None:
+                text = self._get_value_from_path(msg, parsed.msg_path)
+            else:
+                text = parsed.text
+            cv2.putText(img, text, (int(parsed.x1 * w), int(parsed.y1 * h)),
+                        cv2.FONT_HERSHEY_SIMPLEX, parsed.font_scale, parsed.color,
+                        parsed.thickness)
+        
+        return img
+    
     @process_image()
     def on_input(self, image: np.ndarray, msg: Dict[str, Any], input_index: int = 0):
         """Draw shapes on the input image."""
-        # Make a copy to draw on
-        result = image.copy()
+        shape = self._shape
+        shapes = msg.get('shapes', []) if shape == 'from_msg' else None
+        if shape == 'from_msg' and not shapes:
+            # Nothing to draw: pass the frame through untouched
+            return image
         
-        shape = self.config.get('shape', 'rectangle')
+        # Only copy frames that are shared with the sender; freshly decoded
+        # images are ours to draw on
+        if self._copy_input and self._aliases_payload(image, msg):
+            result = image.copy()
+        else:
+            result = image
         
         if shape == 'from_msg':
             # Draw shapes from message
-            shapes = msg.get('shapes', [])
             for shape_info in shapes:
                 result = self._draw_shape(result, shape_info, msg)
-        else:
+        elif self._parsed is not None:
             # Draw configured shape
-            shape_info = {
-                'type': shape,
-                'x1': self.config.get('x1', 0.1),
-                'y1': self.config.get('y1', 0.1),
-                'x2': self.config.get('x2', 0.3),
-                'y2': self.config.get('y2', 0.3),
-                'radius': self.config.get('radius', 0.1),
-                'color': self.config.get('color', '0,255,0'),
-                'thickness': self.config.get('thickness', 2),
-                'text': self.config.get('text', 'Hello'),
-                'text_source': self.config.get('text_source', 'manual'),
-                'msg_path': self.config.get('msg_path', f'{MessageKeys.PAYLOAD}.focus_score'),
-                'font_scale': self.config.get('font_scale', 1.0)
-            }
-            result = self._draw_shape(result, shape_info, msg)
+            result = self._draw_configured(result, self._parsed, msg)
+        else:
+            # Malformed config: the dict path raises and reports the error
+            result = self._draw_shape(result, self._configured_shape_info(), msg)
         
         return result
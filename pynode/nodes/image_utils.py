@@ -12,6 +12,7 @@ BaseNode methods.
 """
 
 import base64
+import struct
 from functools import wraps
 from typing import Any, Callable, Dict, Optional, Tuple
 
@@ -103,6 +104,82 @@ def decode_image(payload: Any,
         return None, None
 
 
+_PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+# JPEG start-of-frame markers (0xC0-0xCF minus DHT, JPG and DAC)
+_JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def _peek_encoded_size(buf: bytes) -> Optional[Tuple[int, int]]:
+    """
+    Read (width, height) from a PNG IHDR chunk or JPEG SOF segment header.
+
+    Returns None when the size cannot be determined without decoding, which
+    includes JPEGs carrying EXIF data (imdecode applies the EXIF orientation,
+    so the decoded size may be transposed).
+    """
+    if buf[:8] == _PNG_SIGNATURE and buf[12:16] == b'IHDR' and len(buf) >= 24:
+        return struct.unpack('>II', buf[16:24])
+
+    if buf[:2] != b'\xff\xd8':
+        return None
+    i, n = 2, len(buf)
+    while i + 4 <= n:
+        if buf[i] != 0xFF:
+            return None
+        marker = buf[i + 1]
+        if marker == 0xFF:  # fill byte
+            i += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD7:  # standalone markers
+            i += 2
+            continue
+        if marker == 0xDA:  # start of scan, no frame header seen
+            return None
+        if marker == 0xE1 and buf[i + 4:i + 8] == b'Exif':
+            return None
+        if marker in _JPEG_SOF_MARKERS:
+            if i + 9 > n:
+                return None
+            height, width = struct.unpack('>HH', buf[i + 5:i + 9])
+            return width, height
+        i += 2 + struct.unpack('>H', buf[i + 2:i + 4])[0]
+    return None
+
+
+def peek_image_size(payload: Any) -> Optional[Tuple[int, int]]:
+    """
+    Get (width, height) of an image payload without decoding pixel data.
+
+    Accepts the same payload formats as :func:`decode_image`. Returns None
+    when the size cannot be read cheaply; callers should then fall back to
+    :func:`decode_image`.
+    """
+    try:
+        if isinstance(payload, dict) and MessageKeys.IMAGE.PATH in payload:
+            payload = payload[MessageKeys.IMAGE.PATH]
+
+        if isinstance(payload, dict):
+            if payload.get('format') == 'bgr' and payload.get('encoding') == 'numpy':
+                payload = payload.get('data')
+            elif payload.get('format') == 'jpeg' and payload.get('encoding') == 'base64':
+                return _peek_encoded_size(base64.b64decode(payload.get('data')))
+            else:
+                return None
+
+        if isinstance(payload, np.ndarray):
+            if payload.ndim < 2:
+                return None
+            return payload.shape[1], payload.shape[0]
+
+        if isinstance(payload, str):
+            if payload.startswith('data:image'):
+                payload = payload.split(',')[1]
+            return _peek_encoded_size(base64.b64decode(payload))
+    except Exception:
+        pass
+    return None
+
+
 def encode_image(image: Any, format_type: Optional[str],
                  report_error: Optional[Callable[[str], None]] = None) -> Any:
     """
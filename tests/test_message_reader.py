@@ -0,0 +1,469 @@
+"""Unit tests for MessageReaderNode file parsing and batch reading.
+
+The node is driven directly (no engine or Flask); emitted messages are
+collected by a synchronous sink connected to its output.
+"""
+
+import base64
+import json
+import os
+import pickle
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from pynode.nodes.base_node import BaseNode
+from pynode.nodes.MessageWriterNode import messagereader_node
+from pynode.nodes.MessageWriterNode.messagereader_node import MessageReaderNode
+
+
+class _Sink(BaseNode):
+    input_count = 1
+    output_count = 0
+
+    def __init__(self):
+        super().__init__()
+        self.received = []
+
+    def on_input_direct(self, msg, input_index=0):
+        self.received.append(msg)
+
+
+@pytest.fixture
+def reader():
+    node = MessageReaderNode()
+    node.sink = _Sink()
+    node.connect(node.sink)
+    return node
+
+
+def test_json_file_roundtrip(reader, tmp_path):
+    path = tmp_path / 'msg.json'
+    path.write_text(json.dumps({'payload': {'a': [1, 2.5, 'x']}, 'topic': 't'}), encoding='utf-8')
+    assert reader._read_file_data(str(path)) == {'payload': {'a': [1, 2.5, 'x']}, 'topic': 't'}
+
+
+@pytest.mark.parametrize('use_orjson', [True, False])
+def test_json_nan_and_big_int_fall_back_to_stdlib(monkeypatch, reader, tmp_path, use_orjson):
+    if use_orjson and not messagereader_node.ORJSON_AVAILABLE:
+        pytest.skip('orjson not installed')
+    monkeypatch.setattr(messagereader_node, 'ORJSON_AVAILABLE', use_orjson)
+    path = tmp_path / 'nan.json'
+    path.write_text('{"v": NaN, "big": 123456789012345678901234567890}', encoding='utf-8')
+
+    data = reader._read_file_data(str(path))
+    assert np.isnan(data['v'])
+    assert data['big'] == 123456789012345678901234567890
+
+
+def test_numpy_arrays_written_by_message_writer_are_reconstructed(reader, tmp_path):
+    from pynode.nodes.MessageWriterNode.messagewriter_node import MessageWriterNode
+
+    arr = np.arange(24, dtype=np.float32).reshape(2, 3, 4)
+    doc = {'payload': {'image': arr, 'nested': [{'mask': arr[0].astype(np.uint8)}]}}
+    path = tmp_path / 'arrays.json'
+    path.write_text(json.dumps(doc, default=MessageWriterNode()._json_serializer), encoding='utf-8')
+
+    data = reader._read_file_data(str(path))
+    np.testing.assert_array_equal(data['payload']['image'], arr)
+    assert data['payload']['image'].dtype == np.float32
+    np.testing.assert_array_equal(data['payload']['nested'][0]['mask'], arr[0].astype(np.uint8))
+
+
+def test_batch_read_emits_one_message_per_file(reader, tmp_path):
+    for i in range(3):
+        (tmp_path / f'm{i}.json').write_text(json.dumps({'payload': {'i': i}, 'topic': 'x'}), encoding='utf-8')
+    (tmp_path / 'skip.txt').write_text('nope', encoding='utf-8')
+    reader.configure({'directory': str(tmp_path), 'reading_mode': 'batch_pattern',
+                      'filename_pattern': '*.json', 'max_files': '2'})
+
+    reader.on_input({'topic': 'go'})
+
+    out = reader.sink.received
+    assert [m['payload']['i'] for m in out] == [0, 1]
+    assert all(m['topic'] == 'go' for m in out)
+    assert [m['payload']['batch_index'] for m in out] == [0, 1]
+    assert all(m['payload']['batch_total'] == 2 for m in out)
+    assert out[0]['payload']['metadata']['basename'] == 'm0.json'
+    assert out[1]['source_file'].endswith('m1.json')
+
+
+
+def test_batch_read_groups_messages_by_emit_batch_size(reader, tmp_path):
+    for i in range(5):
+        (tmp_path / f'm{i}.json').write_text(json.dumps({'i': i}), encoding='utf-8')
+    reader.configure({'directory': str(tmp_path), 'reading_mode': 'batch_pattern',
+                      'max_files': '5', 'emit_batch_size': '2', 'include_metadata': 'false'})
+
+    reader.on_input({'topic': 'go'})
+
+    out = reader.sink.received
+    assert [len(m['payload']['batch']) for m in out] == [2, 2, 1]
+    assert all(m['topic'] == 'go' for m in out)
+    inner = [msg for m in out for msg in m['payload']['batch']]
+    assert [msg['payload']['i'] for msg in inner] == [0, 1, 2, 3, 4]
+    assert [msg['payload']['batch_index'] for msg in inner] == [0, 1, 2, 3, 4]
+
+
+@pytest.fixture
+def tree(tmp_path):
+    """a.json (small, old), b.json (large, new), .hidden.json, sub/c.json, sub/d.txt."""
+    (tmp_path / 'a.json').write_text('{}', encoding='utf-8')
+    (tmp_path / 'b.json').write_text('{"k": "' + 'x' * 100 + '"}', encoding='utf-8')
+    (tmp_path / '.hidden.json').write_text('{}', encoding='utf-8')
+    (tmp_path / 'sub').mkdir()
+    (tmp_path / 'sub' / 'c.json').write_text('{"k": 1}', encoding='utf-8')
+    (tmp_path / 'sub' / 'd.txt').write_text('text', encoding='utf-8')
+    os.utime(tmp_path / 'a.json', (1000, 1000))
+    os.utime(tmp_path / 'b.json', (3000, 3000))
+    os.utime(tmp_path / 'sub' / 'c.json', (2000, 2000))
+    return tmp_path
+
+
+def _names(paths):
+    return [os.path.relpath(p).replace(os.sep, '/') for p in paths]
+
+
+@pytest.mark.parametrize('recursive, sort_by, expected', [
+    ('false', 'name', ['a.json', 'b.json']),
+    ('false', 'modified', ['b.json', 'a.json']),
+    ('true', 'name', ['a.json', 'b.json', 'sub/c.json']),
+    ('true', 'modified', ['b.json', 'sub/c.json', 'a.json']),
+    ('true', 'size', ['b.json', 'sub/c.json', 'a.json']),
+])
+def test_get_file_list_filters_and_sorts(reader, tree, monkeypatch, recursive, sort_by, expected):
+    monkeypatch.chdir(tree)
+    reader.configure({'recursive': recursive})
+    assert _names(reader._get_file_list('.', '*.json', sort_by=sort_by)) == expected
+
+
+def test_get_file_list_hidden_files_need_explicit_pattern(reader, tree, monkeypatch):
+    monkeypatch.chdir(tree)
+    assert _names(reader._get_file_list('.', '.*.json')) == ['.hidden.json']
+
+
+def test_get_file_list_pattern_with_directory(reader, tree, monkeypatch):
+    monkeypatch.chdir(tree)
+    assert _names(reader._get_file_list('.', 'sub/*')) == ['sub/c.json', 'sub/d.txt']
+
+
+def test_get_file_list_skips_entries_that_fail_to_stat(reader, tree, monkeypatch):
+    monkeypatch.chdir(tree)
+    scandir = os.scandir
+
+    class Vanished:
+        """Directory entry for a.json, deleted between listing and stat."""
+        def __init__(self, entry):
+            self.name, self.path, self.is_file, self.is_dir = (
+                entry.name, entry.path, entry.is_file, entry.is_dir)
+        def stat(self):
+            raise FileNotFoundError(self.path)
+
+    class Listing:
+        def __init__(self, path):
+            self._it = scandir(path)
+        def __enter__(self):
+            return self
+        def __exit__(self, *exc):
+            self._it.close()
+        def __iter__(self):
+            return (Vanished(e) if e.name == 'a.json' else e for e in self._it)
+
+    monkeypatch.setattr(os, 'scandir', Listing)
+    assert _names(reader._get_file_list('.', '*.json')) == ['b.json']
+
+
+@pytest.mark.skipif(not hasattr(os, 'symlink') or os.name == 'nt', reason='needs symlinks')
+def test_get_file_list_glob_skips_broken_symlinks(reader, tree, monkeypatch):
+    monkeypatch.chdir(tree)
+    os.symlink('missing.json', os.path.join('sub', 'broken.json'))
+    assert _names(reader._get_file_list('.', 'sub/*.json')) == ['sub/c.json']
+
+
+@pytest.mark.skipif(os.sep != '/', reason='byte paths are only used on POSIX')
+def test_fast_path_io_scans_bytes_and_emits_str_paths(reader, tree, monkeypatch):
+    monkeypatch.chdir(tree)
+    reader.configure({'recursive': 'true', 'fast_path_io': True})
+    files = reader._get_file_list('.', '*.json')
+    assert files == [b'./a.json', b'./b.json', b'./sub/c.json']
+    assert reader._get_file_list('.', '.*.json') == [b'./.hidden.json']
+
+    reader.configure({'directory': '.', 'reading_mode': 'batch_pattern', 'recursive': 'true',
+                      'fast_path_io': True})
+    reader.on_input({})
+    out = reader.sink.received
+    assert [m['source_file'] for m in out] == ['./a.json', './b.json', './sub/c.json']
+    assert out[2]['payload']['k'] == 1
+
+
+@pytest.mark.skipif(os.sep != '/', reason='byte paths are only used on POSIX')
+def test_fast_path_io_stats_each_batch_file_once_on_bytes(reader, tree, monkeypatch):
+    monkeypatch.chdir(tree)
+    reader.configure({'directory': '.', 'reading_mode': 'batch_pattern', 'fast_path_io': True,
+                      'cache_size': '4'})
+    stats = []
+    stat = os.stat
+    monkeypatch.setattr(os, 'stat', lambda p, *a, **kw: stats.append(p) or stat(p, *a, **kw))
+    reader.on_input({})
+
+    assert [m['payload']['metadata']['size'] for m in reader.sink.received] == [2, 109]
+    assert [p for p in stats if p != '.'] == [b'./a.json', b'./b.json']  # '.': directory check
+
+
+def test_large_npy_is_memory_mapped_copy_on_write(reader, tmp_path):
+    path = tmp_path / 'big.npy'
+    arr = np.arange(64 * 1024, dtype=np.float64)  # 512 KiB
+    np.save(path, arr)
+    reader.configure({'mmap_threshold_mb': '0.25'})
+
+    data = reader._read_file_data(str(path))
+    assert isinstance(data, np.memmap)
+    np.testing.assert_array_equal(data, arr)
+
+    data[0] = -1  # writable, but never written back to disk
+    assert np.load(path)[0] == 0
+
+
+def test_small_npy_and_disabled_threshold_load_into_memory(reader, tmp_path):
+    path = tmp_path / 'small.npy'
+    np.save(path, np.ones(10))
+    assert not isinstance(reader._read_file_data(str(path)), np.memmap)
+
+    reader.configure({'mmap_threshold_mb': '0'})
+    assert not isinstance(reader._read_file_data(str(path)), np.memmap)
+
+
+def test_reconstruct_handles_deep_nesting_and_top_level_arrays(reader):
+    from pynode.nodes.MessageWriterNode.messagewriter_node import MessageWriterNode
+
+    encode = MessageWriterNode()._json_serializer
+    arr = np.arange(6, dtype=np.int16).reshape(2, 3)
+
+    deep = json.loads(json.dumps(arr, default=encode))
+    for _ in range(5000):  # far past the default recursion limit
+        deep = {'child': [deep]}
+    data = reader._reconstruct_numpy_arrays(deep)
+    for _ in range(5000):
+        data = data['child'][0]
+    np.testing.assert_array_equal(data, arr)
+
+    top = reader._reconstruct_numpy_arrays(json.loads(json.dumps(arr, default=encode)))
+    np.testing.assert_array_equal(top, arr)
+    assert reader._reconstruct_numpy_arrays('plain') == 'plain'
+
+
+def test_parsed_file_cache_hits_until_file_changes(reader, tmp_path, monkeypatch):
+    path = tmp_path / 'c.json'
+    path.write_text('{"v": [1, 2]}', encoding='utf-8')
+    calls = []
+    parse = reader._parse_file
+    monkeypatch.setattr(reader, '_parse_file', lambda p, raw=None: calls.append(p) or parse(p, raw))
+
+    reader._read_file_data(str(path))
+    reader._read_file_data(str(path))
+    assert len(calls) == 2  # off by default
+
+    reader.configure({'cache_size': '4'})
+    first = reader._read_file_data(str(path))
+    first['v'].append(3)  # callers may mutate what they get back
+    second = reader._read_file_data(str(path))
+    assert second == {'v': [1, 2]}
+    assert len(calls) == 3
+
+    path.write_text('{"v": [9, 9, 9]}', encoding='utf-8')
+    assert reader._read_file_data(str(path)) == {'v': [9, 9, 9]}
+    assert len(calls) == 4
+
+
+def test_parsed_file_cache_respects_byte_limit(reader, tmp_path):
+    reader.configure({'cache_size': '8', 'cache_max_mb': str(250 / (1024 * 1024))})
+    for name, size in [('a', 100), ('b', 100), ('c', 100), ('big', 300)]:
+        (tmp_path / f'{name}.txt').write_text('x' * size, encoding='utf-8')
+        reader._read_file_data(str(tmp_path / f'{name}.txt'))
+    assert [os.path.basename(k[0]) for k in reader._file_cache] == ['b.txt', 'c.txt']
+    assert reader._file_cache_bytes == 200
+
+    reader.configure({'cache_max_mb': 'lots'})  # reported, cache disabled
+    assert reader._file_cache_size == 0
+
+
+def test_parsed_file_cache_is_cleared_on_configure(tmp_path):
+    path = tmp_path / 'data.pkl'
+    path.write_bytes(pickle.dumps({'a': 1}))
+    node = MessageReaderNode()
+    node.configure({'allow_pickle': True, 'cache_size': '4'})
+    assert node._read_file_data(str(path)) == {'a': 1}
+
+    node.configure({'allow_pickle': False})
+    assert node._read_file_data(str(path)) is None
+
+
+def test_batch_read_of_zero_or_one_file_starts_no_pool(reader, tmp_path, monkeypatch):
+    (tmp_path / 'only.json').write_text('{"n": 1}', encoding='utf-8')
+    monkeypatch.setattr(messagereader_node, 'ThreadPoolExecutor',
+                        lambda *a, **kw: pytest.fail('thread pool started'))
+    errors = []
+    reader.report_error = errors.append
+    reader.configure({'directory': str(tmp_path), 'reading_mode': 'batch_pattern',
+                      'filename_pattern': '*.json', 'max_files': '0'})
+    reader.on_input({})
+    assert reader.sink.received == [] and errors == []
+
+    reader.configure({'max_files': '1'})
+    reader.on_input({})
+    assert [m['payload']['n'] for m in reader.sink.received] == [1]
+
+
+def test_ndjson_batch_emits_one_message_per_line(reader, tmp_path):
+    lines = [json.dumps({'payload': {'n': i}, 'topic': 'orig'}) for i in range(3)]
+    (tmp_path / 'log.jsonl').write_text('\n'.join(lines[:2]) + '\n\n' + lines[2] + '\n', encoding='utf-8')
+    reader.configure({'directory': str(tmp_path), 'reading_mode': 'ndjson_batch',
+                      'specific_file': 'log.jsonl'})
+
+    reader.on_input({'topic': 'go'})
+
+    out = reader.sink.received
+    assert [m['payload']['n'] for m in out] == [0, 1, 2]
+    assert [m['payload']['batch_index'] for m in out] == [0, 1, 2]
+    assert all(m['payload']['batch_total'] == 3 and m['topic'] == 'go' for m in out)
+    assert all(m['reading_mode'] == 'ndjson_batch' for m in out)
+
+
+def test_ndjson_batch_reports_bad_lines_and_keeps_going(reader, tmp_path):
+    errors = []
+    reader.report_error = errors.append
+    (tmp_path / 'log.jsonl').write_text('{"a": 1}\nnot json\n[1, 2]\n', encoding='utf-8')
+    reader.configure({'directory': str(tmp_path), 'reading_mode': 'ndjson_batch',
+                      'specific_file': 'log.jsonl', 'output_structure': 'direct_payload'})
+
+    reader.on_input({})
+
+    assert [m['payload'] for m in reader.sink.received] == [{'a': 1, 'batch_index': 0, 'batch_total': 2}, [1, 2]]
+    assert len(errors) == 1 and 'line 2' in errors[0]
+
+
+def test_batch_read_with_prefetch_matches_plain_read(reader, tmp_path):
+    for i in range(4):
+        (tmp_path / f'm{i}.json').write_text(json.dumps({'payload': {'i': i}}), encoding='utf-8')
+    reader.configure({'directory': str(tmp_path), 'reading_mode': 'batch_pattern',
+                      'prefetch_files': True})
+
+    reader.on_input({})
+
+    assert [m['payload']['i'] for m in reader.sink.received] == [0, 1, 2, 3]
+
+
+def test_batch_read_ahead_covers_every_format_in_order(reader, tmp_path):
+    np.save(tmp_path / 'f0.npy', np.arange(3))
+    (tmp_path / 'f1.txt').write_bytes(b'line1\r\nline2')
+    (tmp_path / 'f2.bin').write_bytes(b'\x00\x01')
+    (tmp_path / 'f3.json').write_text('{"k": 1}', encoding='utf-8')
+    (tmp_path / 'f4.json').write_text('{broken', encoding='utf-8')
+    errors = []
+    reader.report_error = errors.append
+    reader.configure({'directory': str(tmp_path), 'reading_mode': 'all_files',
+                      'output_structure': 'direct_payload', 'include_metadata': 'false'})
+
+    reader.on_input({})
+
+    out = [m['payload'] for m in reader.sink.received]
+    np.testing.assert_array_equal(out[0], np.arange(3))
+    assert out[1:3] == ['line1\nline2', b'\x00\x01']
+    assert out[3]['k'] == 1
+    assert len(out) == 4
+    assert len(errors) == 1 and 'f4.json' in errors[0]
+
+
+def test_json_without_array_marker_skips_reconstruction(reader, tmp_path, monkeypatch):
+    path = tmp_path / 'plain.json'
+    path.write_text('{"a": {"b": [1, 2, {"c": 3}]}}', encoding='utf-8')
+    monkeypatch.setattr(reader, '_reconstruct_numpy_arrays', lambda data: pytest.fail('walked'))
+    assert reader._read_file_data(str(path)) == {'a': {'b': [1, 2, {'c': 3}]}}
+
+
+@pytest.mark.parametrize('protocol', [2, pickle.HIGHEST_PROTOCOL])
+def test_pickle_with_numpy_payload_roundtrip(reader, tmp_path, protocol):
+    path = tmp_path / 'frame.pkl'
+    doc = {'payload': np.arange(12, dtype=np.uint8).reshape(3, 4), 'topic': 'cam'}
+    path.write_bytes(pickle.dumps(doc, protocol=protocol))
+    reader.configure({'allow_pickle': True})
+
+    data = reader._read_file_data(str(path))
+    np.testing.assert_array_equal(data['payload'], doc['payload'])
+    assert data['topic'] == 'cam'
+
+
+def test_pickle_reader_handles_short_reads(reader, tmp_path, monkeypatch):
+    path = tmp_path / 'big.pkl'
+    doc = {'payload': list(range(1000))}
+    path.write_bytes(pickle.dumps(doc))
+    reader.configure({'allow_pickle': True, 'cache_size': '0'})
+
+    class Trickle:
+        """Raw file whose readinto() returns at most 7 bytes per call."""
+        def __init__(self, f):
+            self._f = f
+        def __enter__(self):
+            return self
+        def __exit__(self, *exc):
+            self._f.close()
+        def fileno(self):
+            return self._f.fileno()
+        def readinto(self, b):
+            return self._f.readinto(memoryview(b)[:7])
+
+    open_sequential = messagereader_node._open_sequential
+    monkeypatch.setattr(messagereader_node, '_open_sequential',
+                        lambda p, *a, **kw: Trickle(open_sequential(p, *a, **kw)))
+    assert reader._read_file_data(str(path)) == doc
+
+
+@pytest.mark.parametrize('structure', ['auto_detect', 'reconstruct_message'])
+def test_reconstructed_message_gets_filename_only_when_missing(reader, structure):
+    reader.configure({'output_structure': structure})
+    src = {'payload': 1, 'topic': 't'}
+
+    msg = reader._create_output_message(src, 'f.json')
+    assert msg == {'payload': 1, 'topic': 't', 'filename': 'f.json'}
+    assert msg is not src and 'filename' not in src
+
+    kept = reader._create_output_message({'payload': 1, 'filename': 'orig.json'}, 'f.json')
+    assert kept['filename'] == 'orig.json'
+
+
+def test_auto_detect_recognises_message_by_msgid_alone(reader):
+    msg = reader._create_output_message({'_msgid': 'abc', 'x': 1}, 'f.json')
+    assert msg == {'_msgid': 'abc', 'x': 1, 'filename': 'f.json'}
+
+    wrapped = reader._create_output_message({'x': 1}, 'f.json')
+    assert wrapped['payload'] == {'x': 1}
+
+
+def test_output_structure_change_takes_effect_on_configure(reader):
+    reader.configure({'output_structure': 'wrap_in_data'})
+    assert reader._create_output_message(5, 'f.json')['payload'] == {'data': 5, 'filename': 'f.json'}
+
+    reader.configure({'output_structure': 'direct_payload'})
+    assert reader._create_output_message(5, 'f.json')['payload'] == 5
+
+
+def test_metadata_iso_time_can_be_disabled(reader, tmp_path):
+    path = tmp_path / 'a.json'
+    path.write_text('{}', encoding='utf-8')
+    os.utime(path, (1000, 1000))
+
+    assert reader._get_file_metadata(str(path))['modified_iso'] == datetime.fromtimestamp(1000).isoformat()
+
+    reader.configure({'metadata_iso_time': 'false'})
+    metadata = reader._get_file_metadata(str(path))
+    assert 'modified_iso' not in metadata
+    assert metadata['modified'] == 1000 and metadata['basename'] == 'a.json'
+
+
+def test_numpy_array_decodes_base64_with_line_breaks(reader):
+    arr = np.arange(100, dtype=np.int32)
+    encoded = base64.encodebytes(arr.tobytes()).decode('ascii')  # wrapped every 76 chars
+    decoded = reader._decode_numpy_array(
+        {'_numpy_array': True, 'data': encoded, 'dtype': 'int32', 'shape': [100]})
+    np.testing.assert_array_equal(decoded, arr)
@@ -0,0 +1,427 @@
+"""Unit tests for MessageWriterNode file output.
+
+The node is driven directly (no engine or Flask); status messages are
+collected by a synchronous sink connected to its output.
+"""
+
+import decimal
+import json
+import os
+import pathlib
+import pickle
+import uuid
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from pynode.nodes.base_node import BaseNode
+from pynode.nodes.MessageWriterNode import messagewriter_node
+from pynode.nodes.MessageWriterNode.messagereader_node import MessageReaderNode
+from pynode.nodes.MessageWriterNode.messagewriter_node import MessageWriterNode
+
+
+class _Sink(BaseNode):
+    input_count = 1
+    output_count = 0
+
+    def __init__(self):
+        super().__init__()
+        self.received = []
+
+    def on_input_direct(self, msg, input_index=0):
+        self.received.append(msg)
+
+
+@pytest.fixture
+def writer(tmp_path):
+    node = MessageWriterNode()
+    node.configure({'directory': str(tmp_path)})
+    node.sink = _Sink()
+    node.connect(node.sink)
+    return node
+
+
+@pytest.mark.parametrize('output_format', ['json', 'json_compact'])
+def test_json_write_reports_exact_byte_count(writer, tmp_path, output_format):
+    writer.configure({'output_format': output_format, 'data_source': 'payload'})
+    writer.on_input({'payload': {'text': 'héllo', 'n': [1, 2, 3]}})
+
+    status = writer.sink.received[-1]['payload']
+    assert status['status'] == 'success'
+    path = tmp_path / 'message_0001.json'
+    assert status['path'] == str(path)
+    assert status['bytes'] == path.stat().st_size
+    assert json.loads(path.read_text(encoding='utf-8')) == {'text': 'héllo', 'n': [1, 2, 3]}
+
+
+def test_existing_file_is_skipped_unless_overwrite(writer, tmp_path):
+    (tmp_path / 'message_0001.json').write_text('old', encoding='utf-8')
+    writer.on_input({'payload': 1})
+    assert writer.sink.received[-1]['payload']['status'] == 'skipped'
+    assert (tmp_path / 'message_0001.json').read_text(encoding='utf-8') == 'old'
+
+    writer.reset_counter()
+    writer.configure({'overwrite': 'true', 'data_source': 'payload'})
+    writer.on_input({'payload': 1})
+    assert writer.sink.received[-1]['payload']['status'] == 'success'
+    assert (tmp_path / 'message_0001.json').read_text(encoding='utf-8') == '1'
+
+
+def test_numpy_payload_roundtrips_through_message_reader(writer, tmp_path):
+    arr = np.arange(12, dtype=np.int16).reshape(3, 4)
+    writer.configure({'data_source': 'payload'})
+    writer.on_input({'payload': {'image': arr, 'score': np.float32(0.5)}})
+
+    data = MessageReaderNode()._read_file_data(str(tmp_path / 'message_0001.json'))
+    np.testing.assert_array_equal(data['image'], arr)
+    assert data['image'].dtype == np.int16
+    assert data['score'] == 0.5
+
+
+@pytest.mark.parametrize('use_orjson', [True, False])
+def test_json_encoding_matches_with_and_without_orjson(monkeypatch, writer, tmp_path, use_orjson):
+    if use_orjson and not messagewriter_node.ORJSON_AVAILABLE:
+        pytest.skip('orjson not installed')
+    monkeypatch.setattr(messagewriter_node, 'ORJSON_AVAILABLE', use_orjson)
+    writer.configure({'data_source': 'payload', 'output_format': 'json_compact'})
+
+    writer.on_input({'payload': {1: 'int key', 'big': 2 ** 70, 'v': np.int64(7)}})
+
+    written = (tmp_path / 'message_0001.json').read_text(encoding='utf-8')
+    assert json.loads(written) == {'1': 'int key', 'big': 2 ** 70, 'v': 7}
+    assert ' ' not in written.replace('int key', '')
+
+
+def test_reconfigure_applies_to_next_message(writer, tmp_path):
+    writer.on_input({'payload': 1})
+    writer.configure({'filename': 'frame', 'counter_digits': '6', 'output_format': 'text',
+                      'extension': 'txt', 'data_source': 'payload'})
+    writer.on_input({'payload': 2})
+
+    assert (tmp_path / 'message_0001.json').exists()
+    assert (tmp_path / 'frame_000002.txt').read_text(encoding='utf-8') == '2'
+
+
+def test_malformed_counter_digits_fall_back_to_four(writer, tmp_path):
+    errors = []
+    writer.report_error = errors.append
+    writer.configure({'counter_digits': 'six', 'data_source': 'payload'})  # must not raise
+    writer.on_input({'payload': 1})
+
+    assert (tmp_path / 'message_0001.json').exists()
+    assert len(errors) == 1
+
+
+def test_directory_removed_after_first_write_is_recreated(writer, tmp_path):
+    out_dir = tmp_path / 'out'
+    writer.configure({'directory': str(out_dir), 'data_source': 'payload'})
+    writer.on_input({'payload': 1})
+    (out_dir / 'message_0001.json').unlink()
+    out_dir.rmdir()
+
+    writer.on_input({'payload': 2})
+    assert writer.sink.received[-1]['payload']['status'] == 'error'
+    writer.on_input({'payload': 3})
+    assert writer.sink.received[-1]['payload']['status'] == 'success'
+    assert (out_dir / 'message_0003.json').read_text(encoding='utf-8') == '3'
+
+
+@pytest.mark.parametrize('output_format', ['json', 'pickle', 'numpy', 'text', 'raw'])
+def test_no_overwrite_skips_every_output_format(writer, tmp_path, output_format):
+    target = tmp_path / 'message_0001.json'
+    target.write_bytes(b'old')
+    writer.configure({'output_format': output_format, 'data_source': 'payload'})
+
+    writer.on_input({'payload': [1, 2, 3]})
+
+    assert writer.sink.received[-1]['payload'] == {
+        'status': 'skipped', 'reason': 'file_exists', 'path': str(target)}
+    assert target.read_bytes() == b'old'
+
+
+def test_custom_path_extracts_nested_value(writer, tmp_path):
+    writer.configure({'data_source': 'custom', 'custom_path': 'msg.payload.detections'})
+    writer.on_input({'payload': {'detections': [{'label': 'cat'}]}})
+    assert json.loads((tmp_path / 'message_0001.json').read_text()) == [{'label': 'cat'}]
+
+    writer.configure({'custom_path': 'payload.missing'})
+    errors = []
+    writer.report_error = errors.append
+    writer.on_input({'payload': {'detections': []}})
+    assert errors == ['No data found to write']
+
+
+@pytest.mark.parametrize('ns', [0, 1_700_000_000_123_456_789, 1_234_567_890_987_000_000])
+def test_datetime_stamp_matches_strftime(ns):
+    expected = datetime.fromtimestamp(ns // 10 ** 9).strftime('%Y%m%d_%H%M%S_')
+    assert messagewriter_node._datetime_stamp(ns) == expected + '%03d' % (ns // 10 ** 6 % 1000)
+
+
+def test_timestamp_and_datetime_naming(writer, tmp_path, monkeypatch):
+    monkeypatch.setattr(messagewriter_node.time, 'time_ns', lambda: 1_700_000_000_123_456_789)
+    writer.configure({'naming_mode': 'timestamp', 'data_source': 'payload'})
+    writer.on_input({'payload': 1})
+    writer.configure({'naming_mode': 'datetime', 'filename': 'cap_{datetime}'})
+    writer.on_input({'payload': 2})
+
+    stamp = datetime.fromtimestamp(1_700_000_000).strftime('%Y%m%d_%H%M%S')
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted([
+        'message_1700000000123.json', f'cap_{stamp}_123.json'])
+
+
+def test_numpy_sidecar_mode_roundtrips_through_message_reader(writer, tmp_path):
+    arr = np.arange(6, dtype=np.float32).reshape(2, 3)
+    writer.configure({'data_source': 'payload', 'numpy_inline': 'false'})
+    writer.on_input({'payload': {'a': arr, 'again': arr, 'b': arr[0].copy()}})
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        'message_0001.json', 'message_0001.json.arr0.npy', 'message_0001.json.arr1.npy']
+    assert b'"data"' not in (tmp_path / 'message_0001.json').read_bytes()
+    assert writer.sink.received[-1]['payload']['bytes'] == sum(p.stat().st_size for p in tmp_path.iterdir())
+
+    data = MessageReaderNode()._read_file_data(str(tmp_path / 'message_0001.json'))
+    np.testing.assert_array_equal(data['a'], arr)
+    np.testing.assert_array_equal(data['again'], arr)
+    np.testing.assert_array_equal(data['b'], arr[0])
+
+
+def test_pickle_output_uses_protocol_5_and_loads_with_pickle(writer, tmp_path):
+    arr = np.arange(1000, dtype=np.uint8)
+    writer.configure({'data_source': 'payload', 'output_format': 'pickle', 'extension': 'pkl'})
+    writer.on_input({'payload': {'frame': arr}})
+
+    raw = (tmp_path / 'message_0001.pkl').read_bytes()
+    assert raw[:2] == b'\x80\x05'
+    np.testing.assert_array_equal(pickle.loads(raw)['frame'], arr)
+
+
+def test_background_write_reports_each_file_in_order(writer, tmp_path):
+    writer.configure({'background_write': True, 'data_source': 'payload'})
+    for i in range(20):
+        writer.on_input({'payload': i, 'topic': 'cam'})
+    writer.flush()
+
+    statuses = [m['payload'] for m in writer.sink.received]
+    assert [s['counter'] for s in statuses] == list(range(1, 21))
+    assert all(s['status'] == 'success' for s in statuses)
+    assert all(m['topic'] == 'cam' for m in writer.sink.received)
+    assert (tmp_path / 'message_0020.json').read_text(encoding='utf-8') == '19'
+
+    thread = writer._writer_thread
+    writer.on_stop()
+    assert not thread.is_alive()
+
+
+def test_write_all_gathers_buffers_and_handles_short_writes(tmp_path, monkeypatch):
+    chunks = [b'abc', b'', bytearray(b'defg'), np.arange(4, dtype=np.uint8)]
+
+    def short_writev(fd, buffers):
+        # Write at most 2 bytes per call to exercise the resume logic
+        return os.write(fd, b''.join(bytes(b) for b in buffers)[:2])
+
+    if messagewriter_node._HAS_WRITEV:
+        monkeypatch.setattr(messagewriter_node.os, 'writev', short_writev)
+    path = tmp_path / 'out.bin'
+    assert messagewriter_node._write_file(str(path), chunks) == 11
+    assert path.read_bytes() == b'abcdefg\x00\x01\x02\x03'
+
+
+def test_raw_format_writes_array_memory(writer, tmp_path):
+    arr = np.arange(12, dtype=np.uint16).reshape(3, 4)
+    writer.configure({'data_source': 'payload', 'output_format': 'raw', 'extension': 'bin'})
+    writer.on_input({'payload': arr.T})  # non-contiguous view
+
+    assert (tmp_path / 'message_0001.bin').read_bytes() == np.ascontiguousarray(arr.T).tobytes()
+    assert writer.sink.received[-1]['payload']['bytes'] == arr.nbytes
+
+
+@pytest.mark.parametrize('output_format', ['pickle', 'numpy'])
+def test_binary_formats_report_file_size(writer, tmp_path, output_format):
+    writer.configure({'data_source': 'payload', 'output_format': output_format, 'extension': 'bin'})
+    writer.on_input({'payload': np.ones((4, 4))})
+
+    assert writer.sink.received[-1]['payload']['bytes'] == (tmp_path / 'message_0001.bin').stat().st_size
+
+
+def test_drop_page_cache_advises_written_file(writer, tmp_path, monkeypatch):
+    if not hasattr(os, 'posix_fadvise'):
+        pytest.skip('posix_fadvise not available')
+    advised = []
+    real_fadvise = os.posix_fadvise
+    monkeypatch.setattr(messagewriter_node.os, 'posix_fadvise',
+                        lambda fd, offset, length, advice: advised.append(advice) or real_fadvise(fd, offset, length, advice))
+    writer.configure({'data_source': 'payload', 'drop_page_cache': True})
+    writer.on_input({'payload': 1})
+
+    assert advised == [os.POSIX_FADV_DONTNEED]
+    assert (tmp_path / 'message_0001.json').read_text(encoding='utf-8') == '1'
+
+
+@pytest.mark.parametrize('naming_mode, filename, fname, expected', [
+    ('counter', 'img_{counter}_x', None, 'img_0001_x.json'),
+    ('counter', 'img', 'frame_{counter}', 'frame_0001.json'),
+    ('counter', 'img_{counter}', 'plain', 'plain_0001.json'),
+    ('timestamp', 't{timestamp}', None, 't1700000000123.json'),
+    ('timestamp', 'cap', None, 'cap_1700000000123.json'),
+    ('message', 'img', 'given', 'given.json'),
+])
+def test_filename_generation(writer, tmp_path, monkeypatch, naming_mode, filename, fname, expected):
+    monkeypatch.setattr(messagewriter_node.time, 'time_ns', lambda: 1_700_000_000_123_456_789)
+    writer.configure({'naming_mode': naming_mode, 'filename': filename, 'data_source': 'payload'})
+    msg = {'payload': 1}
+    if fname is not None:
+        msg['fname'] = fname
+    writer.on_input(msg)
+
+    assert writer.sink.received[-1]['payload']['filename'] == expected
+
+
+@pytest.mark.parametrize('output_format, payload, expected', [
+    ('text', {'k': 'é'}, "{'k': 'é'}".encode('utf-8')),
+    ('raw', 'é\n', 'é\n'.encode('utf-8')),
+    ('raw', b'\x00\x01', b'\x00\x01'),
+])
+def test_text_and_raw_write_encoded_bytes(writer, tmp_path, output_format, payload, expected):
+    writer.configure({'data_source': 'payload', 'output_format': output_format, 'extension': 'txt'})
+    writer.on_input({'payload': payload})
+
+    assert (tmp_path / 'message_0001.txt').read_bytes() == expected
+    assert writer.sink.received[-1]['payload']['bytes'] == len(expected)
+
+
+def test_jsonl_output_appends_lines_readable_by_message_reader(writer, tmp_path):
+    writer.configure({'output_style': 'jsonl', 'data_source': 'payload', 'filename': 'log'})
+    for i in range(3):
+        writer.on_input({'payload': {'i': i, 'text': 'a\nb'}})
+    writer.on_stop()
+
+    assert [p.name for p in tmp_path.iterdir()] == ['log.jsonl']
+    statuses = [m['payload'] for m in writer.sink.received]
+    assert [s['counter'] for s in statuses] == [1, 2, 3]
+    assert sum(s['bytes'] for s in statuses) == (tmp_path / 'log.jsonl').stat().st_size
+
+    reader = MessageReaderNode()
+    reader.configure({'directory': str(tmp_path), 'reading_mode': 'ndjson_batch',
+                      'specific_file': 'log.jsonl', 'output_structure': 'direct_payload'})
+    sink = _Sink()
+    reader.connect(sink)
+    reader.on_input({})
+    assert [m['payload'] for m in sink.received] == [
+        {'i': i, 'text': 'a\nb', 'batch_index': i, 'batch_total': 3} for i in range(3)]
+
+
+def test_jsonl_rotate_starts_new_part_when_full(writer, tmp_path):
+    record = {'v': 'x' * 40}
+    line = len(json.dumps(record, separators=(',', ':'))) + 1
+    writer.configure({'output_style': 'jsonl_rotate', 'rotate_size_mb': str(120 / 1024 / 1024),
+                      'data_source': 'payload', 'background_write': True})
+    for _ in range(5):
+        writer.on_input({'payload': record})
+    writer.flush()
+
+    sizes = {p.name: p.stat().st_size for p in tmp_path.iterdir()}
+    assert sizes == {'message_0001.jsonl': 2 * line, 'message_0002.jsonl': 2 * line, 'message_0003.jsonl': line}
+
+    # A new writer continues after the parts that are already full
+    writer.configure({'background_write': False})
+    writer.on_input({'payload': record})
+    assert writer.sink.received[-1]['payload']['path'] == str(tmp_path / 'message_0003.jsonl')
+
+
+def test_malformed_rotate_size_only_matters_when_rotating(writer, tmp_path):
+    errors = []
+    writer.report_error = errors.append
+    writer.configure({'rotate_size_mb': 'big', 'data_source': 'payload'})  # must not raise
+    assert errors == []
+    writer.configure({'output_style': 'jsonl_rotate'})
+    assert len(errors) == 1 and writer._rotate_bytes == 64 * 1024 * 1024
+    writer.on_input({'payload': 1})
+    assert (tmp_path / 'message_0001.jsonl').read_text(encoding='utf-8') == '1\n'
+
+
+@pytest.mark.parametrize('use_orjson', [True, False])
+def test_common_types_serialize_the_same_with_and_without_orjson(monkeypatch, writer, tmp_path, use_orjson):
+    if use_orjson and not messagewriter_node.ORJSON_AVAILABLE:
+        pytest.skip('orjson not installed')
+    monkeypatch.setattr(messagewriter_node, 'ORJSON_AVAILABLE', use_orjson)
+    writer.configure({'data_source': 'payload'})
+    writer.on_input({'payload': {
+        'when': datetime(2024, 12, 3, 15, 30, 45),
+        'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+        'price': decimal.Decimal('1.10'),
+        'file': pathlib.Path('a') / 'b.txt',
+    }})
+
+    assert json.loads((tmp_path / 'message_0001.json').read_text(encoding='utf-8')) == {
+        'when': '2024-12-03T15:30:45',
+        'id': '12345678-1234-5678-1234-567812345678',
+        'price': '1.10',
+        'file': str(pathlib.Path('a') / 'b.txt'),
+    }
+
+
+def test_unconnected_writer_skips_building_status_messages(tmp_path, monkeypatch):
+    node = MessageWriterNode()
+    node.configure({'directory': str(tmp_path), 'data_source': 'payload'})
+    created = []
+    monkeypatch.setattr(node, 'create_message', lambda *a, **k: created.append(k))
+
+    node.on_input({'payload': 1})
+
+    assert (tmp_path / 'message_0001.json').read_text(encoding='utf-8') == '1'
+    assert created == []
+
+
+def test_numpy_scalars_and_subclasses_serialize_as_numbers(writer, tmp_path):
+    class _Sub(np.ndarray):
+        pass
+
+    writer.configure({'data_source': 'payload', 'output_format': 'json_compact'})
+    writer.on_input({'payload': {
+        'ints': [np.int8(-1), np.uint64(2 ** 63), np.longlong(3)],
+        'floats': [np.float16(0.5), np.float64(1.25)],
+        'sub': np.arange(3).view(_Sub),
+    }})
+
+    data = MessageReaderNode()._read_file_data(str(tmp_path / 'message_0001.json'))
+    assert data['ints'] == [-1, 2 ** 63, 3]
+    assert data['floats'] == [0.5, 1.25]
+    np.testing.assert_array_equal(data['sub'], [0, 1, 2])
+
+
+@pytest.mark.parametrize('output_format', ['json', 'numpy', 'pickle'])
+def test_failed_serialization_never_clobbers_existing_file(writer, tmp_path, monkeypatch,
+                                                          output_format):
+    monkeypatch.setattr(os.path, 'lexists', lambda p: pytest.fail('extra stat per write'))
+    circular = {}
+    circular['self'] = circular
+    payload = [[1, 2], [3]] if output_format == 'numpy' else circular
+    if output_format == 'pickle':
+        payload = {'f': lambda: None}  # lambdas do not pickle
+    writer.configure({'data_source': 'payload', 'output_format': output_format,
+                      'extension': 'json'})
+    keep = tmp_path / 'message_0001.json'
+    keep.write_text('PRECIOUS', encoding='utf-8')
+    writer.on_input({'payload': payload})
+
+    assert writer.sink.received[-1]['payload']['status'] == 'skipped'
+    assert keep.read_text(encoding='utf-8') == 'PRECIOUS'
+
+    # Without an existing file the str() fallback still writes something
+    writer.on_input({'payload': payload})
+    assert writer.sink.received[-1]['payload']['status'] == 'success'
+    assert (tmp_path / 'message_0002.json').read_text(encoding='utf-8') == str(payload)
+
+
+@pytest.mark.parametrize('arr', [
+    np.array(['2020-01-01', '2021-01-01'], dtype='datetime64[D]'),
+    np.array([(1, 2.5)], dtype=[('a', 'i4'), ('b', 'f8')]),
+    np.zeros((0, 3), np.float32),
+    np.arange(6, dtype='>i4').reshape(2, 3)[:, ::2],
+])
+def test_raw_format_writes_any_dtype_as_bytes(writer, tmp_path, arr):
+    writer.configure({'data_source': 'payload', 'output_format': 'raw', 'extension': 'bin'})
+    writer.on_input({'payload': arr})
+    assert writer.sink.received[-1]['payload']['status'] == 'success'
+    assert (tmp_path / 'message_0001.bin').read_bytes() == arr.tobytes()
@@ -0,0 +1,201 @@
+"""Tests for MQTTService message routing.
+
+A real paho client is created but never connected: incoming messages are
+injected through paho's own delivery path so the per-topic callbacks
+registered by ``MQTTService.subscribe`` and the dispatch worker thread are
+exercised end to end without a broker.
+"""
+
+import threading
+
+import pytest
+
+from pynode.nodes.MQTTNode import mqtt_service
+
+if not mqtt_service.MQTT_AVAILABLE:
+    pytest.skip('paho-mqtt not installed', allow_module_level=True)
+
+
+@pytest.fixture
+def services():
+    created = []
+    yield created
+    for svc in created:
+        svc.disconnect()
+
+
+@pytest.fixture
+def make_service(services):
+    def _make():
+        svc = mqtt_service.MQTTService('abcd1234', {'broker': 'localhost'})
+        svc.client = mqtt_service._create_client(svc.client_id, True)
+        svc.client.on_message = svc._on_message
+        svc._start_rx_worker()
+        services.append(svc)
+        return svc
+    return _make
+
+
+def _deliver(svc, topic, payload=b'x'):
+    """Inject a message on paho's side and wait for the worker to dispatch it."""
+    message = mqtt_service.mqtt.MQTTMessage(topic=topic.encode())
+    message.payload = payload
+    svc.client._handle_on_message(message)
+    svc._rx_queue.join()
+
+
+def test_exact_and_wildcard_subscribers_receive_matching_topics(make_service):
+    svc = make_service()
+    exact, plus, hash_ = [], [], []
+    svc.subscribe('n1', 'home/kitchen/temp', 0, lambda t, p: exact.append((t, p)))
+    svc.subscribe('n2', 'home/+/temp', 0, lambda t, p: plus.append(t))
+    svc.subscribe('n3', 'home/#', 0, lambda t, p: hash_.append(t))
+
+    _deliver(svc, 'home/kitchen/temp', b'21')
+    _deliver(svc, 'home/hall/temp')
+    _deliver(svc, 'home/hall/light')
+    _deliver(svc, 'garden/temp')
+
+    assert exact == [('home/kitchen/temp', b'21')]
+    assert plus == ['home/kitchen/temp', 'home/hall/temp']
+    assert hash_ == ['home/kitchen/temp', 'home/hall/temp', 'home/hall/light']
+
+
+def test_unsubscribe_stops_delivery_and_keeps_other_subscribers(make_service):
+    svc = make_service()
+    a, b = [], []
+    cb_a = lambda t, p: a.append(t)  # noqa: E731
+    cb_b = lambda t, p: b.append(t)  # noqa: E731
+    svc.subscribe('na', 'x/y', 0, cb_a)
+    svc.subscribe('nb', 'x/y', 0, cb_b)
+
+    _deliver(svc, 'x/y')
+    svc.unsubscribe('na', 'x/y', cb_a)
+    _deliver(svc, 'x/y')
+    svc.unsubscribe('nb', 'x/y', cb_b)
+    _deliver(svc, 'x/y')
+
+    assert a == ['x/y']
+    assert b == ['x/y', 'x/y']
+    assert 'x/y' not in svc._subscribers
+
+
+def test_failing_callback_does_not_block_other_subscribers(make_service):
+    svc = make_service()
+    got = []
+
+    def boom(topic, payload):
+        raise RuntimeError('boom')
+
+    svc.subscribe('n1', 't', 0, boom)
+    svc.subscribe('n2', 't', 0, lambda t, p: got.append(t))
+    _deliver(svc, 't')
+
+    assert got == ['t']
+
+
+def test_same_callback_subscribed_twice_is_delivered_once(make_service):
+    svc = make_service()
+
+    class _Node:
+        def __init__(self):
+            self.got = []
+
+        def on_message(self, topic, payload):
+            self.got.append(topic)
+
+    node = _Node()
+    # Bound methods are fresh objects per attribute access but compare equal.
+    svc.subscribe('n', 'a/b', 0, node.on_message)
+    svc.subscribe('n', 'a/b', 0, node.on_message)
+    _deliver(svc, 'a/b')
+    assert node.got == ['a/b']
+
+    svc.unsubscribe('n', 'a/b', node.on_message)
+    assert 'a/b' not in svc._subscribers
+
+
+@pytest.mark.parametrize('pattern, topic, expected', [
+    ('a/b', 'a/b', True),
+    ('a/b', 'a/c', False),
+    ('a/+', 'a/b', True),
+    ('a/+', 'a/b/c', False),
+    ('a/#', 'a/b/c', True),
+    ('#', 'anything/at/all', True),
+    ('a/b/c', 'a/b', False),
+])
+def test_topic_matches(pattern, topic, expected):
+    svc = mqtt_service.MQTTService('abcd1234', {})
+    assert svc._topic_matches(pattern, topic) is expected
+
+
+def test_reconnect_resubscribes_all_topics_in_one_call():
+    svc = mqtt_service.MQTTService('abcd1234', {})
+    svc.subscribe('n1', 'a/b', 1, lambda t, p: None)
+    svc.subscribe('n2', 'c/#', 0, lambda t, p: None)
+    svc.subscribe('n3', 'c/#', 2, lambda t, p: None)
+
+    class _Client:
+        def __init__(self):
+            self.calls = []
+
+        def subscribe(self, *args):
+            self.calls.append(args)
+
+    client = _Client()
+    svc._on_connect(client, None, None, 0)
+
+    assert client.calls == [([('a/b', 1), ('c/#', 2)],)]
+    assert svc.connected
+
+
+def test_error_callbacks_follow_register_and_unregister():
+    svc = mqtt_service.MQTTService('abcd1234', {})
+    a, b = [], []
+    svc.register_node('a', a.append)
+    svc.register_node('b', b.append)
+    svc._notify_error('first')
+    svc.unregister_node('a')
+    svc._notify_error('second')
+
+    assert a == ['first']
+    assert b == ['first', 'second']
+
+
+def test_callbacks_run_off_the_paho_thread_in_order(make_service):
+    svc = make_service()
+    seen = []
+    svc.subscribe('n', 'seq', 0, lambda t, p: seen.append((p, threading.current_thread().name)))
+    for i in range(50):
+        message = mqtt_service.mqtt.MQTTMessage(topic=b'seq')
+        message.payload = i
+        svc.client._handle_on_message(message)
+    svc._rx_queue.join()
+
+    assert [p for p, _ in seen] == list(range(50))
+    assert {name for _, name in seen} == {'mqtt-rx-abcd1234'}
+
+
+def test_disconnect_stops_the_dispatch_worker(make_service):
+    svc = make_service()
+    thread = svc._rx_thread
+    assert thread.is_alive()
+    svc.disconnect()
+    assert not thread.is_alive()
+
+
+def test_fallback_routing_handles_exact_and_wildcard_filters(make_service):
+    svc = make_service()
+    exact, wild = [], []
+    svc.subscribe('n1', 'a/b', 0, lambda t, p: exact.append(t))
+    svc.subscribe('n2', 'a/+', 0, lambda t, p: wild.append(t))
+    assert svc._wildcard_topics == ('a/+',)
+
+    # Bypass paho's per-filter routing to exercise the on_message fallback.
+    for topic in ('a/b', 'a/c', 'b/b'):
+        message = mqtt_service.mqtt.MQTTMessage(topic=topic.encode())
+        svc._on_message(svc.client, None, message)
+    svc._rx_queue.join()
+
+    assert exact == ['a/b']
+    assert wild == ['a/b', 'a/c']
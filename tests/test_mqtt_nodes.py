@@ -0,0 +1,114 @@
+"""Tests for the MQTT In / Out nodes against a fake in-process service.
+
+No broker is needed: the nodes only talk to ``MQTTService`` through
+``publish`` / ``subscribe``, so a tiny stand-in records the calls.
+"""
+
+import pytest
+
+from pynode.nodes.base_node import BaseNode
+from pynode.nodes.MQTTNode.mqtt_in_node import MqttInNode
+from pynode.nodes.MQTTNode.mqtt_out_node import MqttOutNode
+
+
+class _FakeService:
+    broker = 'fake'
+    port = 1883
+    connected = True
+
+    def __init__(self):
+        self.published = []
+
+    def publish(self, topic, payload, qos=0, retain=False):
+        self.published.append((topic, payload, qos, retain))
+        return True
+
+
+def test_out_node_publishes_with_configured_qos_and_retain():
+    node = MqttOutNode()
+    node.configure({'topic': 'a/b', 'qos': '1', 'retain': 'true'})
+    node._service = _FakeService()
+
+    node.on_input({'payload': 'hello'})
+    node.on_input({'payload': 'x', 'topic': 'override'})
+
+    assert node._service.published == [
+        ('a/b', 'hello', 1, True),
+        ('override', 'x', 1, True),
+    ]
+
+
+def test_out_node_picks_up_reconfigure_while_running():
+    node = MqttOutNode()
+    node._service = _FakeService()
+    node.on_input({'payload': 1})
+
+    node.configure({'qos': '2', 'retain': 'false', 'topic': 'new/topic'})
+    node.on_input({'payload': 2})
+
+    assert node._service.published == [
+        ('test/topic', 1, 0, False),
+        ('new/topic', 2, 2, False),
+    ]
+
+
+def test_out_node_malformed_qos_falls_back_to_zero():
+    node = MqttOutNode()
+    errors = []
+    node.report_error = errors.append
+    node.configure({'qos': 'high'})
+    node._service = _FakeService()
+    node.on_input({'payload': 1})
+
+    assert node._service.published == [('test/topic', 1, 0, False)]
+    assert errors and 'QoS' in errors[0]
+
+
+class _Sink(BaseNode):
+    input_count = 1
+    output_count = 0
+
+    def __init__(self):
+        super().__init__()
+        self.received = []
+
+    def on_input_direct(self, msg, input_index=0):
+        self.received.append(msg)
+
+
+def _in_node(payload_format):
+    node = MqttInNode()
+    node.configure({'payloadFormat': payload_format})
+    node._service = _FakeService()
+    sink = _Sink()
+    node.connect(sink)
+    node.sent = sink.received
+    return node
+
+
+@pytest.mark.parametrize('payload_format, raw, expected', [
+    ('auto', b'{"a": 1}', {'a': 1}),
+    ('auto', b'42', 42),
+    ('auto', b'hello', 'hello'),
+    ('auto', b'\xff\xd8\xff', b'\xff\xd8\xff'),
+    ('text', b'{"a": 1}', '{"a": 1}'),
+    ('json', b'[1, 2]', [1, 2]),
+    ('bytes', b'{"a": 1}', b'{"a": 1}'),
+])
+def test_in_node_payload_format(payload_format, raw, expected):
+    node = _in_node(payload_format)
+    node._on_message('t/1', raw)
+
+    assert len(node.sent) == 1
+    assert node.sent[0]['payload'] == expected
+    assert node.sent[0]['topic'] == 't/1'
+
+
+def test_in_node_json_format_reports_invalid_payload():
+    node = _in_node('json')
+    errors = []
+    node.report_error = errors.append
+    node._on_message('t/1', b'not json')
+
+    assert node.sent == []
+    assert errors and 'Invalid JSON' in errors[0]
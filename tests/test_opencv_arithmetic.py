@@ -0,0 +1,220 @@
+"""Tests for the OpenCV ArithmeticNode.
+
+Results are compared against straightforward float reference computations
+(with +-1 tolerance where OpenCV rounds instead of truncating).
+"""
+
+import numpy as np
+import pytest
+
+from pynode.nodes.OpenCV.arithmetic_node import ArithmeticNode
+
+
+def _img(seed=0, h=8, w=10, c=3):
+    rng = np.random.default_rng(seed)
+    shape = (h, w, c) if c > 1 else (h, w)
+    return rng.integers(0, 256, shape, dtype=np.uint8)
+
+
+def _make(sink, **config):
+    node = ArithmeticNode(name='arith')
+    node.configure(config)
+    node.connect(sink)
+    return node
+
+
+def _run(sink, node, img1, img2=None):
+    node.on_input({'payload': img1}, 0)
+    if img2 is not None:
+        node.on_input({'payload': img2}, 1)
+    return sink.received[-1]['payload']['image']
+
+
+def _close(a, b, tol=1):
+    return np.abs(a.astype(np.int16) - b.astype(np.int16)).max() <= tol
+
+
+@pytest.mark.parametrize('operation, reference', [
+    ('add', lambda a, b: np.clip(a + b, 0, 255)),
+    ('subtract', lambda a, b: np.clip(a - b, 0, 255)),
+    ('absdiff', lambda a, b: np.abs(a - b)),
+    ('min', np.minimum),
+    ('max', np.maximum),
+    ('multiply', lambda a, b: np.clip(a * b / 255.0, 0, 255)),
+    ('weighted_add', lambda a, b: np.clip(0.5 * a + 0.5 * b, 0, 255)),
+])
+def test_image_mode_matches_reference(node_classes, operation, reference):
+    sink = node_classes['sink'](name='sink')
+    node = _make(sink, operation=operation, mode='image')
+    a, b = _img(1), _img(2)
+    out = _run(sink, node, a, b)
+    expected = reference(a.astype(np.float64), b.astype(np.float64))
+    assert out.dtype == np.uint8
+    assert _close(out, np.rint(expected).astype(np.uint8))
+
+
+def test_divide_image_mode_zero_divisor_yields_zero(node_classes):
+    sink = node_classes['sink'](name='sink')
+    node = _make(sink, operation='divide', mode='image')
+    a = np.full((4, 4, 3), 100, np.uint8)
+    b = np.full((4, 4, 3), 200, np.uint8)
+    b[0, 0] = 0
+    out = _run(sink, node, a, b)
+    assert out[0, 0].tolist() == [0, 0, 0]
+    assert _close(out[1:], np.full_like(out[1:], 128))
+
+
+@pytest.mark.parametrize('operation, constant, reference', [
+    ('add', '40', lambda a: np.clip(a + 40, 0, 255)),
+    ('subtract', '40', lambda a: np.clip(a - 40, 0, 255)),
+    ('subtract', '-40', lambda a: np.clip(a + 40, 0, 255)),
+    ('absdiff', '100', lambda a: np.abs(a - 100)),
+    ('min', '100', lambda a: np.minimum(a, 100)),
+    ('max', '300', lambda a: np.maximum(a, 255)),
+    ('multiply', '510', lambda a: np.clip(a * 2, 0, 255)),
+    ('divide', '510', lambda a: a / 2),
+    ('divide', '0', lambda a: a),
+])
+def test_constant_mode_matches_reference(node_classes, operation, constant, reference):
+    sink = node_classes['sink'](name='sink')
+    node = _make(sink, operation=operation, mode='constant', constant=constant)
+    a = _img(3)
+    out = _run(sink, node, a)
+    assert out.shape == a.shape and out.dtype == np.uint8
+    assert _close(out, np.rint(reference(a.astype(np.float64))).astype(np.uint8))
+
+
+@pytest.mark.parametrize('c', [1, 3])
+def test_sqrt_and_power(node_classes, c):
+    a = _img(4, c=c)
+    sink = node_classes['sink'](name='sink')
+    out = _run(sink, _make(sink, operation='sqrt'), a)
+    assert _close(out, np.sqrt(a.astype(np.float64)).astype(np.uint8))
+
+    sink = node_classes['sink'](name='sink')
+    out = _run(sink, _make(sink, operation='power', mode='constant', constant='0.5'), a)
+    expected = np.power(a / 255.0, 0.5) * 255.0
+    assert _close(out, expected.astype(np.uint8))
+
+
+def test_gray_and_color_inputs_are_matched(node_classes):
+    sink = node_classes['sink'](name='sink')
+    node = _make(sink, operation='add', mode='image')
+    gray = np.full((6, 6), 10, np.uint8)
+    color = np.full((12, 12, 3), 20, np.uint8)
+    out = _run(sink, node, gray, color)
+    assert out.shape == (6, 6, 3)
+    assert (out == 30).all()
+
+
+@pytest.mark.parametrize('c', [1, 3, 4])
+def test_constant_scalar_applies_to_every_channel(node_classes, c):
+    sink = node_classes['sink'](name='sink')
+    node = _make(sink, operation='add', mode='constant', constant='25')
+    a = np.full((4, 4, c) if c > 1 else (4, 4), 100, np.uint8)
+    out = _run(sink, node, a)
+    assert out.shape == a.shape
+    assert (out == 125).all()
+
+
+def test_weighted_add_constant(node_classes):
+    sink = node_classes['sink'](name='sink')
+    node = _make(sink, operation='weighted_add', mode='constant', constant='100',
+                 alpha='0.5', beta='0.5', gamma='10')
+    out = _run(sink, node, np.full((4, 4, 3), 100, np.uint8))
+    assert (out == 110).all()
+
+
+def test_reconfigure_updates_cached_operation(node_classes):
+    sink = node_classes['sink'](name='sink')
+    node = _make(sink, operation='add', mode='constant', constant='10')
+    a = np.full((4, 4, 3), 100, np.uint8)
+    assert (_run(sink, node, a) == 110).all()
+    node.configure({'operation': 'subtract', 'constant': 'oops'})
+    assert (_run(sink, node, a) == 50).all()  # malformed constant falls back to 50
+
+
+def test_weighted_add_constant_negative_offset(node_classes):
+    sink = node_classes['sink'](name='sink')
+    node = _make(sink, operation='weighted_add', mode='constant', constant='0',
+                 alpha='1.0', beta='0.5', gamma='-50')
+    a = np.array([[10, 100, 255]], np.uint8)
+    assert _run(sink, node, a).tolist() == [[0, 50, 205]]
+
+
+@pytest.mark.parametrize('exponent', ['2', '0.45', '-1'])
+def test_power_lut_matches_float_path(node_classes, exponent):
+    sink = node_classes['sink'](name='sink')
+    node = _make(sink, operation='power', mode='constant', constant=exponent)
+    a = np.arange(256, dtype=np.uint8).reshape(16, 16)
+    out = _run(sink, node, a)
+    with np.errstate(divide='ignore'):
+        expected = np.clip(np.power(a / 255.0, float(exponent)) * 255.0, 0, 255)
+    assert _close(out, np.rint(expected).astype(np.uint8))
+
+    # Non-8-bit input still goes through the float kernels
+    wide = a.astype(np.uint16)
+    out = _run(sink, node, wide)
+    assert _close(out[1:], np.rint(expected[1:]).astype(np.uint8))
+
+
+def test_gray_expansion_buffer_is_not_shared_between_outputs(node_classes):
+    sink = node_classes['sink'](name='sink')
+    node = _make(sink, operation='max', mode='image')
+    color = np.zeros((6, 6, 3), np.uint8)
+    first = _run(sink, node, np.full((6, 6), 10, np.uint8), color)
+    buf = node._bgr_buf
+    second = _run(sink, node, np.full((6, 6), 20, np.uint8), color)
+    assert node._bgr_buf is buf  # reused across frames
+    assert (first == 10).all() and (second == 20).all()
+
+
+def test_sqrt_lut_matches_float_kernel(node_classes):
+    sink = node_classes['sink'](name='sink')
+    node = _make(sink, operation='sqrt')
+    a = np.arange(256, dtype=np.uint8).reshape(16, 16)
+    lut_out = _run(sink, node, a)
+    float_out = _run(sink, node, a.astype(np.uint16))
+    assert np.array_equal(lut_out, float_out)
+
+
+@pytest.mark.parametrize('resize_method', ['resize_second', 'resize_first', 'resize_larger'])
+def test_resize_buffers_are_reused_without_aliasing_outputs(node_classes, resize_method):
+    sink = node_classes['sink'](name='sink')
+    node = _make(sink, operation='add', mode='image', resize_method=resize_method)
+    small = np.full((4, 5, 3), 1, np.uint8)
+    outputs = []
+    for value in (10, 20):
+        outputs.append(_run(sink, node, np.full((8, 10, 3), value, np.uint8), small))
+    assert [int(o[0, 0, 0]) for o in outputs] == [11, 21]
+    assert outputs[0].shape == ((4, 5, 3) if resize_method == 'resize_first' else (8, 10, 3))
+    bufs = list(node._resize_bufs)
+    _run(sink, node, np.full((8, 10, 3), 30, np.uint8), small)
+    assert all(a is b for a, b in zip(node._resize_bufs, bufs))
+
+
+@pytest.mark.parametrize('operation, mode, constant, reference', [
+    ('multiply', 'constant', '600', lambda a: a * (600 / 255.0)),
+    ('divide', 'constant', '40', lambda a: a / (40 / 255.0)),
+    ('divide', 'image', '50', lambda a: a / np.where(a[::-1] == 0, 1, a[::-1]) * 255.0),
+    ('power', 'constant', '-0.5', lambda a: np.power(a / 255.0, -0.5) * 255.0),
+    ('sqrt', 'image', '50', np.sqrt),
+])
+def test_clip_output_off_wraps_instead_of_saturating(node_classes, operation, mode, constant,
+                                                      reference):
+    sink = node_classes['sink'](name='sink')
+    node = _make(sink, operation=operation, mode=mode, constant=constant, clip_output='false')
+    a = _img(7)
+    a[0, 0] = 0
+    out = _run(sink, node, a, a[::-1].copy() if mode == 'image' else None)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        expected = reference(a.astype(np.float32)).astype(np.int64).astype(np.uint8)
+    assert out.dtype == np.uint8
+    assert _close(out[1:], expected[1:])
+    if operation != 'power':  # 0 ** -0.5 is inf, whose cast is platform-defined
+        assert _close(out, expected)
+
+    node.configure({'clip_output': 'true'})
+    clipped = _run(sink, node, a, a[::-1].copy() if mode == 'image' else None)
+    if operation != 'sqrt':
+        assert not np.array_equal(clipped, out) and clipped.max() == 255
@@ -0,0 +1,105 @@
+"""Tests for the OpenCV BlobDetectorNode."""
+
+import cv2
+import numpy as np
+
+from pynode.nodes.OpenCV.blob_detector_node import BlobDetectorNode, _keypoints_to_blobs
+
+
+def _img(h=120, w=160, centers=((40, 60), (110, 50))):
+    """White frame with dark filled ellipses at (x, y) centers."""
+    img = np.full((h, w, 3), 255, np.uint8)
+    for x, y in centers:
+        cv2.ellipse(img, (x, y), (12, 8), 0, 0, 360, (0, 0, 0), -1)
+    return img
+
+
+def _make(sink, **config):
+    node = BlobDetectorNode(name='blobs')
+    node.configure(config)
+    node.connect(sink)
+    return node
+
+
+def _run(sink, node, img):
+    node.on_input({'payload': img})
+    return sink.received[-1]
+
+
+def test_detects_dark_blobs_with_normalized_coordinates(node_classes):
+    sink = node_classes['sink'](name='sink')
+    msg = _run(sink, _make(sink, draw_keypoints='no'), _img())
+    assert msg['blob_count'] == 2
+    blobs = sorted(msg['blobs'], key=lambda b: b['x_px'])
+    assert abs(blobs[0]['x_px'] - 40) < 1 and abs(blobs[0]['y_px'] - 60) < 1
+    assert abs(blobs[0]['x'] - 40 / 160) < 0.01 and abs(blobs[0]['y'] - 60 / 120) < 0.01
+    assert abs(blobs[1]['size'] - blobs[1]['size_px'] / 160) < 1e-6
+
+
+def test_detector_is_reused_until_size_or_config_changes(node_classes):
+    sink = node_classes['sink'](name='sink')
+    node = _make(sink)
+    _run(sink, node, _img())
+    detector = node._detector
+    _run(sink, node, _img())
+    assert node._detector is detector
+
+    # The area limits are relative to the frame, so a new size rebuilds
+    msg = _run(sink, node, _img(h=240, w=320, centers=((100, 100),)))
+    assert node._detector is not detector
+    assert msg['blob_count'] == 1
+
+    node.configure({'filter_by_color': 'light'})
+    assert _run(sink, node, _img())['blob_count'] == 0
+
+
+def test_keypoints_to_blobs_matches_per_keypoint_values():
+    kps = (cv2.KeyPoint(10.5, 20.25, 7.5, 30.0, 0.25), cv2.KeyPoint(1.0, 2.0, 3.0))
+    blobs = _keypoints_to_blobs(kps, 100, 50)
+    assert blobs[0] == {
+        'x': 10.5 / 100, 'y': 20.25 / 50, 'size': 7.5 / 100,
+        'x_px': 10.5, 'y_px': 20.25, 'size_px': 7.5,
+        'angle': 30.0, 'response': 0.25,
+    }
+    assert all(type(v) is float for v in blobs[1].values())
+    assert _keypoints_to_blobs((), 100, 50) == []
+
+
+def test_gray_buffer_is_reused_between_frames(node_classes):
+    sink = node_classes['sink'](name='sink')
+    node = _make(sink, draw_keypoints='no')
+    _run(sink, node, _img())
+    buf = node._gray_buf
+    msg = _run(sink, node, _img(centers=((80, 60),)))
+    assert node._gray_buf is buf
+    assert msg['blob_count'] == 1
+    assert abs(msg['blobs'][0]['x_px'] - 80) < 1
+
+
+def test_output_arrays_mirror_blob_dicts(node_classes):
+    sink = node_classes['sink'](name='sink')
+    node = _make(sink, draw_keypoints='no')
+    assert 'blobs_np' not in _run(sink, node, _img())
+
+    node.configure({'output_arrays': True})
+    msg = _run(sink, node, _img())
+    arrays = msg['blobs_np']
+    assert arrays['xy'].shape == (2, 2)
+    for i, blob in enumerate(msg['blobs']):
+        assert arrays['xy'][i].tolist() == [blob['x'], blob['y']]
+        assert arrays['xy_px'][i].tolist() == [blob['x_px'], blob['y_px']]
+        assert arrays['size'][i] == blob['size']
+
+    msg = _run(sink, node, np.full((50, 50, 3), 255, np.uint8))
+    assert msg['blobs'] == [] and msg['blobs_np']['xy'].shape == (0, 2)
+
+
+def test_malformed_thresholds_fall_back_to_defaults(node_classes):
+    sink = node_classes['sink'](name='sink')
+    node = BlobDetectorNode(name='blobs')
+    errors = []
+    node.report_error = errors.append
+    node.configure({'min_convexity': 'abc', 'draw_keypoints': 'no'})  # must not raise
+    node.connect(sink)
+    assert _run(sink, node, _img())['blob_count'] == 2
+    assert len(errors) == 1 and node._params.minConvexity == 0.5
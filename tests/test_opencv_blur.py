@@ -0,0 +1,98 @@
+"""Tests for the OpenCV BlurNode."""
+
+import cv2
+import numpy as np
+import pytest
+
+from pynode.nodes.OpenCV.blur_node import BlurNode
+
+
+def _img(h=32, w=40):
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 256, (h, w, 3), dtype=np.uint8)
+
+
+def _make(sink, **config):
+    node = BlurNode(name='blur')
+    node.configure(config)
+    node.connect(sink)
+    return node
+
+
+def _run(sink, node, img):
+    node.on_input({'payload': img})
+    return sink.received[-1]['payload']['image']
+
+
+@pytest.mark.parametrize('method, reference', [
+    ('gaussian', lambda img: cv2.GaussianBlur(img, (5, 5), 0)),
+    ('median', lambda img: cv2.medianBlur(img, 5)),
+    ('bilateral', lambda img: cv2.bilateralFilter(img, 5, 75, 75)),
+    ('stack', lambda img: cv2.stackBlur(img, (5, 5))),
+])
+def test_methods_match_opencv(node_classes, method, reference):
+    sink = node_classes['sink'](name='sink')
+    img = _img()
+    out = _run(sink, _make(sink, method=method, kernel_size=5), img)
+    assert np.array_equal(out, reference(img))
+
+
+def test_reconfigure_updates_cached_parameters(node_classes):
+    sink = node_classes['sink'](name='sink')
+    node = _make(sink, method='median', kernel_size=3)
+    img = _img()
+    assert np.array_equal(_run(sink, node, img), cv2.medianBlur(img, 3))
+    node.configure({'kernel_size': 6})  # even sizes are widened for median
+    assert np.array_equal(_run(sink, node, img), cv2.medianBlur(img, 7))
+
+
+@pytest.mark.parametrize('method, ksize, reference', [
+    ('box', 4, lambda img: cv2.blur(img, (4, 4))),
+    ('box', 0, lambda img: img),
+    ('stack', 4, lambda img: cv2.stackBlur(img, (5, 5))),
+    ('gaussian', 4, lambda img: cv2.GaussianBlur(img, (5, 5), 0)),
+])
+def test_even_kernel_sizes(node_classes, method, ksize, reference):
+    sink = node_classes['sink'](name='sink')
+    img = _img()
+    out = _run(sink, _make(sink, method=method, kernel_size=ksize), img)
+    assert np.array_equal(out, reference(img))
+
+
+@pytest.mark.parametrize('sigma', [0, 4])
+def test_large_gaussian_uses_cached_separable_kernel(node_classes, sigma):
+    sink = node_classes['sink'](name='sink')
+    node = _make(sink, method='gaussian', kernel_size=21, sigma=sigma)
+    assert node._gaussian_kernel.shape == (21, 1)
+    img = _img()
+    out = _run(sink, node, img)
+    expected = cv2.GaussianBlur(img, (21, 21), sigma)
+    assert np.abs(out.astype(np.int16) - expected).max() <= 2
+
+    node.configure({'kernel_size': 5})
+    assert node._gaussian_kernel is None
+
+
+def test_fast_gaussian_substitutes_stack_blur_for_large_auto_sigma(node_classes):
+    sink = node_classes['sink'](name='sink')
+    img = _img()
+    node = _make(sink, method='gaussian', kernel_size=21, fast_gaussian=True)
+    assert np.array_equal(_run(sink, node, img), cv2.stackBlur(img, (21, 21)))
+
+    # Explicit sigma or small kernels keep exact Gaussian semantics
+    node.configure({'sigma': 3})
+    assert node._method == 'gaussian'
+    node.configure({'sigma': 0, 'kernel_size': 5})
+    assert np.array_equal(_run(sink, node, img), cv2.GaussianBlur(img, (5, 5), 0))
+
+
+def test_malformed_parameters_fall_back_to_defaults(node_classes):
+    sink = node_classes['sink'](name='sink')
+    node = BlurNode(name='blur')
+    errors = []
+    node.report_error = errors.append
+    node.configure({'method': 'gaussian', 'sigma': ''})  # must not raise
+    node.connect(sink)
+    img = _img()
+    assert np.array_equal(_run(sink, node, img), cv2.GaussianBlur(img, (5, 5), 0))
+    assert len(errors) == 1
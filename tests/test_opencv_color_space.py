@@ -0,0 +1,70 @@
+"""Tests for the OpenCV ColorSpaceNode."""
+
+import cv2
+import numpy as np
+import pytest
+
+from pynode.nodes.OpenCV.color_space_node import ColorSpaceNode
+
+
+def _img():
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 256, (6, 8, 3), dtype=np.uint8)
+
+
+def _make(sink, **config):
+    node = ColorSpaceNode(name='cs')
+    node.configure(config)
+    node.connect(sink)
+    return node
+
+
+def _run(sink, node, img):
+    node.on_input({'payload': img})
+    return sink.received[-1]['payload']['image']
+
+
+@pytest.mark.parametrize('src, dst, expected', [
+    ('bgr', 'gray', lambda i: cv2.cvtColor(i, cv2.COLOR_BGR2GRAY)),
+    ('rgb', 'hsv', lambda i: cv2.cvtColor(i, cv2.COLOR_RGB2HSV)),
+    # No direct code: converted via BGR
+    ('hsv', 'lab', lambda i: cv2.cvtColor(cv2.cvtColor(i, cv2.COLOR_HSV2BGR), cv2.COLOR_BGR2LAB)),
+    ('yuv', 'gray', lambda i: cv2.cvtColor(cv2.cvtColor(i, cv2.COLOR_YUV2BGR), cv2.COLOR_BGR2GRAY)),
+    ('lab', 'lab', lambda i: i),
+])
+def test_conversions(node_classes, src, dst, expected):
+    sink = node_classes['sink'](name='sink')
+    img = _img()
+    out = _run(sink, _make(sink, input_space=src, output_space=dst), img)
+    assert np.array_equal(out, expected(img))
+
+
+def test_gray_input_and_reconfigure(node_classes):
+    sink = node_classes['sink'](name='sink')
+    gray = _img()[:, :, 0].copy()
+    node = _make(sink, input_space='gray', output_space='hsv')
+    assert _run(sink, node, gray).shape == (6, 8, 3)
+    node.configure({'output_space': 'gray'})
+    assert np.array_equal(_run(sink, node, gray), gray)
+
+
+def test_umat_path_matches_cpu_path(node_classes):
+    sink = node_classes['sink'](name='sink')
+    node = _make(sink, input_space='hsv', output_space='lab', use_opencl=True)
+    img = np.random.default_rng(1).integers(0, 180, (1000, 1000, 3), dtype=np.uint8)
+    # UMat falls back to the CPU kernels when no OpenCL device is present
+    node._use_umat = True
+    out = _run(sink, node, img)
+    expected = cv2.cvtColor(cv2.cvtColor(img, cv2.COLOR_HSV2BGR), cv2.COLOR_BGR2LAB)
+    assert isinstance(out, np.ndarray)
+    assert np.array_equal(out, expected)
+
+
+def test_opencl_option_leaves_global_switch_alone(node_classes, monkeypatch):
+    monkeypatch.setattr(cv2.ocl, 'haveOpenCL', lambda: True)
+    monkeypatch.setattr(cv2.ocl, 'setUseOpenCL', lambda flag: pytest.fail('global flag changed'))
+    sink = node_classes['sink'](name='sink')
+    monkeypatch.setattr(cv2.ocl, 'useOpenCL', lambda: False)
+    assert not _make(sink, input_space='bgr', output_space='hsv', use_opencl=True)._use_umat
+    monkeypatch.setattr(cv2.ocl, 'useOpenCL', lambda: True)
+    assert _make(sink, input_space='bgr', output_space='hsv', use_opencl=True)._use_umat
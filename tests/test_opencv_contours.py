@@ -0,0 +1,130 @@
+"""Tests for the OpenCV ContoursNode."""
+
+import cv2
+import numpy as np
+import pytest
+
+from pynode.nodes.OpenCV.contours_node import ContoursNode, _contour_geometry
+
+
+def _img(h=100, w=200):
+    """Black frame with a filled rectangle and a filled circle."""
+    img = np.zeros((h, w), np.uint8)
+    cv2.rectangle(img, (10, 20), (59, 49), 255, -1)
+    cv2.circle(img, (140, 50), 20, 255, -1)
+    return img
+
+
+def _make(sink, **config):
+    node = ContoursNode(name='contours')
+    node.configure(config)
+    node.connect(sink)
+    return node
+
+
+def _run(sink, node, img):
+    node.on_input({'payload': img})
+    return sink.received[-1]
+
+
+@pytest.mark.parametrize('color', [False, True])
+def test_contour_properties(node_classes, color):
+    sink = node_classes['sink'](name='sink')
+    img = _img()
+    if color:
+        img = cv2.cvtColor(img, cv2.COLOR_GRAY2BGR)
+    before = img.copy()
+    msg = _run(sink, _make(sink), img)
+
+    assert np.array_equal(img, before)  # input frame is never drawn on
+    assert msg['contour_count'] == 2
+    rect = min(msg['contours'], key=lambda c: c['bbox']['x_px'])
+    assert rect['bbox'] == {
+        'x': 10 / 200, 'y': 20 / 100, 'width': 50 / 200, 'height': 30 / 100,
+        'x_px': 10, 'y_px': 20, 'width_px': 50, 'height_px': 30,
+    }
+    assert rect['area_px'] == 49 * 29
+    assert rect['area'] == 49 * 29 / (200 * 100)
+    assert rect['perimeter_px'] == 2 * (49 + 29)
+    assert rect['perimeter'] == 2 * (49 + 29) / 300
+    assert rect['centroid'] == {'x': 34 / 200, 'y': 34 / 100, 'x_px': 34, 'y_px': 34}
+    assert rect['aspect_ratio'] == 50 / 30
+    assert type(rect['bbox']['x_px']) is int and type(rect['centroid']['x_px']) is int
+    assert rect['circularity'] == pytest.approx(4 * np.pi * 49 * 29 / (2 * (49 + 29)) ** 2)
+
+    out = msg['payload']['image']
+    assert out.shape == (100, 200, 3)
+    assert (out[20, 10] == (0, 255, 0)).all()  # contour drawn in green
+
+
+def test_area_filter(node_classes):
+    sink = node_classes['sink'](name='sink')
+    msg = _run(sink, _make(sink, min_area=0.068), _img())
+    assert msg['contour_count'] == 1
+    msg = _run(sink, _make(sink, min_area=0.0, max_area=0.068), _img())
+    assert msg['contour_count'] == 1
+    assert [c['index'] for c in msg['contours']] == [0]
+
+
+
+def test_malformed_area_limits_fall_back_to_defaults(node_classes):
+    sink = node_classes['sink'](name='sink')
+    node = ContoursNode(name='contours')
+    errors = []
+    node.report_error = errors.append
+    node.configure({'max_area': 'big'})  # must not raise
+    node.connect(sink)
+    assert _run(sink, node, _img())['contour_count'] == 2
+    assert len(errors) == 1
+
+@pytest.mark.parametrize('approx', [cv2.CHAIN_APPROX_NONE, cv2.CHAIN_APPROX_SIMPLE,
+                                    cv2.CHAIN_APPROX_TC89_KCOS])
+def test_contour_geometry_matches_opencv(approx):
+    rng = np.random.default_rng(0)
+    img = (rng.random((60, 80)) > 0.7).astype(np.uint8) * 255
+    contours = cv2.findContours(img, cv2.RETR_LIST, approx)[0]
+    boxes, centroids, perimeters = _contour_geometry(contours)
+    for cnt, box, centroid, perimeter in zip(contours, boxes.tolist(), centroids.tolist(),
+                                             perimeters.tolist()):
+        assert box == list(cv2.boundingRect(cnt))
+        assert perimeter == cv2.arcLength(cnt, True)
+        m = cv2.moments(cnt)
+        if m['m00'] != 0:
+            assert centroid == [int(m['m10'] / m['m00']), int(m['m01'] / m['m00'])]
+        else:
+            assert centroid == [box[0] + box[2] // 2, box[1] + box[3] // 2]
+    empty_boxes, empty_centroids, empty_perimeters = _contour_geometry(())
+    assert empty_boxes.shape == (0, 4) and empty_centroids.shape == (0, 2)
+    assert empty_perimeters.shape == (0,)
+
+
+def test_no_drawing_passes_input_frame_through(node_classes):
+    sink = node_classes['sink'](name='sink')
+    img = _img()
+    msg = _run(sink, _make(sink, draw_contours=False, draw_bboxes=False), img)
+    assert msg['payload']['image'] is img
+    assert msg['contour_count'] == 2
+
+
+def test_color_conversion_buffer_is_reused(node_classes):
+    sink = node_classes['sink'](name='sink')
+    node = _make(sink, draw_contours=False)
+    first = cv2.cvtColor(_img(), cv2.COLOR_GRAY2BGR)
+    assert _run(sink, node, first)['contour_count'] == 2
+    buf = node._gray_buf
+    second = np.zeros_like(first)
+    cv2.rectangle(second, (5, 5), (30, 30), (255, 255, 255), -1)
+    msg = _run(sink, node, second)
+    assert node._gray_buf is buf
+    assert msg['contour_count'] == 1
+    assert msg['contours'][0]['bbox']['x_px'] == 5
+
+
+def test_reconfigure_updates_cached_mode(node_classes):
+    sink = node_classes['sink'](name='sink')
+    img = np.zeros((100, 100), np.uint8)
+    cv2.rectangle(img, (10, 10), (89, 89), 255, 5)  # outline: outer + inner contour
+    node = _make(sink, mode='external', draw_contours=False)
+    assert _run(sink, node, img)['contour_count'] == 1
+    node.configure({'mode': 'list'})
+    assert _run(sink, node, img)['contour_count'] == 2
@@ -0,0 +1,160 @@
+"""Tests for the OpenCV DenormalizeCoordsNode."""
+
+import base64
+import random
+
+import cv2
+import numpy as np
+import pytest
+
+from pynode.nodes.image_utils import peek_image_size
+from pynode.nodes.OpenCV.denormalize_coords_node import DenormalizeCoordsNode
+
+
+def _make(sink, **config):
+    node = DenormalizeCoordsNode(name='denorm')
+    node.configure({'image_width': 200, 'image_height': 100, **config})
+    node.connect(sink)
+    return node
+
+
+def _run(sink, node, msg):
+    node.on_input(msg, 0)
+    return sink.received[-1]
+
+
+def test_detection_fields_are_scaled_per_axis(node_classes):
+    sink = node_classes['sink'](name='sink')
+    node = _make(sink)
+    det = {'x': 0.25, 'cy': 0.5, 'radius': 0.1, 'h': 0.2, 'score': 0.9,
+           'label': 'cat', 'x_px': 7, 'y2': 3.0}
+    out = _run(sink, node, {'detections': [det]})['detections'][0]
+    assert out == {'x': 50, 'cy': 50, 'radius': 20, 'h': 20, 'score': 0.9,
+                   'label': 'cat', 'y2': 3.0}
+    assert list(out) == ['x', 'cy', 'radius', 'h', 'score', 'label', 'y2']
+    assert 'x_px' in det  # input detection is not mutated
+
+
+def test_float_output_keeps_fractional_pixels(node_classes):
+    sink = node_classes['sink'](name='sink')
+    node = _make(sink, output_integers=False)
+    out = _run(sink, node, {'shapes': [{'x1': 0.001, 'y1': 1}]})['shapes'][0]
+    assert out == {'x1': pytest.approx(0.2), 'y1': 100.0}
+    assert isinstance(out['y1'], float)
+
+
+def test_detection_bbox_is_denormalized(node_classes):
+    sink = node_classes['sink'](name='sink')
+    node = _make(sink, bbox_format='xywh')
+    msg = {'payload': {'detections': [{'bbox': [0.1, 0.2, 0.5, 0.6, 0.8], 'class_id': 2}]}}
+    out = _run(sink, node, msg)['payload']['detections'][0]
+    assert out == {'bbox': [20, 20, 80, 40, 0.8], 'class_id': 2}
+
+
+@pytest.mark.parametrize('bbox_format', ['xyxy', 'xywh', 'cxcywh'])
+@pytest.mark.parametrize('as_int', [True, False])
+def test_batched_bboxes_match_scalar_path(node_classes, bbox_format, as_int):
+    rng = random.Random(0)
+    dets = []
+    for i in range(40):
+        x1, y1 = rng.random() * 0.5, rng.random() * 0.5
+        bbox = [x1, y1, x1 + rng.random() * 0.5, y1 + rng.random() * 0.5]
+        if i % 3 == 0:
+            bbox = tuple(bbox) + (0.5, i)
+        dets.append({'bbox': bbox, 'cx': 0.125, 'score_px': 1})
+    dets.append({'bbox': [0.0025, 0.005, 0.0075, 0.015]})  # exact .5 pixel ties
+    dets.append({'bbox': (12, 30, 40, 60, 0.7)})  # already in pixels
+
+    sink = node_classes['sink'](name='sink')
+    node = _make(sink, bbox_format=bbox_format, output_integers=as_int)
+    batched = _run(sink, node, {'detections': dets})['detections']
+    scalar = [node._denormalize_detection(d, 200, 100, as_int) for d in dets]
+    assert batched == scalar
+    assert [type(v) for v in batched[0]['bbox']] == [type(v) for v in scalar[0]['bbox']]
+
+
+def _encoded(ext, shape=(30, 70, 3), flags=()):
+    ok, buf = cv2.imencode(ext, np.zeros(shape, np.uint8), list(flags))
+    assert ok
+    return base64.b64encode(buf.tobytes()).decode()
+
+
+@pytest.mark.parametrize('payload', [
+    np.zeros((30, 70, 3), np.uint8),
+    {'format': 'bgr', 'encoding': 'numpy', 'data': np.zeros((30, 70), np.uint8)},
+    {'format': 'jpeg', 'encoding': 'base64', 'data': _encoded('.jpg')},
+    {'image': _encoded('.png')},
+    'data:image/png;base64,' + _encoded('.png', shape=(30, 70)),
+    _encoded('.jpg', flags=(cv2.IMWRITE_JPEG_PROGRESSIVE, 1)),
+])
+def test_peek_image_size_reads_headers(payload):
+    assert peek_image_size(payload) == (70, 30)
+
+
+@pytest.mark.parametrize('payload', ['not-an-image', {'format': 'bgr', 'encoding': 'raw'}, 3])
+def test_peek_image_size_unknown_payloads(payload):
+    assert peek_image_size(payload) is None
+
+
+def test_dimensions_from_encoded_payload_skip_decoding(node_classes):
+    sink = node_classes['sink'](name='sink')
+    node = DenormalizeCoordsNode(name='denorm')
+    node.connect(sink)
+    node.decode_image = lambda payload: pytest.fail('image was decoded')
+    msg = {'payload': {'image': {'format': 'jpeg', 'encoding': 'base64',
+                                 'data': _encoded('.jpg')}}, 'points': [[0.5, 0.5]]}
+    out = _run(sink, node, msg)
+    assert (out['image_width'], out['image_height']) == (70, 30)
+    assert out['points'] == [[35, 15]]
+
+
+def test_messages_without_coordinates_pass_through(node_classes):
+    sink = node_classes['sink'](name='sink')
+    node = _make(sink)
+    msg = {'payload': {'label': 'x'}, 'topic': 't'}
+    out = _run(sink, node, msg)
+    assert out['payload'] == {'label': 'x'}
+    assert (out['image_width'], out['image_height']) == (200, 100)
+
+
+def test_pixel_space_bboxes_are_left_alone(node_classes):
+    sink = node_classes['sink'](name='sink')
+    node = _make(sink)
+    out = _run(sink, node, {'bbox': (12, 30, 40, 60), 'payload': {'bbox': [0.5, 0.5, 1, 1]}})
+    assert out['bbox'] == [12, 30, 40, 60]
+    assert out['payload']['bbox'] == [100, 50, 200, 100]
+
+
+@pytest.mark.parametrize('bbox_format, expected', [
+    ('xyxy', {'x1': 20, 'y1': 20, 'x2': 100, 'y2': 60}),
+    ('xywh', {'x': 20, 'y': 20, 'width': 80, 'height': 40}),
+    ('cxcywh', {'cx': 60, 'cy': 40, 'width': 80, 'height': 40}),
+])
+def test_dict_bbox_keeps_extra_fields(node_classes, bbox_format, expected):
+    sink = node_classes['sink'](name='sink')
+    node = _make(sink, bbox_format=bbox_format)
+    for bbox in ({'x1': 0.1, 'y1': 0.2, 'x2': 0.5, 'y2': 0.6},
+                 {'x': 0.1, 'y': 0.2, 'width': 0.4, 'height': 0.4}):
+        bbox = {**bbox, 'label': 'dog', 'x1_px': 3}
+        out = _run(sink, node, {'bbox': bbox})['bbox']
+        assert 'x1_px' not in out and out['label'] == 'dog'
+        assert {k: out[k] for k in expected} == expected
+
+    pixels = {'x1': 5, 'y1': 6, 'x2': 7, 'y2': 8, 'x1_px': 5}
+    assert _run(sink, node, {'bbox': pixels})['bbox'] == pixels
+
+
+@pytest.mark.parametrize('as_int', [True, False])
+def test_batched_points_match_scalar_path(node_classes, as_int):
+    rng = random.Random(1)
+    points = [[rng.random(), rng.random()] for _ in range(30)]
+    points += [(0.0025, 0.005), [1, 0], [150, 0.5], (0.5, float('nan'))]
+    sink = node_classes['sink'](name='sink')
+    node = _make(sink, output_integers=as_int)
+    out = _run(sink, node, {'points': points, 'payload': {'points': list(points)}})
+    scalar = [node._denormalize_point(p, 200, 100, as_int) for p in points]
+    assert out['points'][:-1] == scalar[:-1]
+    assert out['points'][-1][0] == 0.5  # NaN row left untouched
+    assert [type(v) for p in out['points'][:-1] for v in p] == \
+        [type(v) for p in scalar[:-1] for v in p]
+    assert out['payload']['points'][:-1] == scalar[:-1]
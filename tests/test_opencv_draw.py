@@ -0,0 +1,127 @@
+"""Tests for the OpenCV DrawNode."""
+
+import base64
+
+import cv2
+import numpy as np
+import pytest
+
+from pynode.nodes.OpenCV.draw_node import DrawNode
+
+
+def _frame(h=50, w=100):
+    return np.zeros((h, w, 3), np.uint8)
+
+
+def _make(sink, **config):
+    node = DrawNode(name='draw')
+    node.configure(config)
+    node.connect(sink)
+    return node
+
+
+def _run(sink, node, msg):
+    node.on_input(msg)
+    return sink.received[-1]
+
+
+def test_rectangle_is_drawn_on_a_copy_of_array_payloads(node_classes):
+    sink = node_classes['sink'](name='sink')
+    node = _make(sink, shape='rectangle', x1=0.1, y1=0.2, x2=0.5, y2=0.6,
+                 color='255,0,0', thickness=-1)
+    img = _frame()
+    out = _run(sink, node, {'payload': img})['payload']['image']
+    assert out is not img and not img.any()
+    assert out[10:31, 10:51].tolist() == [[[255, 0, 0]] * 41] * 21
+    assert not out[:10].any()
+
+
+def test_copy_input_off_draws_in_place(node_classes):
+    sink = node_classes['sink'](name='sink')
+    node = _make(sink, shape='line', x1=0.0, y1=0.0, x2=1.0, y2=0.0, copy_input=False)
+    img = _frame()
+    out = _run(sink, node, {'payload': img})['payload']['image']
+    assert out is img
+    assert img[0, :, 1].all()
+
+
+def test_only_array_payloads_count_as_shared():
+    img = _frame()
+    assert DrawNode._aliases_payload(img, {'payload': img})
+    assert DrawNode._aliases_payload(img, {'payload': {'image': img}})
+    assert DrawNode._aliases_payload(
+        img, {'payload': {'image': {'format': 'bgr', 'encoding': 'numpy', 'data': img}}})
+    assert not DrawNode._aliases_payload(img, {'payload': 'base64...'})
+    assert not DrawNode._aliases_payload(img, {'payload': {'image': img.copy()}})
+
+
+def test_encoded_payload_is_drawn_and_reencoded(node_classes):
+    sink = node_classes['sink'](name='sink')
+    node = _make(sink, shape='circle', x1=0.5, y1=0.5, radius=0.1, thickness=-1)
+    ok, buf = cv2.imencode('.png', _frame())
+    payload = base64.b64encode(buf.tobytes()).decode()
+    out = _run(sink, node, {'payload': payload})['payload']['image']
+    decoded = cv2.imdecode(np.frombuffer(base64.b64decode(out), np.uint8), cv2.IMREAD_COLOR)
+    # Re-encoded as JPEG, so allow for compression error
+    assert np.abs(decoded[25, 50].astype(int) - [0, 255, 0]).max() <= 8
+
+
+def test_from_msg_without_shapes_passes_frame_through(node_classes):
+    sink = node_classes['sink'](name='sink')
+    node = _make(sink, shape='from_msg')
+    img = _frame()
+    assert _run(sink, node, {'payload': img})['payload']['image'] is img
+
+    msg = {'payload': img, 'shapes': [{'type': 'rectangle', 'x1': 0, 'y1': 0,
+                                       'x2': 0.5, 'y2': 0.5, 'color': '0,0,255'}]}
+    out = _run(sink, node, msg)['payload']['image']
+    assert out is not img and out[0, 0].tolist() == [0, 0, 255]
+
+
+@pytest.mark.parametrize('config', [
+    {'shape': 'rectangle', 'x1': 0.13, 'y1': '0.27', 'x2': 0.61, 'y2': 0.9, 'thickness': 3},
+    {'shape': 'circle', 'x1': 0.5, 'y1': 0.4, 'radius': 0.15, 'thickness': -1,
+     'color': '10, 20, 30'},
+    {'shape': 'line', 'x1': 0.05, 'y1': 0.95, 'x2': 0.9, 'y2': 0.1, 'thickness': '4'},
+    {'shape': 'text', 'x1': 0.1, 'y1': 0.6, 'text': 'abc', 'font_scale': 0.7},
+    {'shape': 'text', 'x1': 0.1, 'y1': 0.6, 'text_source': 'from_msg', 'msg_path': 'score'},
+])
+def test_cached_config_matches_dict_path(node_classes, config):
+    sink = node_classes['sink'](name='sink')
+    node = _make(sink, **config)
+    assert node._parsed is not None
+    msg = {'payload': _frame(77, 131), 'score': 0.93}
+    out = _run(sink, node, msg)['payload']['image']
+    expected = node._draw_shape(_frame(77, 131), node._configured_shape_info(), msg)
+    assert out.any() and np.array_equal(out, expected)
+
+
+def test_reconfigure_and_malformed_values(node_classes):
+    sink = node_classes['sink'](name='sink')
+    node = _make(sink, shape='rectangle', x1=0, y1=0, x2=0.5, y2=0.5, thickness=-1)
+    assert _run(sink, node, {'payload': _frame()})['payload']['image'][0, 0, 1] == 255
+    node.configure({'color': '0,0,255'})
+    assert _run(sink, node, {'payload': _frame()})['payload']['image'][0, 0].tolist() == [0, 0, 255]
+
+    node.configure({'x1': 'oops'})  # must not raise at configure time
+    assert node._parsed is None
+    count = len(sink.received)
+    node.on_input({'payload': _frame()})
+    assert len(sink.received) == count  # drawing error is reported, frame dropped
+
+
+@pytest.mark.parametrize('color, expected', [
+    ('255,0,0', (255, 0, 0)),
+    (' 1 , 2 , 3 ', (1, 2, 3)),
+    ('1,2,3,4', (1, 2, 3)),
+    ('-1,+2,3', (-1, 2, 3)),
+    ('1,2', (0, 255, 0)),
+    ('1,x,3', (0, 255, 0)),
+    ('', (0, 255, 0)),
+    (None, (0, 255, 0)),
+    ((10, 20, 30), (10, 20, 30)),
+    ([10.0, 20, 30, 40], (10, 20, 30)),
+    ((1, 2), (0, 255, 0)),
+])
+def test_parse_color(color, expected):
+    assert DrawNode(name='draw')._parse_color(color) == expected